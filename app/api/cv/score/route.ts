@@ -3,6 +3,7 @@ import { promises as fs } from 'fs'
 import path from 'path'
 import os from 'os'
 import { spawn } from 'child_process'
+import { getScoringPool, resolvePythonBin } from './workerPool'
 
 export const runtime = 'nodejs'
 export const dynamic = 'force-dynamic'
@@ -16,33 +17,17 @@ async function saveTempFile(file: File): Promise<string> {
   return filePath
 }
 
-function resolvePythonBin(): string[] {
-  const envBin = process.env.PYTHON_BIN?.trim()
-  const candidates: string[] = []
-  if (envBin) candidates.push(envBin)
-  
-  // Windows Python paths
-  if (process.platform === 'win32') {
-    candidates.push('C:\\Python313\\python.exe', 'python', 'py', 'python3')
-  } else {
-    // Prefer local project venv if available
-    try {
-      const venvPython = path.join(process.cwd(), '.venv', 'bin', 'python3')
-      candidates.push(venvPython)
-    } catch {}
-    // Prefer python3 on macOS/Linux environments
-    candidates.push('python3', 'python3.11', 'python3.10', 'python', 'py')
-  }
-  
-  // De-duplicate while preserving order
-  return Array.from(new Set(candidates))
-}
-
-function runPythonScore(pdfPath: string, sector: string, jdText?: string, jdFilePath?: string): Promise<any> {
+function runPythonScore(pdfPath: string, sector: string, jdText?: string, jdFilePath?: string,
+                        compareSectors?: string): Promise<any> {
   return new Promise((resolve, reject) => {
     const scriptPath = path.join(process.cwd(), 'cv', 'ats_scoring_enhanced.py')
     const args = [scriptPath, '--file', pdfPath]
     if (sector) args.push('--sector', sector)
+    // Time budget per CV: slow optional stages are skipped (result.deadline.skipped_stages)
+    const budgetMs = process.env.ATS_SCORE_BUDGET_MS?.trim()
+    if (budgetMs) args.push('--budget-ms', budgetMs)
+    // "FINANCE,ACCOUNTANT", "auto" or "all": result.sector_comparison
+    if (compareSectors) args.push('--compare-sectors', compareSectors)
     if (jdText && jdText.trim().length > 0) {
       args.push('--jd-text', jdText)
     } else if (jdFilePath) {
@@ -117,6 +102,7 @@ export async function POST(request: Request) {
     const sector = (form.get('sector') as string | null) || 'INFORMATION-TECHNOLOGY'
     const jdText = (form.get('jd_text') as string | null) || undefined
     const jdFile = (form.get('jd_file') as File | null) || null
+    const compareSectors = (form.get('compare_sectors') as string | null) || undefined
 
     if (!file) {
       return NextResponse.json({ error: 'file is required' }, { status: 400 })
@@ -125,7 +111,18 @@ export async function POST(request: Request) {
     const tempPath = await saveTempFile(file)
     const jdTempPath = jdFile ? await saveTempFile(jdFile) : undefined
     try {
-      const result = await runPythonScore(tempPath, sector, jdText, jdTempPath)
+      const pool = getScoringPool()
+      const budgetMs = Number(process.env.ATS_SCORE_BUDGET_MS?.trim())
+      const result = pool
+        ? await pool.score({
+            file: tempPath,
+            sector,
+            jd_text: jdText,
+            jd_file: jdTempPath,
+            budget_ms: Number.isFinite(budgetMs) && budgetMs > 0 ? budgetMs : undefined,
+            compare_sectors: compareSectors,
+          })
+        : await runPythonScore(tempPath, sector, jdText, jdTempPath, compareSectors)
       return NextResponse.json({ ok: true, result })
     } finally {
       // Best-effort cleanup
@@ -0,0 +1,189 @@
+import path from 'path'
+import readline from 'readline'
+import { spawn, type ChildProcessWithoutNullStreams } from 'child_process'
+
+// Warm scoring workers: `ats_scoring_enhanced.py --serve-stdio` keeps one EnhancedATSScorer
+// (lexicons, sector model, SBERT) loaded and answers JSON-lines requests matched by id,
+// so a request no longer pays interpreter and model startup.
+//   ATS_WORKERS             pool size (default 2; 0 = spawn one process per request)
+//   ATS_WORKER_THREADS      concurrent requests inside one worker (default 1)
+//   ATS_WORKER_TIMEOUT_MS   per-request timeout; the worker is restarted (default 120000)
+
+export function resolvePythonBin(): string[] {
+  const envBin = process.env.PYTHON_BIN?.trim()
+  const candidates: string[] = []
+  if (envBin) candidates.push(envBin)
+
+  // Windows Python paths
+  if (process.platform === 'win32') {
+    candidates.push('C:\\Python313\\python.exe', 'python', 'py', 'python3')
+  } else {
+    // Prefer local project venv if available
+    try {
+      const venvPython = path.join(process.cwd(), '.venv', 'bin', 'python3')
+      candidates.push(venvPython)
+    } catch {}
+    // Prefer python3 on macOS/Linux environments
+    candidates.push('python3', 'python3.11', 'python3.10', 'python', 'py')
+  }
+
+  // De-duplicate while preserving order
+  return Array.from(new Set(candidates))
+}
+
+export interface ScoreRequest {
+  file: string
+  sector?: string
+  jd_text?: string
+  jd_file?: string
+  budget_ms?: number
+  compare_sectors?: string
+}
+
+type Pending = {
+  resolve: (result: any) => void
+  reject: (error: Error) => void
+  timer: NodeJS.Timeout
+}
+
+const intEnv = (name: string, fallback: number): number => {
+  const value = Number.parseInt(process.env[name]?.trim() || '', 10)
+  return Number.isFinite(value) && value >= 0 ? value : fallback
+}
+
+class ScoringWorker {
+  private proc: ChildProcessWithoutNullStreams | null = null
+  private starting: Promise<ChildProcessWithoutNullStreams> | null = null
+  private pending = new Map<number, Pending>()
+  private nextId = 1
+  private inflight = 0
+  private stderrTail = ''
+
+  constructor(private threads: number, private timeoutMs: number) {}
+
+  get load(): number {
+    return this.inflight
+  }
+
+  private start(): Promise<ChildProcessWithoutNullStreams> {
+    if (this.proc) return Promise.resolve(this.proc)
+    if (this.starting) return this.starting
+    this.starting = new Promise((resolve, reject) => {
+      const scriptPath = path.join(process.cwd(), 'cv', 'ats_scoring_enhanced.py')
+      const tryStart = (bins: string[]) => {
+        if (!bins.length) {
+          this.starting = null
+          reject(new Error('No Python interpreter found. Set PYTHON_BIN or add python/py to PATH.'))
+          return
+        }
+        const proc = spawn(bins[0], [scriptPath, '--serve-stdio', '--threads', String(this.threads)], {
+          env: { ...process.env, PYTHONUTF8: '1' },
+        })
+        let ready = false
+        let failed = false
+
+        readline.createInterface({ input: proc.stdout }).on('line', (line) => {
+          let message: any
+          try {
+            message = JSON.parse(line)
+          } catch {
+            return // import-time warnings precede the ready line
+          }
+          if (message?.ready) {
+            ready = true
+            this.proc = proc
+            this.starting = null
+            resolve(proc)
+            return
+          }
+          const pending = this.pending.get(message?.id)
+          if (!pending || message.progress) return // progress lines are only sent on request
+          this.pending.delete(message.id)
+          clearTimeout(pending.timer)
+          if (message.ok) pending.resolve(message.result)
+          else pending.reject(new Error(message.error || 'Scoring failed'))
+        })
+        proc.stdin.on('error', () => {}) // a dead worker is handled by 'exit'
+        proc.stderr.on('data', (data) => {
+          this.stderrTail = (this.stderrTail + data.toString()).slice(-4000)
+        })
+
+        const onFailure = (error: Error) => {
+          if (failed) return
+          failed = true
+          if (ready) {
+            this.fail(proc, error)
+          } else if ((error as NodeJS.ErrnoException).code === 'ENOENT') {
+            tryStart(bins.slice(1)) // try the next interpreter
+          } else {
+            this.starting = null
+            reject(new Error(this.stderrTail || error.message))
+          }
+        }
+        proc.on('error', onFailure)
+        proc.on('exit', (code) => onFailure(new Error(this.stderrTail || `Scoring worker exited with code ${code}`)))
+      }
+      tryStart(resolvePythonBin())
+    })
+    return this.starting
+  }
+
+  private fail(proc: ChildProcessWithoutNullStreams, error: Error) {
+    if (this.proc === proc) this.proc = null
+    for (const [id, pending] of this.pending) {
+      clearTimeout(pending.timer)
+      pending.reject(error)
+      this.pending.delete(id)
+    }
+  }
+
+  async score(request: ScoreRequest): Promise<any> {
+    this.inflight++
+    try {
+      return await this.send(await this.start(), request)
+    } finally {
+      this.inflight--
+    }
+  }
+
+  private send(proc: ChildProcessWithoutNullStreams, request: ScoreRequest): Promise<any> {
+    const id = this.nextId++
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        // A stuck request holds a worker thread: restart the worker (its other requests fail too)
+        this.pending.delete(id)
+        reject(new Error(`Scoring timed out after ${this.timeoutMs} ms`))
+        proc.kill()
+      }, this.timeoutMs)
+      this.pending.set(id, { resolve, reject, timer })
+      proc.stdin.write(JSON.stringify({ id, ...request }) + '\n')
+    })
+  }
+}
+
+class ScoringPool {
+  private workers: ScoringWorker[]
+
+  constructor(size: number, threads: number, timeoutMs: number) {
+    this.workers = Array.from({ length: size }, () => new ScoringWorker(threads, timeoutMs))
+  }
+
+  score(request: ScoreRequest): Promise<any> {
+    // Least outstanding requests first
+    const worker = this.workers.reduce((best, w) => (w.load < best.load ? w : best))
+    return worker.score(request)
+  }
+}
+
+const globalForPool = globalThis as unknown as { atsScoringPool?: ScoringPool | null }
+
+// One pool per server process (survives dev-mode module reloads); null when disabled
+export function getScoringPool(): ScoringPool | null {
+  if (globalForPool.atsScoringPool === undefined) {
+    const size = intEnv('ATS_WORKERS', 2)
+    globalForPool.atsScoringPool = size > 0
+      ? new ScoringPool(size, Math.max(1, intEnv('ATS_WORKER_THREADS', 1)), intEnv('ATS_WORKER_TIMEOUT_MS', 120000))
+      : null
+  }
+  return globalForPool.atsScoringPool
+}
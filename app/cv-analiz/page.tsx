@@ -131,6 +131,9 @@ export default function CVAnalysisPage() {
       // Kullanıcı istatistiklerini güncelle
       console.info(`[${fileKey}] userStats okunuyor`)
       const currentStats = await getUserStats(user.uid)
+      // Yüzdelik dilim en yüksek CV skoruna aittir
+      const isBest = resultToSave.overallScore >= (currentStats?.cvScore || 0)
+      const percentile = resultToSave.raw?.percentile
       const newStats = {
         userId: user.uid,
         displayName: user.displayName || 'Kullanıcı',
@@ -139,6 +142,9 @@ export default function CVAnalysisPage() {
         totalScore: (currentStats?.totalScore || 0) + resultToSave.overallScore,
         // En yüksek CV puanını tut
         cvScore: Math.max(currentStats?.cvScore || 0, resultToSave.overallScore),
+        // Yeni en iyi skorun yüzdeliği yoksa eskisi taşınmaz (null alanı Firestore'da temizler)
+        cvPercentile: isBest ? percentile?.better_than_pct ?? null : currentStats?.cvPercentile,
+        cvPercentileSector: isBest ? percentile?.sector ?? null : currentStats?.cvPercentileSector,
         interviewScore: currentStats?.interviewScore || 0,
         badge: currentStats?.badge || "Yeni Katılımcı",
         level: currentStats?.level || "Başlangıç",
@@ -298,6 +298,11 @@ export default function RankingsPage() {
               <div>
                 <div className="text-2xl font-bold text-secondary">{meStats?.cvScore ?? 0}</div>
                 <div className="text-sm text-muted-foreground">CV Skoru</div>
+                {meStats?.cvPercentile != null && (
+                  <div className="text-xs text-muted-foreground">
+                    {meStats.cvPercentileSector} CV'lerinin %{meStats.cvPercentile}'inden iyi
+                  </div>
+                )}
               </div>
               <div>
                 <div className="text-2xl font-bold text-accent">{meStats?.interviewScore ?? 0}</div>
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from ats import timing
+
+# ===== Time budgets =====
+# Mandatory rules always run. Optional stages (OCR, SBERT semantic matching,
+# LanguageTool grammar, online link checks) run in priority order, each only
+# while the remaining budget covers its expected cost; the rest are recorded
+# as skipped and the score falls back to what the rules alone produce.
+# The order is STAGE_PRIORITY (config: "stage_priority"). Expected costs start
+# from DEFAULT_STAGE_COST_MS (config: "stage_cost_ms") and then follow the
+# observed durations.
+
+STAGE_PRIORITY = ["semantic", "grammar", "link_check"]  # after the mandatory rules
+DEFAULT_STAGE_COST_MS: Dict[str, float] = {
+    "ocr": 1500.0,  # per page
+    "semantic": 150.0,
+    "grammar": 800.0,
+    "link_check": 400.0,
+}
+EWMA_ALPHA = 0.3
+
+
+class StageCosts:
+    """Expected milliseconds per optional stage (EWMA of observed runs), shared by concurrent requests"""
+
+    def __init__(self, initial: Optional[Dict[str, float]] = None):
+        self._ms = dict(DEFAULT_STAGE_COST_MS)
+        self._ms.update(initial or {})
+        self._lock = threading.Lock()
+
+    def expected_ms(self, stage: str) -> float:
+        return self._ms.get(stage, 0.0)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            prev = self._ms.get(stage)
+            ms = seconds * 1000
+            self._ms[stage] = ms if prev is None else (1 - EWMA_ALPHA) * prev + EWMA_ALPHA * ms
+
+
+class Deadline:
+    """Time budget of one scoring request"""
+
+    def __init__(self, budget_ms: float, costs: Optional[StageCosts] = None):
+        self.budget_ms = float(budget_ms)
+        self.costs = costs or StageCosts()
+        self.skipped: List[str] = []
+        self._start = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def remaining_ms(self) -> float:
+        return max(0.0, self.budget_ms - self.elapsed_ms())
+
+    def allows(self, stage: str) -> bool:
+        """True if the remaining budget covers the stage's expected cost; records a skip otherwise"""
+        if self.remaining_ms() >= self.costs.expected_ms(stage):
+            return True
+        self.skip(stage)
+        return False
+
+    def skip(self, stage: str):
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+            timing.incr(f"skipped_{stage}")
+
+    @contextmanager
+    def run(self, stage: str) -> Iterator[None]:
+        """Time an optional stage (also into ats.timing) and update its expected cost"""
+        start = time.perf_counter()
+        with timing.stage(stage):
+            yield
+        self.costs.observe(stage, time.perf_counter() - start)
+
+    def report(self) -> Dict:
+        return {
+            "budget_ms": self.budget_ms,
+            "elapsed_ms": round(self.elapsed_ms(), 2),
+            "skipped_stages": list(self.skipped),
+        }
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# ===== Named feature columns =====
+# Raw, weight-independent signals behind EnhancedATSScorer's breakdown (one row per CV).
+# Only the keyword/action weights come from the config; score_features applies them to
+# a whole matrix at once and matches EnhancedATSScorer._breakdown_from_features exactly.
+
+SECTION_WEIGHTS = {"experience": 10, "education": 8, "skills": 7, "contact": 5}
+SECTION_COLUMNS = [f"has_{s}_section" for s in SECTION_WEIGHTS] + ["has_contact_info"]
+FORMAT_COLUMNS = ["length_score", "date_consistency", "has_bullets"]
+
+# Penalty column -> note, in the order the notes are reported
+PENALTY_NOTES: Dict[str, str] = {
+    "pen_columns": "Two-column/table-like layout detected; ATS parsing risk",
+    "pen_header_footer": "Avoid placing contact info solely in header/footer; move into body",
+    "pen_long_paragraphs": "Paragraphs too long; break into concise bullets",
+    "pen_bullet_quality": "Overly long or multi-line bullet points",
+    "pen_hyphenation": "Avoid hyphenation across line breaks; may break ATS parsing",
+    "pen_reverse_chronology": "Dates not in reverse chronological order",
+    "pen_experience_entries": "Too few distinct experience entries",
+    "pen_summary_length": "Summary/objective section too long",
+    "pen_quantified_bullets": "Low rate of quantified results in bullets (<30%)",
+    "pen_action_bullets": "Few bullets start with strong action verbs (<50%)",
+    "pen_buzzwords": "Vague buzzwords detected; replace with concrete outcomes",
+    "pen_tense": "Tense inconsistency between past and present across bullets",
+    "pen_keyword_stuffing": "Avoid raw keyword stuffing; use keywords in natural sentences",
+    "pen_skills_block": "Split very long comma-separated skills list into categorized bullets",
+    "pen_first_person": "Avoid first-person pronouns in resume body",
+    "pen_all_caps": "Excessive ALL CAPS usage; use standard capitalization",
+    "pen_education_degree": "Education section lacks clear degree notation (e.g., BSc, MSc, PhD)",
+    "pen_link_quality": "Provide full LinkedIn profile URL (e.g., linkedin.com/in/username)",
+    "pen_non_ascii": "Limit special characters/diacritics; ensure ATS-safe ASCII alternatives",
+    "pen_grammar": "Reduce spelling/grammar issues for professional tone",
+    "pen_language_mismatch": "Avoid mixing languages; keep resume in one language consistently",
+    "pen_bullets_per_entry": "Balance bullets per experience entry (2–6 recommended)",
+    "pen_broken_links": "Some profile links appear broken/unreachable",
+}
+# Reported after the keyword/action/completeness notes
+LATE_PENALTY_NOTES: Dict[str, str] = {
+    "pen_repetition": "High word repetition; vary language",
+    "pen_passive_voice": "Excessive passive voice; prefer action-driven statements",
+    "pen_date_gap": "Large timeline gaps detected; add context for gaps",
+    "pen_date_overlap": "Overlapping date ranges detected; clarify chronology",
+}
+PENALTY_COLUMNS = list(PENALTY_NOTES) + list(LATE_PENALTY_NOTES)
+KEYWORD_COLUMNS = ["kw_total_score", "kw_enhancement_factor", "kw_direct_count", "kw_semantic_matches",
+                   "action_hits"]
+COMPLETENESS_COLUMNS = ["has_email", "has_phone", "has_profile_link"]
+FEATURE_COLUMNS: List[str] = (SECTION_COLUMNS + FORMAT_COLUMNS + PENALTY_COLUMNS + KEYWORD_COLUMNS
+                              + COMPLETENESS_COLUMNS + ["bonus"])
+COLUMN_INDEX = {c: i for i, c in enumerate(FEATURE_COLUMNS)}
+
+
+def feature_row(features: Dict[str, float]) -> np.ndarray:
+    return np.array([features[c] for c in FEATURE_COLUMNS], dtype=np.float64)
+
+
+def empty_matrix(rows: int) -> np.ndarray:
+    return np.zeros((rows, len(FEATURE_COLUMNS)), dtype=np.float64)
+
+
+def length_component(words):
+    """Length score from word counts (scalar or array): 1.0 / 0.6 / 0.3"""
+    words = np.asarray(words)
+    ideal = (words >= 250) & (words <= 1200)
+    near = ((words >= 150) & (words < 250)) | ((words > 1200) & (words <= 2000))
+    return np.select([ideal, near], [1.0, 0.6], 0.3)
+
+
+def action_component(hits):
+    hits = np.asarray(hits)
+    return np.select([hits >= 10, hits >= 5, hits >= 2], [1.0, 0.7, 0.4], 0.0)
+
+
+def score_features(matrix: np.ndarray, sectors: Sequence[str], config) -> Dict[str, np.ndarray]:
+    """Component and total scores for every row. `config` is an ATSConfig (get_weight)."""
+    col = {name: matrix[:, i] for name, i in COLUMN_INDEX.items()}
+    sector_arr = np.asarray(sectors)
+    kw_w = np.zeros(len(sector_arr))
+    act_w = np.zeros(len(sector_arr))
+    for sector in np.unique(sector_arr):
+        mask = sector_arr == sector
+        kw_w[mask] = config.get_weight("keywords", str(sector))
+        act_w[mask] = config.get_weight("actions", str(sector))
+
+    sections = sum(w * col[f"has_{s}_section"] for s, w in SECTION_WEIGHTS.items()) + 5 * col["has_contact_info"]
+    formatting = np.round(col["length_score"] * 8 + col["date_consistency"] * 6 + col["has_bullets"] * 6)
+    penalties = matrix[:, [COLUMN_INDEX[c] for c in PENALTY_COLUMNS]].sum(axis=1)
+
+    base = np.minimum(kw_w, np.floor((col["kw_total_score"] / 15.0) * kw_w))
+    keywords = np.minimum(np.floor(base * np.minimum(col["kw_enhancement_factor"], 1.2)), kw_w)
+    keywords = np.where(col["kw_direct_count"] < 10, np.minimum(keywords, np.floor(kw_w * 0.7)), keywords)
+
+    hits = col["action_hits"]
+    actions = np.floor(action_component(hits) * act_w)
+    actions = np.where(hits < 6, np.minimum(actions, np.floor(act_w * 0.7)), actions)
+
+    completeness = 3 * col["has_email"] + 3 * col["has_phone"] + 4 * col["has_profile_link"]
+    base_total = sections + formatting + keywords + actions + completeness - penalties
+    total = np.minimum(100, np.minimum(90, base_total) + col["bonus"])
+    return {
+        "total": total.astype(int),
+        "sections": sections.astype(int),
+        "formatting": formatting.astype(int),
+        "keywords": keywords.astype(int),
+        "actions": actions.astype(int),
+        "completeness": completeness.astype(int),
+    }
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ats.lexicon import WORD_RE
+
+# ===== Content fingerprints =====
+# The same CV re-exported by another PDF tool differs in whitespace, ligatures
+# (ﬁ -> fi), bullet glyphs and invisible characters. canonical_text() removes
+# those differences so the cache key only changes when the content does. It
+# only folds what the rules treat alike: spacing keeps the one distinction they
+# see (under 4 blanks vs a wide, column-like gap), blank-line runs stay one
+# paragraph break, and the bullets they recognise (-, *, •) become "- ";
+# other glyphs (▪, ➢, ...) are left alone because the rules do not count them
+# as bullets. score_cv_text scores canonical_text(t), so the key and the cached
+# result always describe the same text (on the PDF and CSV corpora the score
+# equals that of the raw text anyway).
+# simhash() fingerprints word 3-gram shingles; near-identical texts differ in
+# only a few bits, which NearDuplicateIndex finds via 4 x 16-bit bands
+# (pigeonhole: distance <= 3 shares at least one band).
+
+FINGERPRINT_VERSION = 1
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+BANDS = 4
+
+_INVISIBLE_RE = re.compile("[\u00ad\u200b-\u200f\u2060\ufeff]")
+_HSPACE_RE = re.compile(r"[^\S\n]+")
+_WIDE_GAP = "    "  # _columns_or_tables_signal counts \s{4,}
+_BULLET_RE = re.compile(r"^[-*•] ")
+
+
+def _fold_space(match: re.Match) -> str:
+    return _WIDE_GAP if len(match.group()) >= len(_WIDE_GAP) else " "
+
+
+def canonical_text(text: str) -> str:
+    """NFKC, no invisible characters, folded spacing, single blank lines, bullets as '- '"""
+    text = unicodedata.normalize("NFKC", text)
+    text = _INVISIBLE_RE.sub("", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines: List[str] = []
+    for line in text.split("\n"):
+        line = _HSPACE_RE.sub(_fold_space, line)
+        if not line.strip():
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if line.startswith(" ") and not line.startswith(_WIDE_GAP):
+            line = line[1:]
+        if line.endswith(" ") and not line.endswith(_WIDE_GAP):
+            line = line[:-1]
+        lines.append(_BULLET_RE.sub("- ", line))
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines)
+
+
+def content_fingerprint(text: str) -> str:
+    return hashlib.sha1(canonical_text(text).encode("utf-8")).hexdigest()
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the canonical text's word 3-grams (lowercased)"""
+    words = WORD_RE.findall(canonical_text(text).lower())
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    if not shingles:
+        return 0
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(shingles), 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(votes).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _bands(fp: int) -> List[Tuple[int, int]]:
+    width = SIMHASH_BITS // BANDS
+    return [(i, (fp >> (i * width)) & ((1 << width) - 1)) for i in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """SimHash -> cache key, per scope (sector/config/lexicon); appended to a JSON-lines file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: List[Tuple[int, str, str]] = []  # simhash, scope, key
+        self._bands: Dict[Tuple[int, int], List[int]] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        if entry.get("v") == FINGERPRINT_VERSION:
+                            self._insert(int(entry["simhash"], 16), entry["scope"], entry["key"])
+            except Exception as e:
+                print(f"Near-duplicate index read error: {e}")
+
+    def _insert(self, fp: int, scope: str, key: str):
+        idx = len(self._entries)
+        self._entries.append((fp, scope, key))
+        for band in _bands(fp):
+            self._bands.setdefault(band, []).append(idx)
+
+    def add(self, fp: int, scope: str, key: str):
+        with self._lock:
+            self._insert(fp, scope, key)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"v": FINGERPRINT_VERSION, "simhash": f"{fp:016x}",
+                                        "scope": scope, "key": key}) + "\n")
+            except Exception as e:
+                print(f"Near-duplicate index write error: {e}")
+
+    def find(self, fp: int, scope: str, max_distance: int = 3) -> Optional[str]:
+        """Key of the closest entry in `scope` within max_distance bits (<= 3 is exhaustive)"""
+        best: Optional[Tuple[int, str]] = None
+        with self._lock:
+            candidates = {i for band in _bands(fp) for i in self._bands.get(band, ())}
+            for i in candidates:
+                other, other_scope, key = self._entries[i]
+                if other_scope != scope:
+                    continue
+                d = hamming(fp, other)
+                if d <= max_distance and (best is None or d < best[0]):
+                    best = (d, key)
+        return best[1] if best else None
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Tuple
+
+from ats.rules_extras import (
+    ROLE_PRESETS,
+    infer_role_from_jd,
+    normalize_tokens,
+)
+
+CATALOGUE_VERSION = 1
+
+# ===== JD keyword helpers (shared by JD fit scoring and candidate ranking) =====
+# Minimal stopwords for JD token filtering (keep deterministic, no extra deps)
+JD_STOPWORDS = {
+    "the","and","for","with","from","this","that","your","you","our","their",
+    "a","an","to","of","in","on","at","as","by","is","are","be","or","we",
+    "using","use","used","will","can","ability","experience","skills","skill",
+    "responsibilities","responsibility","requirements","requirement","preferred","must",
+    "include","including","such","etc","about","more","minimum","years","year",
+}
+
+# Must-have cap: need at least 70% of must-have matched, else total capped at 60
+MUST_HAVE_MIN_COVERAGE = 0.7
+MUST_HAVE_CAP = 60
+
+
+def tokenize_keywords(text: str) -> List[str]:
+    words = [w.lower() for w in re.findall(r"[A-Za-z][A-Za-z0-9+.#-]{1,}", text)]
+    return [w for w in words if w not in JD_STOPWORDS and len(w) >= 3]
+
+
+def apply_must_have_cap(total: int, must_matched: int, must_total: int) -> Tuple[int, bool]:
+    """Cap the fit score when too few must-have keywords are covered."""
+    if must_total and must_matched / max(1, must_total) < MUST_HAVE_MIN_COVERAGE:
+        return min(total, MUST_HAVE_CAP), True
+    return total, False
+
+
+
+@dataclass(frozen=True)
+class JDProfile:
+    """Everything JD fit scoring needs from a JD, derived once from its text."""
+    jd_hash: str
+    sector: str
+    role: str
+    tokens: FrozenSet[str]
+    required: FrozenSet[str]
+    must_have: Tuple[str, ...]
+
+    def to_dict(self) -> Dict:
+        return {
+            "jd_hash": self.jd_hash,
+            "sector": self.sector,
+            "role": self.role,
+            "tokens": sorted(self.tokens),
+            "required": sorted(self.required),
+            "must_have": list(self.must_have),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "JDProfile":
+        return cls(
+            jd_hash=data["jd_hash"],
+            sector=data["sector"],
+            role=data.get("role", ""),
+            tokens=frozenset(data["tokens"]),
+            required=frozenset(data["required"]),
+            must_have=tuple(data["must_have"]),
+        )
+
+
+def jd_hash(jd_text: str, sector: str, sector_kw: List[str]) -> str:
+    """Profile identity: JD text + the sector lexicon it was compiled against."""
+    content = f"{jd_text}|{sector}|{','.join(sector_kw)}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _compile(jd_text: str, sector: str, sector_kw: List[str], digest: str) -> JDProfile:
+    jd_raw = tokenize_keywords(jd_text)
+    normalized = normalize_tokens(jd_raw)
+    jd_tokens = set(normalized)
+
+    # Required set = sector keywords present in JD OR top JD tokens
+    req_keywords = set([kw for kw in sector_kw if kw in jd_tokens])
+    if len(req_keywords) < 10:
+        # augment with frequent JD tokens likely to be skills/tech
+        counts = Counter([w for w in jd_raw if len(w) <= 20])
+        for w, c in counts.most_common(30):
+            if c >= 2 and w not in req_keywords and w not in JD_STOPWORDS:
+                req_keywords.add(w)
+            if len(req_keywords) >= 20:
+                break
+
+    # Must-have set: role preset + sector keywords present in JD (up to 12)
+    role = infer_role_from_jd(jd_text)
+    must_have: List[str] = []
+    for w in ROLE_PRESETS.get(role, []):
+        if w in jd_tokens and w not in must_have:
+            must_have.append(w)
+    for w in sector_kw:
+        if w in jd_tokens and w not in must_have:
+            must_have.append(w)
+    must_have = must_have[:12]
+    # If still small, fill with frequent JD tokens
+    if len(must_have) < 8:
+        counts = Counter([w for w in normalized if len(w) <= 20])
+        for w, _c in counts.most_common(40):
+            if w not in must_have and w in req_keywords:
+                must_have.append(w)
+            if len(must_have) >= 12:
+                break
+
+    return JDProfile(
+        jd_hash=digest,
+        sector=sector,
+        role=role,
+        tokens=frozenset(jd_tokens),
+        required=frozenset(req_keywords),
+        must_have=tuple(must_have),
+    )
+
+
+_CACHE_SIZE = 1024
+_cache: "OrderedDict[str, JDProfile]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_jd_profile(jd_text: str, sector: str, sector_kw: List[str]) -> JDProfile:
+    """Compile (or fetch from the in-process LRU, keyed by JD hash) a JD profile.
+
+    `sector_kw` must be the lowercased keyword list of `sector`.
+    """
+    digest = jd_hash(jd_text, sector, sector_kw)
+    with _cache_lock:
+        profile = _cache.get(digest)
+        if profile is not None:
+            _cache.move_to_end(digest)
+            return profile
+    profile = _compile(jd_text, sector, sector_kw, digest)
+    with _cache_lock:
+        _cache[digest] = profile
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return profile
+
+
+@dataclass
+class CatalogueEntry:
+    jd_id: str
+    title: str
+    text: str
+    profile: JDProfile
+
+
+@dataclass
+class JDCatalogue:
+    """Open positions with their compiled profiles, persisted as JSON.
+
+    Entries only need id/title/sector/text when written by hand; profiles are
+    compiled on load and recompiled whenever the sector lexicon changed.
+    """
+    entries: Dict[str, CatalogueEntry] = field(default_factory=dict)
+
+    def add(self, jd_id: str, text: str, sector: str, sector_kw: List[str], title: str = "") -> CatalogueEntry:
+        entry = CatalogueEntry(jd_id, title or jd_id, text, compile_jd_profile(text, sector, sector_kw))
+        self.entries[jd_id] = entry
+        return entry
+
+    def remove(self, jd_id: str):
+        self.entries.pop(jd_id, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": CATALOGUE_VERSION,
+            "jds": [
+                {"id": e.jd_id, "title": e.title, "sector": e.profile.sector, "text": e.text,
+                 "profile": e.profile.to_dict()}
+                for e in self.entries.values()
+            ],
+        }
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path, sector_keywords: Dict[str, List[str]],
+             default_sector: str = "INFORMATION-TECHNOLOGY") -> "JDCatalogue":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        catalogue = cls()
+        for item in data.get("jds", []):
+            sector = item.get("sector") or default_sector
+            sector_kw = [k.lower() for k in sector_keywords.get(sector, [])]
+            stored = item.get("profile")
+            if stored and stored.get("jd_hash") == jd_hash(item["text"], sector, sector_kw):
+                profile = JDProfile.from_dict(stored)
+            else:
+                profile = compile_jd_profile(item["text"], sector, sector_kw)
+            jd_id = str(item["id"])
+            catalogue.entries[jd_id] = CatalogueEntry(jd_id, item.get("title") or jd_id, item["text"], profile)
+        return catalogue
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# ===== Shared lexicon bundle =====
+# All keyword lists (sector keywords, action verbs, skill groups/synonyms) are read
+# through get_lexicons(). `python -m ats.lexicon` (also run by build_lexicons.py)
+# compiles them into lexicons/lexicon_bundle.bin: a header with the content hash
+# followed by a pickle of plain data, including the matcher plans. Each process
+# unpickles its own copy; the bundle only saves the JSON parsing and matcher
+# compilation at start-up. Without a fresh bundle the same data is compiled from the
+# JSON sources in memory.
+
+LEXICON_DIR = Path("lexicons")
+BUNDLE_PATH = LEXICON_DIR / "lexicon_bundle.bin"
+BUNDLE_MAGIC = b"CVLEX\x00\x01\n"
+SOURCE_FILES = {
+    "sector_keywords": "sector_keywords.json",
+    "action_verbs": "action_verbs.json",
+    "action_verbs_extended": "action_verbs_extended.json",
+}
+
+FALLBACK_SECTOR_KEYWORDS: Dict[str, List[str]] = {
+    "INFORMATION-TECHNOLOGY": [
+        "python", "java", "javascript", "react", "node", "api", "cloud",
+        "docker", "kubernetes", "sql", "microservices", "aws", "azure",
+    ],
+    "FINANCE": [
+        "budget", "forecast", "sap", "excel", "financial analysis",
+        "audit", "ifrs", "tax", "valuation", "risk",
+    ],
+    "ENGINEERING": [
+        "cad", "autocad", "solidworks", "mechanical", "electrical",
+        "embedded", "matlab", "simulation", "qa", "testing",
+    ],
+    "HEALTHCARE": [
+        "patient", "clinical", "hospital", "emr", "ehr", "compliance",
+        "diagnosis", "treatment", "pharma", "laboratory",
+    ],
+    "ACCOUNTANT": [
+        "bookkeeping", "ledger", "reconciliation", "payable", "receivable",
+        "gst", "vat", "tax", "audit", "tally",
+    ],
+}
+
+FALLBACK_ACTION_VERBS: List[str] = [
+    "led", "managed", "developed", "designed", "implemented", "optimized",
+    "built", "created", "delivered", "launched", "increased", "reduced",
+    "improved", "streamlined", "automated", "migrated", "analyzed",
+    "architected", "coordinated", "facilitated", "mentored",
+]
+
+# Common skill groups: canonical skill -> variants
+SKILL_GROUPS: Dict[str, List[str]] = {
+    "Python": ["python", "python3", "python programming", "py"],
+    "JavaScript": ["javascript", "js", "node.js", "nodejs", "ecmascript"],
+    "React": ["react", "reactjs", "react.js", "reactjs", "react native"],
+    "AWS": ["aws", "amazon web services", "amazon aws", "cloud aws"],
+    "Docker": ["docker", "docker container", "dockerization"],
+    "SQL": ["sql", "mysql", "postgresql", "postgres", "database"],
+    "Git": ["git", "github", "gitlab", "version control"],
+    "Machine Learning": ["machine learning", "ml", "ai", "artificial intelligence"],
+    "Data Science": ["data science", "data analysis", "data analytics"],
+    "Project Management": ["project management", "pm", "agile", "scrum"],
+    "Excel": ["excel", "microsoft excel", "spreadsheet"],
+    "PowerPoint": ["powerpoint", "presentation", "slides"],
+    "Word": ["word", "microsoft word", "document"],
+    "Photoshop": ["photoshop", "adobe photoshop", "ps"],
+    "Illustrator": ["illustrator", "adobe illustrator", "ai"],
+    "Figma": ["figma", "ui design", "ux design"],
+    "AutoCAD": ["autocad", "cad", "computer aided design"],
+    "SolidWorks": ["solidworks", "3d modeling", "cad design"],
+    "MATLAB": ["matlab", "mathematical modeling"],
+    "Java": ["java", "java programming", "spring", "spring boot"],
+    "C++": ["c++", "cpp", "c plus plus"],
+    "C#": ["c#", "csharp", "dotnet", ".net"],
+    "PHP": ["php", "php programming", "laravel"],
+    "Angular": ["angular", "angularjs", "angular.js"],
+    "Vue": ["vue", "vue.js", "vuejs"],
+    "TypeScript": ["typescript", "ts", "type script"],
+    "MongoDB": ["mongodb", "mongo", "nosql"],
+    "Redis": ["redis", "cache", "caching"],
+    "Kubernetes": ["kubernetes", "k8s", "container orchestration"],
+    "Jenkins": ["jenkins", "ci/cd", "continuous integration"],
+    "Linux": ["linux", "ubuntu", "centos", "unix"],
+    "Windows": ["windows", "windows server", "microsoft windows"],
+    "Azure": ["azure", "microsoft azure", "cloud azure"],
+    "Google Cloud": ["google cloud", "gcp", "google cloud platform"],
+    "Terraform": ["terraform", "infrastructure as code", "iac"],
+    "Ansible": ["ansible", "configuration management"],
+    "Elasticsearch": ["elasticsearch", "elastic", "search engine"],
+    "Kibana": ["kibana", "data visualization", "dashboard"],
+    "Tableau": ["tableau", "business intelligence", "bi"],
+    "Power BI": ["power bi", "microsoft power bi", "business intelligence"],
+    "SAP": ["sap", "sap erp", "enterprise resource planning"],
+    "Salesforce": ["salesforce", "crm", "customer relationship management"],
+    "Jira": ["jira", "project tracking", "issue tracking"],
+    "Confluence": ["confluence", "documentation", "wiki"],
+    "Slack": ["slack", "team communication", "collaboration"],
+    "Zoom": ["zoom", "video conferencing", "remote meeting"],
+    "Teams": ["teams", "microsoft teams", "collaboration"],
+    "Office 365": ["office 365", "microsoft office", "productivity suite"],
+}
+
+WORD_RE = re.compile(r"\w+")
+
+# keyword -> (lowercased keyword, its \w runs, True if it is a single \w run)
+KeywordPlan = List[Tuple[str, str, Tuple[str, ...], bool]]
+
+
+def text_tokens(text_lower: str) -> Set[str]:
+    """Maximal \\w runs of an already lowercased text (shared by all matchers)."""
+    return set(WORD_RE.findall(text_lower))
+
+
+def plan_keywords(keywords: List[str]) -> KeywordPlan:
+    plan = []
+    for kw in keywords:
+        lowered = kw.lower()
+        runs = tuple(WORD_RE.findall(lowered))
+        plan.append((kw, lowered, runs, len(runs) == 1 and runs[0] == lowered))
+    return plan
+
+
+class KeywordMatcher:
+    """Same answers as re.search(rf'\\b{re.escape(kw.lower())}\\b', text_lower) per keyword.
+
+    A single-word keyword matches iff it is one of the text's \\w runs (a set lookup).
+    Any other keyword only matches if all of its \\w runs are runs of the text, so its
+    precompiled regex runs only after that cheap check passes.
+    """
+
+    def __init__(self, plan: KeywordPlan):
+        self.keywords = [kw for kw, _, _, _ in plan]
+        self._entries = [
+            (kw, lowered, runs, None if simple else re.compile(rf"\b{re.escape(lowered)}\b"))
+            for kw, lowered, runs, simple in plan
+        ]
+
+    def found(self, text_lower: str, tokens: Optional[Set[str]] = None) -> List[str]:
+        """Matched keywords, in lexicon order (duplicates kept)"""
+        if tokens is None:
+            tokens = text_tokens(text_lower)
+        out = []
+        for kw, lowered, runs, pattern in self._entries:
+            if pattern is None:
+                if lowered in tokens:
+                    out.append(kw)
+            elif all(r in tokens for r in runs) and pattern.search(text_lower):
+                out.append(kw)
+        return out
+
+    def count(self, text_lower: str, tokens: Optional[Set[str]] = None) -> int:
+        return len(self.found(text_lower, tokens))
+
+
+class Lexicons:
+    """Loaded lexicon data plus lazily built matchers. Treat the lists/dicts as read-only."""
+
+    def __init__(self, data: Dict):
+        self.version: str = data["version"]
+        self.sector_keywords: Dict[str, List[str]] = data["sector_keywords"]
+        # action_verbs.json as-is; merged = extended + base, lowercased, deduplicated, sorted
+        self.action_verbs: List[str] = data["action_verbs"]
+        self.action_verbs_merged: List[str] = data["action_verbs_merged"]
+        self.skill_groups: Dict[str, List[str]] = data["skill_groups"]
+        self.synonyms: Dict[str, str] = data["synonyms"]
+        self._plans: Dict[str, KeywordPlan] = data["plans"]
+        self._matchers: Dict[str, KeywordMatcher] = {}
+        self._lock = threading.Lock()
+
+    def _matcher(self, name: str, keywords: List[str]) -> KeywordMatcher:
+        matcher = self._matchers.get(name)
+        if matcher is None:
+            plan = self._plans.get(name) or plan_keywords(keywords)
+            matcher = KeywordMatcher(plan)
+            with self._lock:
+                matcher = self._matchers.setdefault(name, matcher)
+        return matcher
+
+    def sector_matcher(self, sector: str) -> KeywordMatcher:
+        return self._matcher(f"sector:{sector}", self.sector_keywords.get(sector, []))
+
+    def all_sectors_matcher(self) -> KeywordMatcher:
+        """Matcher over the distinct keywords of every sector"""
+        keywords = list(dict.fromkeys(kw for kws in self.sector_keywords.values() for kw in kws))
+        return self._matcher("sector:*", keywords)
+
+    def sector_keyword_hits(self, text_lower: str, tokens: Optional[Set[str]] = None,
+                            sectors: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """sector_matcher(s).found(...) for many sectors from one scan of the text"""
+        found = set(self.all_sectors_matcher().found(text_lower, tokens))
+        return {s: [kw for kw in self.sector_keywords.get(s, []) if kw in found]
+                for s in (sectors if sectors is not None else self.sector_keywords)}
+
+    def action_matcher(self) -> KeywordMatcher:
+        return self._matcher("action_verbs", self.action_verbs)
+
+    def merged_action_matcher(self) -> KeywordMatcher:
+        return self._matcher("action_verbs_merged", self.action_verbs_merged)
+
+    def skill_matcher(self) -> KeywordMatcher:
+        """Matcher over every skill variant; map hits back with skill_variant_groups"""
+        return self._matcher("skills", _skill_variants(self.skill_groups))
+
+    def skill_variant_groups(self) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = {}
+        for main_skill, variants in self.skill_groups.items():
+            for variant in variants:
+                groups.setdefault(variant, []).append(main_skill)
+        return groups
+
+
+def _skill_variants(skill_groups: Dict[str, List[str]]) -> List[str]:
+    return list(dict.fromkeys(v for variants in skill_groups.values() for v in variants))
+
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def _source_stats(lexicon_dir: Path) -> Dict[str, Optional[Tuple[float, int]]]:
+    stats = {}
+    for name, filename in SOURCE_FILES.items():
+        try:
+            st = os.stat(lexicon_dir / filename)
+            stats[name] = (st.st_mtime, st.st_size)
+        except OSError:
+            stats[name] = None
+    return stats
+
+
+def compile_lexicons(lexicon_dir: Path = LEXICON_DIR) -> Dict:
+    """Read the JSON sources (with fallbacks) into the plain-data bundle form"""
+    sector_keywords = _read_json(lexicon_dir / SOURCE_FILES["sector_keywords"])
+    if not isinstance(sector_keywords, dict):
+        sector_keywords = FALLBACK_SECTOR_KEYWORDS
+    action_verbs = _read_json(lexicon_dir / SOURCE_FILES["action_verbs"])
+    if not isinstance(action_verbs, list):
+        action_verbs = FALLBACK_ACTION_VERBS
+
+    merged: List[str] = []
+    for name in ("action_verbs_extended", "action_verbs"):
+        data = _read_json(lexicon_dir / SOURCE_FILES[name])
+        if isinstance(data, list):
+            merged.extend(str(x).strip() for x in data if str(x).strip())
+    if not merged:
+        merged = list(FALLBACK_ACTION_VERBS)
+    merged = sorted(set(v.lower() for v in merged))
+
+    synonyms = {}
+    for main_skill, variants in SKILL_GROUPS.items():
+        for variant in variants:
+            synonyms[variant.lower()] = main_skill
+
+    content = {
+        "sector_keywords": sector_keywords,
+        "action_verbs": action_verbs,
+        "action_verbs_merged": merged,
+        "skill_groups": SKILL_GROUPS,
+        "synonyms": synonyms,
+    }
+    version = hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    plans = {f"sector:{s}": plan_keywords(kws) for s, kws in sector_keywords.items()}
+    plans["action_verbs"] = plan_keywords(action_verbs)
+    plans["action_verbs_merged"] = plan_keywords(merged)
+    plans["skills"] = plan_keywords(_skill_variants(SKILL_GROUPS))
+    return {**content, "version": version, "plans": plans, "sources": _source_stats(lexicon_dir)}
+
+
+def write_bundle(data: Dict, path: Path = BUNDLE_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(data["version"].encode("ascii"))
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def read_bundle(path: Path = BUNDLE_PATH) -> Optional[Dict]:
+    """Read and unpickle the bundle; None if missing or not a bundle."""
+    header = len(BUNDLE_MAGIC)
+    try:
+        with open(path, "rb") as f:
+            if f.read(header) != BUNDLE_MAGIC:
+                return None
+            version = f.read(40).decode("ascii")
+            data = pickle.load(f)
+        return data if isinstance(data, dict) and data.get("version") == version else None
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, UnicodeDecodeError):
+        return None
+
+
+def bundle_version(path: Path = BUNDLE_PATH) -> Optional[str]:
+    """Content hash from the bundle header, without unpickling"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(len(BUNDLE_MAGIC) + 40)
+        if head[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+            return None
+        return head[len(BUNDLE_MAGIC):].decode("ascii")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+_lexicons: Optional[Lexicons] = None
+_load_lock = threading.Lock()
+
+
+def get_lexicons() -> Lexicons:
+    """Process-wide lexicons: the compiled bundle when it matches the JSON sources,
+    otherwise compiled from the sources in memory."""
+    global _lexicons
+    if _lexicons is None:
+        with _load_lock:
+            if _lexicons is None:
+                data = read_bundle(BUNDLE_PATH)
+                if data is None or data.get("sources") != _source_stats(LEXICON_DIR):
+                    data = compile_lexicons(LEXICON_DIR)
+                _lexicons = Lexicons(data)
+    return _lexicons
+
+
+def reload_lexicons() -> Lexicons:
+    global _lexicons
+    with _load_lock:
+        _lexicons = None
+    return get_lexicons()
+
+
+def main():
+    data = compile_lexicons(LEXICON_DIR)
+    write_bundle(data, BUNDLE_PATH)
+    print(f"Saved: {BUNDLE_PATH} (version {data['version'][:12]})")
+
+
+if __name__ == "__main__":
+    main()
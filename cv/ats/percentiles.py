@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# ===== Corpus percentiles =====
+# Per-sector sorted arrays of corpus scores, so "better than X% of IT CVs" is two
+# binary searches instead of a corpus pass. Built from the feature store
+# (python feature_store.py percentiles), which only extracts CVs it has not seen,
+# and tied to the config/rules and lexicon versions the scores were computed with
+# and to the optional stages (SBERT, grammar, link checks) that fed them: arrays
+# from offline rows are not comparable with live scores that ran those stages.
+
+PERCENTILES_PATH = Path("models/score_percentiles.json")
+PERCENTILES_FORMAT = 2
+MIN_SECTOR_DOCUMENTS = 20  # fewer corpus CVs than this: no percentile for the sector
+
+
+class ScoreDistribution:
+    """Sector -> sorted corpus scores"""
+
+    def __init__(self, scores: Dict[str, List[int]], config_version: str = "", lexicon_version: str = "",
+                 stages: Sequence[str] = ()):
+        self.scores = {sector: sorted(values) for sector, values in scores.items()}
+        self.config_version = config_version
+        self.lexicon_version = lexicon_version
+        self.stages = list(stages)
+
+    @classmethod
+    def from_scores(cls, sectors: Sequence[str], totals: Sequence[int], config_version: str = "",
+                    lexicon_version: str = "", stages: Sequence[str] = ()) -> "ScoreDistribution":
+        scores: Dict[str, List[int]] = {}
+        for sector, total in zip(sectors, totals):
+            scores.setdefault(str(sector), []).append(int(total))
+        return cls(scores, config_version, lexicon_version, stages)
+
+    def matches(self, config_version: str, lexicon_version: str, stages: Sequence[str] = ()) -> bool:
+        return (self.config_version == config_version and self.lexicon_version == lexicon_version
+                and sorted(self.stages) == sorted(stages))
+
+    def percentile(self, sector: str, score: int) -> Optional[Dict]:
+        """Standing of `score` among the sector's corpus CVs; None without enough of them"""
+        values = self.scores.get(sector)
+        if not values or len(values) < MIN_SECTOR_DOCUMENTS:
+            return None
+        n = len(values)
+        below = bisect_left(values, score)
+        at_or_below = bisect_right(values, score)
+        return {
+            "sector": sector,
+            "better_than_pct": round(100.0 * below / n, 1),
+            "top_pct": round(100.0 * (n - below) / n, 1),
+            "at_or_below_pct": round(100.0 * at_or_below / n, 1),
+            "documents": n,
+        }
+
+    def summary(self) -> Dict[str, Dict]:
+        return {
+            sector: {"documents": len(v), "median": v[len(v) // 2], "min": v[0], "max": v[-1]}
+            for sector, v in sorted(self.scores.items()) if v
+        }
+
+    def save(self, path: Path = PERCENTILES_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": PERCENTILES_FORMAT, "config_version": self.config_version,
+                       "lexicon_version": self.lexicon_version, "stages": self.stages,
+                       "scores": self.scores}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = PERCENTILES_PATH) -> Optional["ScoreDistribution"]:
+        """None if there is no usable file (missing, other format)"""
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("format") != PERCENTILES_FORMAT:
+                return None
+            return cls(state["scores"], state.get("config_version", ""), state.get("lexicon_version", ""),
+                       state.get("stages", []))
+        except Exception as e:
+            print(f"Score percentiles load error: {e}")
+            return None
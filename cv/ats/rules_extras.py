@@ -1,10 +1,31 @@
 from __future__ import annotations
 
+import importlib.util
 import re
-from typing import List, Tuple
-
-EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+import time
+from typing import List, Optional, Tuple
+
+# ===== Input-safe patterns =====
+# Rules run on uploaded text, so every pattern must do bounded work per start
+# position (linear in the input). Unbounded runs like `[...]+@` restart at every
+# word boundary inside a long token and go quadratic; the email parts are capped
+# at the RFC 5321 lengths instead. PHONE_RE only has fixed-width pieces (<= 20 chars).
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Za-z]{2,63}\b")
 PHONE_RE = re.compile(r"\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}\b")
+# exam-\nple: fixed-width letter runs; one newline, then any whitespace
+HYPHENATION_RE = re.compile(r"[A-Za-z]{3}-[^\S\n]*\n\s*[A-Za-z]{2}")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Input caps: ~3x the longest CV in the PDF/CSV corpora; anything beyond is not a resume
+MAX_TEXT_CHARS = 100_000
+MAX_PDF_PAGES = 20
+
+
+def cap_text(text: str, limit: int = MAX_TEXT_CHARS) -> Tuple[str, bool]:
+    """(text cut to `limit` characters, whether it was cut)"""
+    if len(text) <= limit:
+        return text, False
+    return text[:limit], True
 
 
 def header_footer_contact_penalty(text: str) -> int:
@@ -20,16 +41,17 @@ def header_footer_contact_penalty(text: str) -> int:
 
 
 def hyphenation_penalty(text: str) -> int:
-    if re.search(r"[A-Za-z]{3,}-\s*\n\s*[A-Za-z]{2,}", text):
+    if HYPHENATION_RE.search(text):
         return 2
     return 0
 
 
 def non_ascii_penalty(text: str) -> int:
-    letters = re.findall(r"\S", text)
+    letters = _WHITESPACE_RE.sub("", text)
     if not letters:
         return 0
-    non_ascii = sum(1 for ch in letters if ord(ch) > 127)
+    # encode(..., "ignore") drops exactly the code points > 127
+    non_ascii = len(letters) - len(letters.encode("ascii", "ignore"))
     ratio = non_ascii / max(1, len(letters))
     if ratio > 0.10:
         return 2
@@ -112,22 +134,48 @@ def link_validity_penalty(text: str) -> int:
     return min(3, pen)
 
 
-def spelling_grammar_penalty(text: str) -> int:
-    """Optional: LanguageTool-based grammar/spell penalty. If lib missing, return 0."""
+def spelling_grammar_issues(text: str, timeout: float = 10.0, budget_s: Optional[float] = None) -> Optional[int]:
+    """Optional: LanguageTool issue count. None if the lib/service is unavailable or too slow.
+    budget_s bounds the whole check: the language list query and up to two check attempts
+    share it (the library's own request timeout is 300 s)."""
+    if budget_s is not None:
+        timeout = min(timeout, budget_s / 3)
+        if timeout <= 0:
+            return None
     try:
         import language_tool_python  # type: ignore
-        tool = language_tool_python.LanguageToolPublicAPI('en-US')
-        matches = tool.check(text[:20000])  # cap for speed
-        density = len(matches) / max(1, len(text.split()))
-        if density > 0.06:
-            return 6
-        if density > 0.03:
-            return 3
-        if density > 0.015:
-            return 1
-        return 0
+
+        class _PublicAPI(language_tool_python.LanguageToolPublicAPI):
+            _TIMEOUT = timeout  # per HTTP request
+
+        tool = _PublicAPI('en-US')
+        return len(tool.check(text[:20000]))  # cap for speed
     except Exception:
+        return None
+
+
+def grammar_check_available() -> bool:
+    """True if language_tool_python is installed (the service may still be unreachable)."""
+    return importlib.util.find_spec("language_tool_python") is not None
+
+
+def grammar_density_penalty(issues: int, words: int) -> int:
+    density = issues / max(1, words)
+    if density > 0.06:
+        return 6
+    if density > 0.03:
+        return 3
+    if density > 0.015:
+        return 1
+    return 0
+
+
+def spelling_grammar_penalty(text: str) -> int:
+    """Optional: LanguageTool-based grammar/spell penalty. If lib missing, return 0."""
+    issues = spelling_grammar_issues(text)
+    if issues is None:
         return 0
+    return grammar_density_penalty(issues, len(text.split()))
 
 
 SYNONYM_MAP = {
@@ -194,31 +242,42 @@ def tense_inconsistency_by_experience(exp_text: str) -> int:
     return 0
 
 
-def online_link_penalty_and_notes(text: str, timeout: float = 3.0) -> Tuple[int, List[str]]:
-    """Attempt HEAD requests to LinkedIn/GitHub URLs; penalize broken. No-op on network errors."""
+def broken_profile_links(text: str, timeout: float = 3.0, budget_s: Optional[float] = None) -> List[str]:
+    """HEAD-check LinkedIn/GitHub URLs in the text; returns the broken ones (network errors count as broken).
+    budget_s bounds the whole check: per-URL timeouts shrink to fit and unchecked URLs are not reported."""
     try:
         import re as _re
         import urllib.request as _url
         urls = _re.findall(r"https?://[^\s)]+", text)
         check = [u for u in urls if "linkedin.com" in u or "github.com" in u]
         broken: List[str] = []
+        end = time.monotonic() + budget_s if budget_s is not None else None
         for u in check[:10]:  # cap
+            url_timeout = timeout
+            if end is not None:
+                url_timeout = min(timeout, end - time.monotonic())
+                if url_timeout <= 0:
+                    break
             try:
                 req = _url.Request(u, method="HEAD")
-                with _url.urlopen(req, timeout=timeout) as resp:
+                with _url.urlopen(req, timeout=url_timeout) as resp:
                     code = getattr(resp, 'status', 200)
                     if code >= 400:
                         broken.append(u)
             except Exception:
                 broken.append(u)
-        if len(broken) >= 3:
-            return 3, broken
-        if len(broken) == 2:
-            return 2, broken
-        if len(broken) == 1:
-            return 1, broken
-        return 0, []
+        return broken
     except Exception:
-        return 0, []
+        return []
+
+
+def broken_link_penalty(broken: List[str]) -> int:
+    return min(3, len(broken))
+
+
+def online_link_penalty_and_notes(text: str, timeout: float = 3.0) -> Tuple[int, List[str]]:
+    """Attempt HEAD requests to LinkedIn/GitHub URLs; penalize broken. No-op on network errors."""
+    broken = broken_profile_links(text, timeout)
+    return broken_link_penalty(broken), broken
 
 
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Canonical section -> heading lines that open it (compared lowercased, whole line)
+SECTION_HEADINGS: Dict[str, List[str]] = {
+    "experience": [
+        "work experience", "professional experience", "employment history",
+        "career history", "work history", "experience", "employment",
+        "professional background", "career summary", "work summary",
+        "relevant experience", "experience details", "projects",
+    ],
+    "education": [
+        "education", "educational background", "academic background",
+        "qualifications", "academic qualifications", "degrees",
+        "certifications", "training", "learning", "education and training",
+        "education & certifications", "education and certifications", "academics",
+    ],
+    "skills": [
+        "skills", "technical skills", "core competencies", "abilities",
+        "expertise", "proficiencies", "competencies", "technologies",
+        "technical expertise", "key skills", "skills & tools", "skill highlights",
+        "highlights", "summary of skills", "computer skills", "core qualifications",
+    ],
+    "contact": [
+        "contact", "contact information", "personal information",
+        "personal details", "contact details", "reach me",
+    ],
+    "summary": [
+        "summary", "profile", "professional summary", "executive summary",
+        "executive profile", "professional profile", "objective", "career objective",
+    ],
+    "accomplishments": ["accomplishments", "core accomplishments", "achievements", "awards"],
+    "interests": ["interests", "hobbies"],
+    "languages": ["languages"],
+    "references": ["references"],
+    "additional": ["additional information", "volunteer experience", "volunteer work"],
+}
+
+SECTION_ALIASES: Dict[str, str] = {
+    heading: canonical
+    for canonical, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+# One pass over the text: a heading starts a line (optionally bulleted / numbered) with a
+# known heading that either fills the line (optionally ending with ':' or a dash) or is
+# followed by ':' and content on the same line ("Skills: Python, Java"). Matching on a
+# leading "\n" (instead of ^ with re.MULTILINE) lets the engine skip to line starts.
+_HEADING_RE = re.compile(
+    r"\n[^\S\n]*(?:[-*•#>|]+[^\S\n]*|\d{1,2}[.)][^\S\n]*)?"
+    r"(?P<heading>" + "|".join(re.escape(h) for h in sorted(SECTION_ALIASES, key=len, reverse=True)) + r")"
+    r"[^\S\n]*(?:[:\-–—]?[^\S\n]*(?=\n)|:)",
+    re.IGNORECASE,
+)
+# Presence test only, so one local-part character is enough: `[...]+@` would restart at
+# every character of a long token (quadratic on uploaded text).
+_CONTACT_RE = re.compile(r"[A-Za-z0-9._%+-]@[A-Za-z0-9.-]+\.[A-Za-z]{2}|\+?\d[\d ()-]{8,}\d")
+
+
+@dataclass
+class SectionSpan:
+    """A contiguous block of the CV: heading line through the line before the next heading."""
+    heading: str
+    canonical: str
+    start_line: int
+    end_line: int  # exclusive
+    start: int
+    end: int  # exclusive char offset
+    text: str
+
+
+def line_starts(text: str) -> List[int]:
+    starts = [0]
+    pos = text.find("\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+    return starts
+
+
+def segment_sections(text: str) -> List[SectionSpan]:
+    """Split a CV into complete, non-overlapping spans covering the whole text.
+
+    Lines before the first heading form a "header" span (treated as the contact
+    block when it carries an email or phone number).
+    """
+    starts = line_starts(text)
+    n_lines = len(starts)
+    # In the padded text the leading "\n" of a match sits at the line's original start offset
+    headings = [
+        (bisect_right(starts, m.start()) - 1, m.group("heading").lower())
+        for m in _HEADING_RE.finditer("\n" + text + "\n")
+    ]
+
+    spans: List[SectionSpan] = []
+
+    def add(heading: str, canonical: str, first: int, last: int):
+        start = starts[first]
+        end = starts[last] if last < n_lines else len(text)
+        spans.append(SectionSpan(heading, canonical, first, last, start, end, text[start:end]))
+
+    first_heading = headings[0][0] if headings else n_lines
+    header = text[:starts[first_heading] if first_heading < n_lines else len(text)]
+    if header.strip():
+        add("", "contact" if _CONTACT_RE.search(header) else "header", 0, first_heading)
+    for i, (line_no, heading) in enumerate(headings):
+        next_line = headings[i + 1][0] if i + 1 < len(headings) else n_lines
+        add(heading, SECTION_ALIASES[heading], line_no, next_line)
+    return spans
+
+
+def canonical_sections(spans: List[SectionSpan]) -> Dict[str, str]:
+    """Merge spans under their canonical key (experience, education, skills, ...)."""
+    sections: Dict[str, str] = {}
+    for span in spans:
+        if span.canonical == "header":
+            continue
+        body = span.text.strip()
+        sections[span.canonical] = (sections[span.canonical] + "\n" + body) if span.canonical in sections else body
+    return sections
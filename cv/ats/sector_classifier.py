@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import argparse
+import json
+import pickle
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Optional: scikit-learn / numpy (keyword-ratio detection is used without them)
+try:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+# ===== Sector classifier =====
+# Sublinear TF-IDF (uni+bigrams) -> multinomial logistic regression, trained on the
+# labelled PDF corpus (data/data/<SECTOR>). A batch is one sparse matrix product plus
+# a softmax. Probabilities are temperature-scaled on a held-out split so that
+# "confidence" reads as the probability of the top sector being right.
+
+MODEL_PATH = Path("models/sector_classifier.pkl")
+MODEL_FORMAT = 1
+TEMPERATURES = [round(0.05 * 1.05 ** i, 4) for i in range(110)]  # 0.05 .. ~10, geometric
+
+# sector, confidence, [(alternative, probability), ...]
+Prediction = Tuple[str, float, List[Tuple[str, float]]]
+
+
+class SectorClassifier:
+    def __init__(self, vectorizer, coef, intercept, classes: List[str], temperature: float = 1.0,
+                 metrics: Optional[Dict] = None):
+        self.vectorizer = vectorizer
+        self.coef_t = np.ascontiguousarray(coef.T)  # features x classes
+        self.intercept = intercept
+        self.classes = list(classes)
+        self.temperature = temperature
+        self.metrics = metrics or {}
+
+    @classmethod
+    def train(cls, texts: Sequence[str], labels: Sequence[str], holdout: float = 0.2,
+              C: float = 30.0, max_features: int = 50000, seed: int = 13) -> "SectorClassifier":
+        """Fit on a stratified split; the held-out part sets the temperature and the reported metrics."""
+        train_idx, held_idx = _stratified_split(labels, holdout, seed)
+        vectorizer = TfidfVectorizer(sublinear_tf=True, ngram_range=(1, 2), min_df=2, max_df=0.5,
+                                     max_features=max_features, dtype=np.float32)
+        x_train = vectorizer.fit_transform([texts[i] for i in train_idx])
+        model = LogisticRegression(C=C, max_iter=1000)
+        model.fit(x_train, [labels[i] for i in train_idx])
+        clf = cls(vectorizer, model.coef_.astype(np.float32), model.intercept_.astype(np.float32),
+                  [str(c) for c in model.classes_])
+        if held_idx:
+            logits = clf._logits([texts[i] for i in held_idx])
+            y = np.array([clf.classes.index(labels[i]) for i in held_idx])
+            clf.temperature = _fit_temperature(logits, y)
+            clf.metrics = _metrics(_softmax(logits / clf.temperature), y)
+        clf.metrics.update({"train_documents": len(train_idx), "heldout_documents": len(held_idx),
+                            "temperature": clf.temperature})
+        return clf
+
+    def _logits(self, texts: Sequence[str]):
+        return np.asarray(self.vectorizer.transform(texts) @ self.coef_t) + self.intercept
+
+    def predict_proba(self, texts: Sequence[str]):
+        """documents x classes (order: self.classes)"""
+        return _softmax(self._logits(texts) / self.temperature)
+
+    def predict(self, texts: Sequence[str], alternatives: int = 2) -> List[Prediction]:
+        if not texts:
+            return []
+        probs = self.predict_proba(texts)
+        order = np.argsort(-probs, axis=1, kind="stable")[:, :alternatives + 1]
+        out = []
+        for row, idx in zip(probs, order):
+            ranked = [(self.classes[j], round(float(row[j]), 4)) for j in idx]
+            out.append((ranked[0][0], ranked[0][1], ranked[1:]))
+        return out
+
+    def save(self, path: Path = MODEL_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "format": MODEL_FORMAT,
+            "vectorizer": self.vectorizer,
+            "coef": self.coef_t.T,
+            "intercept": self.intercept,
+            "classes": self.classes,
+            "temperature": self.temperature,
+            "metrics": self.metrics,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> Optional["SectorClassifier"]:
+        """None if there is no usable model (missing file, other format, no scikit-learn)."""
+        if not SKLEARN_AVAILABLE or not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+            if state.get("format") != MODEL_FORMAT:
+                return None
+            return cls(state["vectorizer"], state["coef"], state["intercept"], state["classes"],
+                       state["temperature"], state.get("metrics"))
+        except Exception as e:
+            print(f"Sector model load error: {e}")
+            return None
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _fit_temperature(logits, y) -> float:
+    """Temperature with the lowest held-out negative log-likelihood"""
+    best_t, best_nll = 1.0, float("inf")
+    for t in TEMPERATURES:
+        p = _softmax(logits / t)[np.arange(len(y)), y]
+        nll = float(-np.log(np.maximum(p, 1e-12)).mean())
+        if nll < best_nll:
+            best_t, best_nll = t, nll
+    return best_t
+
+
+def _metrics(probs, y, bins: int = 10) -> Dict:
+    pred = probs.argmax(axis=1)
+    conf = probs.max(axis=1)
+    correct = pred == y
+    top3 = (np.argsort(-probs, axis=1)[:, :3] == y[:, None]).any(axis=1)
+    # expected calibration error over equal-width confidence bins
+    ece = 0.0
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        mask = (conf > lo) & (conf <= hi)
+        if mask.any():
+            ece += mask.mean() * abs(correct[mask].mean() - conf[mask].mean())
+    return {
+        "accuracy": round(float(correct.mean()), 4),
+        "top3_accuracy": round(float(top3.mean()), 4),
+        "ece": round(float(ece), 4),
+        "mean_confidence": round(float(conf.mean()), 4),
+    }
+
+
+def _stratified_split(labels: Sequence[str], holdout: float, seed: int) -> Tuple[List[int], List[int]]:
+    by_label: Dict[str, List[int]] = {}
+    for i, label in enumerate(labels):
+        by_label.setdefault(label, []).append(i)
+    rng = random.Random(seed)
+    train, held = [], []
+    for label in sorted(by_label):
+        idx = by_label[label]
+        rng.shuffle(idx)
+        n_held = int(len(idx) * holdout) if len(idx) >= 5 else 0
+        held.extend(idx[:n_held])
+        train.extend(idx[n_held:])
+    return sorted(train), sorted(held)
+
+
+def main():
+    # Run from cv/: python -m ats.sector_classifier
+    from corpus import DEFAULT_CACHE_PATH, default_data_root, load_pdf_corpus
+
+    parser = argparse.ArgumentParser(description="Train the sector classifier on the labelled PDF corpus")
+    parser.add_argument("--cache", type=str, default=str(DEFAULT_CACHE_PATH), help="PDF corpus text cache")
+    parser.add_argument("--out", type=str, default=str(MODEL_PATH), help="Model output path")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Held-out fraction for calibration/metrics")
+    parser.add_argument("--C", type=float, default=30.0, help="Inverse regularization strength")
+    args = parser.parse_args()
+
+    if not SKLEARN_AVAILABLE:
+        raise SystemExit("Training needs scikit-learn. Install: pip install scikit-learn")
+    docs = [d for d in load_pdf_corpus(default_data_root(), Path(args.cache)) if d.text.strip()]
+    clf = SectorClassifier.train([d.text for d in docs], [d.sector for d in docs], args.holdout, args.C)
+    clf.save(Path(args.out))
+    print(json.dumps(clf.metrics, indent=2))
+    print(f"Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
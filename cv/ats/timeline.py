@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+# ===== CV timeline =====
+# One pass over the text finds every date (month name + year in English or Turkish,
+# numeric MM/YYYY, DD.MM.YYYY, MM/DD/YYYY, YYYY-MM, bare years) and joins
+# "<date> - <date>" / "<date> - Present" into intervals. The date rules (consistency,
+# gaps, overlaps, reverse chronology) all read the same Timeline.
+# Months are indexed as year * 12 + month - 1; a bare year sits at mid-year (June).
+
+MIN_YEAR = 1950
+MAX_YEARS_AHEAD = 10
+
+_MONTHS: Dict[str, int] = {
+    # English
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3, "april": 4, "apr": 4,
+    "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7, "august": 8, "aug": 8,
+    "september": 9, "sept": 9, "sep": 9, "october": 10, "oct": 10, "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+    # Turkish (ASCII-folded, see _month_key)
+    "ocak": 1, "oca": 1, "subat": 2, "sub": 2, "mart": 3, "nisan": 4, "nis": 4, "mayis": 5,
+    "haziran": 6, "haz": 6, "temmuz": 7, "tem": 7, "agustos": 8, "agu": 8, "eylul": 9, "eyl": 9,
+    "ekim": 10, "eki": 10, "kasim": 11, "kas": 11, "aralik": 12, "ara": 12,
+}
+_TR_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_MONTH_SPELLINGS = sorted(
+    set(_MONTHS) | {"şubat", "şub", "mayıs", "ağustos", "ağu", "eylül", "kasım", "aralık"}, key=len, reverse=True
+)
+
+_YEAR = r"(?:19|20)\d{2}"
+# Every branch starts at a word boundary and its runs use disjoint classes: linear time
+DATE_TOKEN_RE = re.compile(
+    rf"\b(?:(?P<mon>{'|'.join(_MONTH_SPELLINGS)})\.?,?[^\S\n]*(?:\d{{1,2}},?[^\S\n]*)?(?P<y1>{_YEAR})"
+    rf"|(?:(?P<a>\d{{1,2}})(?P<sep>[./-]))?(?P<b>\d{{1,2}})[./-](?P<y2>{_YEAR})"
+    rf"|(?P<y3>{_YEAR})(?:[./-](?P<m3>\d{{1,2}})(?:[./-]\d{{1,2}})?)?)\b",
+    re.IGNORECASE,
+)
+RANGE_SEP_RE = re.compile(r"[^\S\n]*(?:[-–—]+|to|until|till|through)[^\S\n]*", re.IGNORECASE)
+PRESENT_RE = re.compile(
+    r"(?:present|current|now|today|date|ongoing|günümüz|gunumuz|halen|hala|hâlâ|devam ediyor|şu an|su an)\b",
+    re.IGNORECASE,
+)
+
+
+def _month_key(name: str) -> str:
+    return name.lower().translate(_TR_FOLD).rstrip(".")
+
+
+@dataclass(frozen=True)
+class DateMention:
+    month: int    # year * 12 + month - 1
+    precise: bool  # month known (not a bare year)
+    style: str    # "name", "numeric" or "year"
+    pos: int      # offset in the text
+
+
+@dataclass(frozen=True)
+class Interval:
+    start: int
+    end: int
+    precise: bool  # both ends month-precise (an ongoing end counts as precise)
+    ongoing: bool
+    pos: int
+
+
+@dataclass
+class Timeline:
+    """Dates of one CV: ranges as intervals, every other date as a point (both in text order)"""
+    mentions: List[DateMention] = field(default_factory=list)
+    intervals: List[Interval] = field(default_factory=list)
+    points: List[DateMention] = field(default_factory=list)
+
+    def distinct_dates(self) -> int:
+        return len({(m.month, m.precise) for m in self.mentions})
+
+    def style_share(self) -> float:
+        """Share of month-precise dates written in the most common style (1.0 below two)"""
+        styles = [m.style for m in self.mentions if m.precise]
+        if len(styles) < 2:
+            return 1.0
+        return max(styles.count(s) for s in set(styles)) / len(styles)
+
+    def max_gap_months(self) -> int:
+        """Largest gap in the merged coverage of the date ranges. Standalone dates (birth
+        dates, graduation years, "ISO 9001:2008") are ignored when any range exists;
+        without ranges, the gap between distinct dates"""
+        if self.intervals:
+            spans = sorted((i.start, i.end) for i in self.intervals)
+        else:
+            spans = [(m, m) for m in sorted({p.month for p in self.mentions})]
+        gap, covered = 0, None
+        for start, end in spans:
+            if covered is not None and start > covered:
+                gap = max(gap, start - covered)
+            covered = end if covered is None else max(covered, end)
+        return gap
+
+    def overlaps(self, within: Optional[List[Tuple[int, int]]] = None) -> int:
+        """Month-precise ranges starting before the ranges sorted ahead of them have ended.
+        Year-only ranges are too coarse to tell an overlap from a handover, and a range
+        repeated verbatim counts once. `within`: only ranges at these (start, end) text offsets."""
+        spans = sorted({
+            (i.start, i.end) for i in self.intervals
+            if i.precise and (within is None or any(lo <= i.pos < hi for lo, hi in within))
+        })
+        count, covered = 0, None
+        for start, end in spans:
+            if covered is not None and start < covered:
+                count += 1
+                covered = max(covered, end)
+            else:
+                covered = end
+        return count
+
+    def reverse_order_ratio(self) -> Optional[float]:
+        """Share of consecutive entries (ranges by end, other dates) where the later entry is newer;
+        None with fewer than 3 entries"""
+        entries = sorted([(i.pos, i.end) for i in self.intervals] + [(p.pos, p.month) for p in self.points])
+        if len(entries) < 3:
+            return None
+        newer = sum(1 for (_, a), (_, b) in zip(entries, entries[1:]) if a < b)
+        return newer / (len(entries) - 1)
+
+
+def _mention(m: re.Match) -> DateMention:
+    if m.group("y1"):
+        year, month, style = int(m.group("y1")), _MONTHS.get(_month_key(m.group("mon"))), "name"
+    elif m.group("y2"):
+        year, style = int(m.group("y2")), "numeric"
+        a, b = m.group("a"), int(m.group("b"))
+        if a is None:
+            month = b  # MM/YYYY
+        elif int(a) > 12 or (m.group("sep") != "/" and b <= 12):
+            month = b  # DD.MM.YYYY / DD-MM-YYYY
+        else:
+            month = int(a)  # MM/DD/YYYY
+    else:
+        year, style = int(m.group("y3")), "year"
+        month = int(m.group("m3")) if m.group("m3") else None
+        if month is not None:
+            style = "numeric"
+    if month is not None and not 1 <= month <= 12:
+        month, style = None, "year"
+    return DateMention(year * 12 + (month or 6) - 1, month is not None, style, m.start())
+
+
+def extract_timeline(text: str, today: Optional[date] = None) -> Timeline:
+    today = today or date.today()
+    now = today.year * 12 + today.month - 1
+    max_year = today.year + MAX_YEARS_AHEAD
+    tokens: List[Tuple[re.Match, DateMention]] = []
+    for m in DATE_TOKEN_RE.finditer(text):
+        mention = _mention(m)
+        if MIN_YEAR <= mention.month // 12 <= max_year:
+            tokens.append((m, mention))
+
+    timeline = Timeline(mentions=[t[1] for t in tokens])
+    i = 0
+    while i < len(tokens):
+        match, first = tokens[i]
+        sep = RANGE_SEP_RE.match(text, match.end())
+        if sep:
+            if i + 1 < len(tokens) and tokens[i + 1][0].start() == sep.end():
+                second = tokens[i + 1][1]
+                start, end = sorted((first.month, second.month))
+                timeline.intervals.append(Interval(start, end, first.precise and second.precise, False, first.pos))
+                i += 2
+                continue
+            if PRESENT_RE.match(text, sep.end()):
+                timeline.intervals.append(Interval(first.month, max(first.month, now), first.precise, True, first.pos))
+                i += 1
+                continue
+        timeline.points.append(first)
+        i += 1
+    return timeline
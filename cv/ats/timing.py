@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class StageTimings:
+    """Accumulated wall time per pipeline stage plus simple event counters.
+
+    Stage times are exclusive: time spent in a nested stage is not counted
+    again in its parent, so the stages add up to (roughly) the total.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.total: float = 0.0
+        self._nested: List[float] = []
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def incr(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self) -> Dict:
+        return {
+            "total_ms": round(self.total * 1000, 2),
+            "stages_ms": {k: round(v * 1000, 2) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+_current: ContextVar[Optional[StageTimings]] = ContextVar("ats_stage_timings", default=None)
+_listener: ContextVar[Optional[Callable[[Dict], None]]] = ContextVar("ats_progress_listener", default=None)
+
+
+@contextmanager
+def collect() -> Iterator[StageTimings]:
+    """Activate a fresh collector for the current context (thread/task)."""
+    timings = StageTimings()
+    token = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.total = time.perf_counter() - start
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block into the active collector. No-op (one lookup) when none is active."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    progress(name)
+    start = time.perf_counter()
+    timings._nested.append(0.0)
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.add(name, elapsed - timings._nested.pop())
+        if timings._nested:
+            timings._nested[-1] += elapsed
+
+
+def incr(name: str, n: int = 1):
+    """Bump a counter on the active collector, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.incr(name, n)
+
+
+@contextmanager
+def listen(callback: Callable[[Dict], None]) -> Iterator[None]:
+    """Send progress events ({"stage", ...detail}) of the current context to callback.
+    Stages report themselves when they start (inside collect()); loops add detail via progress()."""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def progress(stage_name: str, **detail):
+    """Report progress to the active listener, if any (e.g. progress("ocr", page=3, pages=5))."""
+    callback = _listener.get()
+    if callback is not None:
+        try:
+            callback({"stage": stage_name, **detail})
+        except Exception as e:
+            print(f"Progress listener error: {e}")
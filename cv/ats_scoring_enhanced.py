@@ -14,13 +14,21 @@ Features:
 from __future__ import annotations
 
 import json
+import os
 import re
+import sys
+import threading
+import time
 import hashlib
 import argparse
-from dataclasses import dataclass
+import contextlib
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from collections import Counter
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 from ats.rules_extras import (
     header_footer_contact_penalty,
     hyphenation_penalty,
@@ -31,12 +39,44 @@ from ats.rules_extras import (
     acronym_full_form_note,
     tense_inconsistency_penalty,
     link_validity_penalty,
-    spelling_grammar_penalty,
+    spelling_grammar_issues,
+    grammar_check_available,
+    grammar_density_penalty,
     normalize_tokens,
-    ROLE_PRESETS,
-    infer_role_from_jd,
-    tense_inconsistency_by_experience,
-    online_link_penalty_and_notes,
+    broken_profile_links,
+    broken_link_penalty,
+    cap_text,
+    EMAIL_RE,
+    PHONE_RE,
+    HYPHENATION_RE,
+    MAX_PDF_PAGES,
+    MAX_TEXT_CHARS,
+)
+from ats.deadline import STAGE_PRIORITY, Deadline, StageCosts
+from ats.fingerprint import FINGERPRINT_VERSION, NearDuplicateIndex, canonical_text, content_fingerprint, simhash
+from ats.timeline import Timeline, extract_timeline
+from ats.percentiles import PERCENTILES_PATH, ScoreDistribution
+from ats.jd_profile import (
+    JD_STOPWORDS,
+    JDCatalogue,
+    JDProfile,
+    apply_must_have_cap,
+    compile_jd_profile,
+    tokenize_keywords,
+)
+from ats.lexicon import WORD_RE, KeywordMatcher, get_lexicons, plan_keywords, text_tokens
+from ats.sections import canonical_sections, segment_sections
+from ats.sector_classifier import MODEL_PATH as SECTOR_MODEL_PATH, SectorClassifier
+from ats.feature_matrix import (
+    COLUMN_INDEX,
+    FEATURE_COLUMNS,
+    LATE_PENALTY_NOTES,
+    PENALTY_COLUMNS,
+    PENALTY_NOTES,
+    SECTION_WEIGHTS,
+    empty_matrix,
+    length_component,
+    score_features,
 )
 from ats.rules_extras import (
     header_footer_contact_penalty,
@@ -48,6 +88,7 @@ from ats.rules_extras import (
     acronym_full_form_note,
 )
 
+from ats import timing
 from cv_analyzer_prototype import CVAnalyzer
 from semantic_enhancer import EnhancedKeywordMatcher
 
@@ -61,10 +102,14 @@ except ImportError:
     OCR_AVAILABLE = False
     print("Warning: OCR dependencies not available. Install: pip install pytesseract pillow PyMuPDF")
 
-# Email, phone, date patterns
-EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
-PHONE_RE = re.compile(r"\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}\b")
-DATE_RE = re.compile(r"\b(?:\d{1,2}[\-/]\d{1,2}[\-/]\d{2,4}|\w+\s+\d{4}|\d{4})\b", re.IGNORECASE)
+# Patterns (email/phone: ats.rules_extras, dates: ats.timeline). All linear in the input.
+SUMMARY_HEADING_RE = re.compile(r"(summary|objective|profile)[^\S\n]*\n", re.IGNORECASE)
+LEADING_WS_RE = re.compile(r"\s*")
+QUANTIFIED_RE = re.compile(r"\b\d+%|\$\d+")
+IMPACT_VERB_RE = re.compile(r"increased|reduced|improved", re.IGNORECASE)
+DIGIT_RE = re.compile(r"\d")
+PROFILE_LINK_RE = re.compile(r"\b(linkedin\.com|github\.com|portfolio|behance|kaggle)\b", re.IGNORECASE)
+BULLET_MARKERS = ["•", "- ", "* "]
 
 @dataclass
 class ScoreBreakdown:
@@ -76,6 +121,8 @@ class ScoreBreakdown:
     completeness: int
     notes: List[str]
     impact_estimates: Dict[str, int]  # Estimated points for each recommendation
+    # Raw, weight-independent signals behind the scores (see feature_store.FEATURE_COLUMNS)
+    features: Dict[str, float] = field(default_factory=dict)
 
 @dataclass
 class SectorDetection:
@@ -99,7 +146,7 @@ class ATSConfig:
         # Default config
         return {
             "version": "1.0.0",
-            "rules_version": "1.0.0",
+            "rules_version": "1.1.0",
             "lexicon_version": "1.0.0",
             "scoring_weights": {
                 "sections": 30, "formatting": 20, "keywords": 30, 
@@ -122,20 +169,25 @@ class ATSConfig:
         return base_weight
 
 class CacheManager:
-    def __init__(self, cache_dir: str = "cache"):
+    def __init__(self, cache_dir: str = "cache", lexicon_version: str = "",
+                 near_duplicates: bool = False, near_duplicate_distance: int = 3):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
+        self.lexicon_version = lexicon_version
+        # Opt-in: a one-word edit is already ~3 SimHash bits, so reuse can serve a stale score
+        self.near_duplicate_distance = near_duplicate_distance
+        self.near_index = NearDuplicateIndex(self.cache_dir / "near_duplicates.jsonl") if near_duplicates else None
     
     def _get_cache_key(self, cv_text: str, sector: str, config_version: str) -> str:
-        """Generate cache key from CV content, sector, and config version"""
-        content = f"{cv_text}|{sector}|{config_version}"
+        """Generate cache key from canonical CV content, sector, config and lexicon version"""
+        content = f"{content_fingerprint(cv_text)}|v{FINGERPRINT_VERSION}|{sector}|{config_version}|{self.lexicon_version}"
         return hashlib.md5(content.encode('utf-8')).hexdigest()
     
-    def get_cached_score(self, cv_text: str, sector: str, config_version: str) -> Optional[Dict]:
-        """Get cached score if available"""
-        cache_key = self._get_cache_key(cv_text, sector, config_version)
+    def _scope(self, sector: str, config_version: str) -> str:
+        return f"{sector}|{config_version}|{self.lexicon_version}"
+    
+    def _read(self, cache_key: str) -> Optional[Dict]:
         cache_file = self.cache_dir / f"{cache_key}.json"
-        
         if cache_file.exists():
             try:
                 with open(cache_file, 'r', encoding='utf-8') as f:
@@ -144,65 +196,90 @@ class CacheManager:
                 pass
         return None
     
+    def get_cached_score(self, cv_text: str, sector: str, config_version: str) -> Optional[Dict]:
+        """Get cached score if available (same canonical text, else a near-duplicate if enabled)"""
+        cached = self._read(self._get_cache_key(cv_text, sector, config_version))
+        if cached is not None or self.near_index is None:
+            return cached
+        key = self.near_index.find(simhash(cv_text), self._scope(sector, config_version),
+                                   self.near_duplicate_distance)
+        cached = self._read(key) if key else None
+        if cached is not None:
+            cached["cache_match"] = "near_duplicate"
+        return cached
+    
     def cache_score(self, cv_text: str, sector: str, config_version: str, result: Dict):
-        """Cache scoring result"""
+        """Cache scoring result (write to a private temp file, then rename: safe with concurrent writers)"""
         cache_key = self._get_cache_key(cv_text, sector, config_version)
         cache_file = self.cache_dir / f"{cache_key}.json"
+        tmp_file = self.cache_dir / f"{cache_key}.{os.getpid()}.{threading.get_ident()}.tmp"
         
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(result, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
         except Exception as e:
             print(f"Cache write error: {e}")
+            return
+        if self.near_index is not None:
+            self.near_index.add(simhash(cv_text), self._scope(sector, config_version), cache_key)
+
+SECTION_CACHE_SIZE = 4096
+RESCORE_BUDGET_MS = 1000.0  # grammar/link checks of not yet checked sections per rescore
+
+
+class SectionFeatureCache:
+    """Features of CV sections for live rescoring, kept in the (warm) scoring process.
+    Keyed by section text hash, sector, config and lexicon version; least recently used
+    entries are dropped. Clients only send text, never features."""
+
+    def __init__(self, max_entries: int = SECTION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            features = self._entries.get(key)
+            if features is not None:
+                self._entries.move_to_end(key)
+            return features
+
+    def put(self, key: str, features: Dict):
+        with self._lock:
+            self._entries[key] = features
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
 
 class SectorDetector:
     def __init__(self, config: ATSConfig):
         self.config = config
-        self.sector_keywords = self._load_sector_keywords()
-    
-    def _load_sector_keywords(self) -> Dict[str, List[str]]:
-        """Load sector keywords from lexicon"""
-        lex_path = Path("lexicons/sector_keywords.json")
-        if lex_path.exists():
-            try:
-                return json.loads(lex_path.read_text(encoding="utf-8"))
-            except Exception:
-                pass
-        
-        # Fallback minimal keywords
-        return {
-            "INFORMATION-TECHNOLOGY": [
-                "python", "java", "javascript", "react", "node", "api", "cloud",
-                "docker", "kubernetes", "sql", "microservices", "aws", "azure"
-            ],
-            "FINANCE": [
-                "budget", "forecast", "sap", "excel", "financial analysis",
-                "audit", "ifrs", "tax", "valuation", "risk"
-            ],
-            "ENGINEERING": [
-                "cad", "autocad", "solidworks", "mechanical", "electrical",
-                "embedded", "matlab", "simulation", "qa", "testing"
-            ],
-            "HEALTHCARE": [
-                "patient", "clinical", "hospital", "emr", "ehr", "compliance",
-                "diagnosis", "treatment", "pharma", "laboratory"
-            ],
-            "ACCOUNTANT": [
-                "bookkeeping", "ledger", "reconciliation", "payable", "receivable",
-                "gst", "vat", "tax", "audit", "tally"
-            ]
-        }
+        self.lexicons = get_lexicons()
+        self.sector_keywords = self.lexicons.sector_keywords
+        # Trained classifier (python -m ats.sector_classifier); keyword ratio without it
+        self.classifier = SectorClassifier.load(Path(config.config.get("sector_model", str(SECTOR_MODEL_PATH))))
     
     def detect_sector(self, cv_text: str) -> SectorDetection:
         """Detect most likely sector from CV content"""
+        if self.classifier is not None:
+            return self.detect_many([cv_text])[0]
+        return self._detect_by_keywords(cv_text)
+    
+    def detect_many(self, cv_texts: List[str]) -> List[SectorDetection]:
+        """Batch detection; with the classifier this is one sparse matrix product"""
+        if self.classifier is None:
+            return [self._detect_by_keywords(t) for t in cv_texts]
+        return [SectorDetection(sector, conf, alts) for sector, conf, alts in self.classifier.predict(cv_texts)]
+    
+    def _detect_by_keywords(self, cv_text: str) -> SectorDetection:
+        """Share of each sector's keywords present in the text"""
         text_lower = cv_text.lower()
+        tokens = text_tokens(text_lower)
         sector_scores = {}
         
         for sector, keywords in self.sector_keywords.items():
-            hits = 0
-            for keyword in keywords:
-                if re.search(rf'\b{re.escape(keyword.lower())}\b', text_lower):
-                    hits += 1
+            hits = self.lexicons.sector_matcher(sector).count(text_lower, tokens)
             
             # Normalize by keyword count
             score = hits / len(keywords) if keywords else 0
@@ -219,30 +296,46 @@ class SectorDetector:
         
         return SectorDetection(best_sector, best_score, alternatives)
 
+# Texts per process-pool task in EnhancedATSScorer.score_batch
+BATCH_CHUNK_SIZE = 64
+
+_batch_worker_scorer = None
+
+
+def _feature_batch_worker(task: Tuple[str, List[str], List[str], Tuple[str, ...]]) -> np.ndarray:
+    """Process-pool task: one scorer per worker process, reused across chunks."""
+    global _batch_worker_scorer
+    config_path, texts, sectors, optional_stages = task
+    if _batch_worker_scorer is None or str(_batch_worker_scorer.config.config_path) != config_path:
+        _batch_worker_scorer = EnhancedATSScorer(config_path)
+    return _batch_worker_scorer.extract_feature_matrix(texts, sectors, optional_stages)
+
+
 class EnhancedATSScorer:
     def __init__(self, config_path: str = "config.json"):
         self.config = ATSConfig(config_path)
-        self.cache = CacheManager()
+        self.lexicons = get_lexicons()
+        self.cache = CacheManager(lexicon_version=self.lexicons.version,
+                                  near_duplicates=self.config.config.get("near_duplicate_cache", False),
+                                  near_duplicate_distance=self.config.config.get("near_duplicate_distance", 3))
+        self.section_cache = SectionFeatureCache(self.config.config.get("section_cache_size", SECTION_CACHE_SIZE))
         self.sector_detector = SectorDetector(self.config)
-        self.analyzer = None
+        # Built once here (never lazily) so one scorer can be shared across threads
+        self.analyzer = CVAnalyzer(self.config.config.get("data_root", "data"))
         
         # Load action verbs
         self.action_verbs = self._load_action_verbs()
         
         # Initialize semantic enhancer
         self.semantic_enhancer = EnhancedKeywordMatcher()
+        # After the enhancer: the arrays must match the stages live scoring runs
+        self.score_distribution = self._load_score_distribution()
         
-        # Runtime context (filename, page count, etc.)
-        self._ctx: Dict[str, Optional[str]] = {"filename": None, "page_count": None}
+        # Expected cost of optional stages for time-budgeted scoring (updated as they run)
+        self.stage_costs = StageCosts(self.config.config.get("stage_cost_ms"))
         
-        # Minimal stopwords for JD token filtering (keep deterministic, no extra deps)
-        self._stopwords = set([
-            "the","and","for","with","from","this","that","your","you","our","their",
-            "a","an","to","of","in","on","at","as","by","is","are","be","or","we",
-            "using","use","used","will","can","ability","experience","skills","skill",
-            "responsibilities","responsibility","requirements","requirement","preferred","must",
-            "include","including","such","etc","about","more","minimum","years","year"
-        ])
+        # Minimal stopwords for JD token filtering (shared with candidate ranking)
+        self._stopwords = JD_STOPWORDS
 
     # ===== Additional formatting/content heuristics from checklist =====
     def _header_footer_contact_penalty(self, text: str) -> int:
@@ -259,7 +352,7 @@ class EnhancedATSScorer:
 
     def _hyphenation_penalty(self, text: str) -> int:
         """Detect word hyphenation across line breaks: exam-\nple."""
-        if re.search(r"[A-Za-z]{3,}-\s*\n\s*[A-Za-z]{2,}", text):
+        if HYPHENATION_RE.search(text):
             return 2
         return 0
 
@@ -365,68 +458,58 @@ class EnhancedATSScorer:
         return note
     
     def _load_action_verbs(self) -> List[str]:
-        """Load action verbs from lexicon"""
-        base_verbs: List[str] = []
-        candidates = [
-            Path("lexicons/action_verbs_extended.json"),
-            Path("lexicons/action_verbs.json"),
-        ]
-        for p in candidates:
-            if p.exists():
-                try:
-                    data = json.loads(p.read_text(encoding="utf-8"))
-                    if isinstance(data, list):
-                        base_verbs.extend([str(x).strip() for x in data if str(x).strip()])
-                except Exception:
-                    continue
-        if not base_verbs:
-            # Fallback
-            base_verbs = [
-                "led", "managed", "developed", "designed", "implemented", "optimized",
-                "built", "created", "delivered", "launched", "increased", "reduced",
-                "improved", "streamlined", "automated", "migrated", "analyzed",
-                "architected", "coordinated", "facilitated", "mentored"
-            ]
-        # Deduplicate and normalize lowercase
-        dedup = sorted(set(v.lower() for v in base_verbs))
-        return dedup
+        """Action verbs: extended + base lexicon, lowercased and deduplicated"""
+        return self.lexicons.action_verbs_merged
     
-    def _get_analyzer(self, data_root: str) -> CVAnalyzer:
-        """Get analyzer instance"""
-        if self.analyzer is None:
-            self.analyzer = CVAnalyzer(data_root)
+    def _get_analyzer(self) -> CVAnalyzer:
+        """Shared analyzer (read-only after __init__)"""
         return self.analyzer
     
-    def _extract_text_with_ocr_fallback(self, pdf_path: Path) -> str:
-        """Extract text from PDF with OCR fallback"""
-        analyzer = self._get_analyzer(self.config.config.get("data_root", "data"))
+    def _extract_text_with_ocr_fallback(self, pdf_path: Path, deadline: Optional[Deadline] = None) -> str:
+        """Extract text from PDF with OCR fallback (OCR is optional under a deadline, page by page)"""
+        analyzer = self._get_analyzer()
+        max_pages = self.config.config.get("max_pdf_pages", MAX_PDF_PAGES)
         
         # Try normal parsing first
-        text = analyzer.parse_pdf(pdf_path)
+        with timing.stage("extract"):
+            text = analyzer.parse_pdf(pdf_path, max_pages)
         if text and len(text.strip()) > 100:
             return text
         
         # OCR fallback if enabled and available
         if self.config.config.get("ocr_enabled", True) and OCR_AVAILABLE:
+            if deadline is not None and not deadline.allows("ocr"):
+                return text or ""
             try:
                 print(f"Trying OCR for {pdf_path.name}...")
-                doc = fitz.open(pdf_path)
-                text = ""
-                
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    pix = page.get_pixmap()
-                    img_data = pix.tobytes("png")
+                with timing.stage("ocr"):
+                    doc = fitz.open(pdf_path)
+                    page_total = min(len(doc), max_pages)
+                    pages_read = 0
+                    text = ""
                     
-                    # Convert to PIL Image
-                    import io
-                    img = Image.open(io.BytesIO(img_data))
+                    for page_num in range(page_total):
+                        if deadline is not None and page_num and not deadline.allows("ocr"):
+                            break  # keep the pages read so far
+                        timing.progress("ocr", page=page_num + 1, pages=page_total)
+                        page_start = time.perf_counter()
+                        page = doc.load_page(page_num)
+                        pix = page.get_pixmap()
+                        img_data = pix.tobytes("png")
+                        
+                        # Convert to PIL Image
+                        import io
+                        img = Image.open(io.BytesIO(img_data))
+                        
+                        # OCR
+                        page_text = pytesseract.image_to_string(img)
+                        text += page_text + "\n"
+                        pages_read += 1
+                        if deadline is not None:
+                            deadline.costs.observe("ocr", time.perf_counter() - page_start)
                     
-                    # OCR
-                    page_text = pytesseract.image_to_string(img)
-                    text += page_text + "\n"
-                
-                doc.close()
+                    doc.close()
+                timing.incr("ocr_pages", pages_read)
                 return text.strip()
                 
             except Exception as e:
@@ -434,23 +517,9 @@ class EnhancedATSScorer:
         
         return text or ""
 
-    def _page_count(self, pdf_path: Path) -> int:
-        """Best-effort page count (PyMuPDF if available)."""
-        try:
-            import fitz  # type: ignore
-            with fitz.open(pdf_path) as doc:
-                return int(doc.page_count)
-        except Exception:
-            return 0
-    
     def _count_keywords(self, text: str, keywords: List[str]) -> int:
         """Count keyword matches in text"""
-        text_lower = text.lower()
-        hits = 0
-        for kw in keywords:
-            if re.search(rf'\b{re.escape(kw.lower())}\b', text_lower):
-                hits += 1
-        return hits
+        return KeywordMatcher(plan_keywords(keywords)).count(text.lower())
     
     def _has_contact(self, text: str) -> bool:
         """Check if text contains contact information"""
@@ -496,52 +565,13 @@ class EnhancedATSScorer:
         ratio = (wide_space_lines + box_char_lines) / len(lines)
         return min(1.0, ratio)
 
-    def _date_gap_months(self, text: str) -> int:
-        """Roughly estimate the largest employment gap in months from detected years/months"""
-        # Extract YYYY or Mon YYYY
-        years = []
-        for m in re.findall(r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)?\s*(\d{4})", text, flags=re.IGNORECASE):
-            mon = m[0]
-            yr = int(m[1])
-            month = {
-                'jan':1,'feb':2,'mar':3,'apr':4,'may':5,'jun':6,
-                'jul':7,'aug':8,'sep':9,'oct':10,'nov':11,'dec':12
-            }.get(mon.lower(), 6) if mon else 6
-            years.append(yr * 12 + month)
-        for y in re.findall(r"\b(19\d{2}|20\d{2})\b", text):
-            years.append(int(y) * 12 + 6)
-        if len(years) < 2:
-            return 0
-        years = sorted(set(years))
-        gaps = [years[i+1] - years[i] for i in range(len(years)-1)]
-        # Convert to months; ignore negative (shouldn't happen)
-        max_gap = max([g for g in gaps if g > 0] or [0])
-        # A continuous set of dates doesn't necessarily indicate employment, but as a heuristic
-        return max_gap
-
-    def _date_overlap_penalty(self, text: str) -> int:
-        """Heuristic overlap detection on date ranges (Month Year - Month Year)."""
-        ranges = []
-        for m in re.finditer(r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})\s*[–-]\s*(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{4})", text, flags=re.IGNORECASE):
-            def m2i(mon: str) -> int:
-                d = {'jan':1,'feb':2,'mar':3,'apr':4,'may':5,'jun':6,'jul':7,'aug':8,'sep':9,'oct':10,'nov':11,'dec':12}
-                return d.get(mon.lower(), 6)
-            s = int(m.group(2)) * 12 + m2i(m.group(1))
-            e = int(m.group(4)) * 12 + m2i(m.group(3))
-            if e < s:
-                s, e = e, s
-            ranges.append((s, e))
-        if len(ranges) < 2:
-            return 0
-        overlaps = 0
-        ranges.sort()
-        prev_s, prev_e = ranges[0]
-        for s, e in ranges[1:]:
-            if s <= prev_e:  # overlap
-                overlaps += 1
-                prev_e = max(prev_e, e)
-            else:
-                prev_s, prev_e = s, e
+    def _date_gap_months(self, timeline: Timeline) -> int:
+        """Largest gap in months between the CV's date ranges (or its dates, without ranges)"""
+        return timeline.max_gap_months()
+
+    def _date_overlap_penalty(self, timeline: Timeline, experience: Optional[List[Tuple[int, int]]] = None) -> int:
+        """Penalty for overlapping month-precise date ranges (within the experience spans if any)"""
+        overlaps = timeline.overlaps(experience or None)
         if overlaps >= 2:
             return 3
         if overlaps == 1:
@@ -569,18 +599,11 @@ class EnhancedATSScorer:
             return 3
         return 0
 
-    def _reverse_chronology_penalty(self, text: str) -> int:
-        """Penalty if dates are not mostly in reverse chronological order."""
-        # Extract year tokens in order of appearance
-        years = [int(y) for y in re.findall(r"\b(19\d{2}|20\d{2})\b", text)]
-        if len(years) < 3:
+    def _reverse_chronology_penalty(self, timeline: Timeline) -> int:
+        """Penalty if entries (ranges by end date, other dates) are not mostly newest first."""
+        ratio = timeline.reverse_order_ratio()
+        if ratio is None:
             return 0
-        # Count inversions where a later item is greater (older to newer expected decreasing)
-        inversions = 0
-        for i in range(len(years) - 1):
-            if years[i] < years[i+1]:
-                inversions += 1
-        ratio = inversions / (len(years) - 1)
         if ratio > 0.4:
             return 4
         if ratio > 0.2:
@@ -603,10 +626,13 @@ class EnhancedATSScorer:
 
     def _summary_length_penalty(self, text: str) -> int:
         """Penalty if summary/objective/profile paragraphs are too long."""
-        m = re.search(r"(summary|objective|profile)\s*\n([\s\S]{0,800})", text, flags=re.IGNORECASE)
+        m = SUMMARY_HEADING_RE.search(text)
         if not m:
             return 0
-        block = m.group(2)
+        # Block: up to 800 chars after the last newline of the blank run below the heading
+        blank_end = LEADING_WS_RE.match(text, m.end()).end()
+        start = text.rfind("\n", m.end() - 1, blank_end) + 1
+        block = text[start:start + 800]
         lines = [l for l in block.splitlines() if l.strip()]
         if len(lines) > 5:
             return 3
@@ -615,6 +641,17 @@ class EnhancedATSScorer:
             return 2
         return 0
 
+    def _has_quantified_claim(self, text: str) -> bool:
+        """%, $ amounts, or increased/reduced/improved followed by a number on the same line.
+        One verb search per line: `verb.*\d` rescans the line for every verb occurrence."""
+        if QUANTIFIED_RE.search(text):
+            return True
+        for line in text.split("\n"):
+            m = IMPACT_VERB_RE.search(line)
+            if m and DIGIT_RE.search(line, m.end()):
+                return True
+        return False
+
     def _quantified_bullet_ratio(self, text: str) -> float:
         """Ratio of bullets containing quantified results (%/$/numbers)."""
         bullets = [l.strip() for l in text.splitlines() if re.match(r"^\s*([-*•])\s+", l)]
@@ -667,29 +704,6 @@ class EnhancedATSScorer:
             return 2
         return 0
 
-    def _file_name_penalty(self) -> int:
-        """Penalty if file name is not human-name-like (e.g., lacks two alpha tokens)."""
-        name = (self._ctx.get("filename") or "").lower()
-        if not name:
-            return 0
-        base = re.sub(r"\.pdf$", "", name)
-        tokens = [t for t in re.split(r"[_\-\s]+", base) if t.isalpha()]
-        if len(tokens) < 2:
-            return 2
-        return 0
-
-    def _page_count_penalty(self) -> int:
-        """Penalty if pages not in [1,2]."""
-        try:
-            pc = int(self._ctx.get("page_count") or 0)
-        except Exception:
-            pc = 0
-        if pc == 0:
-            return 0
-        if pc > 2:
-            return 3
-        return 0
-
     def _all_caps_penalty(self, text: str) -> int:
         """Penalty if too many ALL CAPS lines (shouting or headings overused)."""
         lines = [l.strip() for l in text.splitlines() if l.strip()]
@@ -743,13 +757,9 @@ class EnhancedATSScorer:
             return 2
         return 0
     
-    def _date_consistency(self, text: str) -> float:
-        """Calculate date format consistency score"""
-        dates = DATE_RE.findall(text)
-        if not dates:
-            return 0.0
-        uniq = len(set(dates))
-        return min(1.0, uniq / 6.0)
+    def _date_consistency(self, timeline: Timeline) -> float:
+        """Date coverage (distinct dates, 6 for full marks) times the share written in one style"""
+        return min(1.0, timeline.distinct_dates() / 6.0) * timeline.style_share()
     
     def _length_score(self, text: str) -> float:
         """Calculate length appropriateness score"""
@@ -762,7 +772,9 @@ class EnhancedATSScorer:
     
     def _action_verbs_score(self, text: str) -> float:
         """Calculate action verbs usage score"""
-        hits = self._count_keywords(text, self.action_verbs)
+        return self._action_verbs_component(self.lexicons.merged_action_matcher().count(text.lower()))
+    
+    def _action_verbs_component(self, hits: int) -> float:
         if hits >= 10:
             return 1.0
         if hits >= 5:
@@ -771,12 +783,33 @@ class EnhancedATSScorer:
             return 0.4
         return 0.0
     
-    def score_cv_text(self, cv_text: str, sector: str = None, auto_detect: bool = True) -> Dict:
-        """Score CV text with enhanced features"""
+    def detect_sector(self, cv_text: str) -> SectorDetection:
+        """Sector detection of the text score_cv_text scores (capped, canonical)"""
+        cv_text = canonical_text(cap_text(cv_text, self.config.config.get("max_text_chars", MAX_TEXT_CHARS))[0])
+        with timing.stage("sector_detection"):
+            return self.sector_detector.detect_sector(cv_text)
+
+    def score_cv_text(self, cv_text: str, sector: str = None, auto_detect: bool = True,
+                      budget_ms: Optional[float] = None, deadline: Optional[Deadline] = None,
+                      detection: Optional[SectorDetection] = None) -> Dict:
+        """Score CV text with enhanced features.
+        
+        budget_ms (or a running `deadline`, e.g. from score_pdf_file) bounds the time spent:
+        the mandatory rules always run, optional stages (SBERT, grammar, link checks) only
+        while budget remains. result["deadline"] lists the skipped stages.
+        `detection` (from detect_sector on the same text) saves the classifier pass.
+        The canonical text (ats/fingerprint.py) is scored, the same text the cache key
+        is derived from, so texts sharing a key always share a score.
+        """
+        if deadline is None and budget_ms is not None:
+            deadline = Deadline(budget_ms, self.stage_costs)
+        cv_text, truncated = cap_text(cv_text, self.config.config.get("max_text_chars", MAX_TEXT_CHARS))
+        cv_text = canonical_text(cv_text)
         
         # Auto-detect sector if not provided
         if auto_detect and self.config.config.get("auto_sector_detection", True):
-            detection = self.sector_detector.detect_sector(cv_text)
+            if detection is None:
+                detection = self.detect_sector(cv_text)
             if sector is None or detection.confidence > 0.3:
                 sector = detection.detected_sector
                 print(f"Auto-detected sector: {sector} (confidence: {detection.confidence:.2f})")
@@ -791,14 +824,208 @@ class EnhancedATSScorer:
         if self.config.config.get("cache_enabled", True):
             cached = self.cache.get_cached_score(cv_text, sector, config_version)
             if cached:
+                timing.incr("cache_hit")
                 cached["from_cache"] = True
-                return cached
+                # The corpus arrays may have been refreshed since this result was cached
+                return self._attach_percentile(cached)
+            timing.incr("cache_miss")
         
         # Calculate score
-        breakdown = self._calculate_breakdown(cv_text, sector)
-        recommendations = self._generate_recommendations(breakdown, sector)
+        breakdown, recommendations = self.score_breakdown(cv_text, sector, deadline)
         
-        result = {
+        result = self._result_from_breakdown(breakdown, recommendations, sector, config_version)
+        if truncated:
+            result["truncated"] = True
+        if deadline is not None:
+            result["deadline"] = deadline.report()
+        
+        # Cache result (degraded results are not cached)
+        if self.config.config.get("cache_enabled", True) and not (deadline and deadline.skipped):
+            self.cache.cache_score(cv_text, sector, config_version, result)
+        
+        return result
+    
+    def score_breakdown(self, cv_text: str, sector: str,
+                        deadline: Optional[Deadline] = None) -> Tuple[ScoreBreakdown, List[Dict]]:
+        """Breakdown (with notes) and recommendations for a known sector: the scoring core
+        of score_cv_text without detection, caching or input caps."""
+        with timing.stage("rules"):
+            breakdown = self._calculate_breakdown(cv_text, sector, deadline=deadline)
+            recommendations = self._generate_recommendations(breakdown, sector)
+        return breakdown, recommendations
+    
+    def score_sectors(self, cv_text: str, sectors: Optional[List[str]] = None) -> Dict:
+        """Score one CV under several sectors (all lexicon sectors when None) in one pass.
+        Sections, formatting, penalties, actions and completeness are computed once;
+        keyword hits of all sectors come from one scan, so only keyword matching and
+        the weights are per sector. Each entry equals score_breakdown for that sector.
+        Returns {"sectors": {sector: result}, "ranking": [sectors by score]}."""
+        cv_text, truncated = cap_text(cv_text, self.config.config.get("max_text_chars", MAX_TEXT_CHARS))
+        sectors = list(dict.fromkeys(sectors)) if sectors else list(self.lexicons.sector_keywords)
+        config_version = f"{self.config.config['version']}-{self.config.config['rules_version']}"
+        text_lower = cv_text.lower()
+        tokens = text_tokens(text_lower)
+        with timing.stage("rules"):
+            hits = self.lexicons.sector_keyword_hits(text_lower, tokens, sectors)
+            features = self._section_features(cv_text, sectors[0], tokens)
+            raw, acronym_notes = self._extract_features(cv_text, sectors[0], features)
+            results: Dict[str, Dict] = {}
+            for sector in sectors:
+                if sector != sectors[0]:
+                    with timing.stage("semantic"):
+                        enhanced_result = self.semantic_enhancer.enhanced_keyword_matching(
+                            cv_text, sector, direct_matches=hits[sector], cv_skills=features["skills"]
+                        )
+                    raw = {**raw, **self._keyword_columns(enhanced_result)}
+                breakdown = self._breakdown_from_features(raw, sector, acronym_notes)
+                recommendations = self._generate_recommendations(breakdown, sector)
+                results[sector] = self._result_from_breakdown(breakdown, recommendations, sector, config_version)
+                if truncated:
+                    results[sector]["truncated"] = True
+        ranking = sorted(sectors, key=lambda s: results[s]["score"], reverse=True)
+        return {"sectors": results, "ranking": ranking}
+    
+    def rescore_cv_text(self, cv_text: str, previous: Optional[Dict] = None, sector: str = None,
+                        auto_detect: bool = True) -> Dict:
+        """Live-preview scoring for the CV builder.
+        
+        Only sections whose text is not in the scorer's section cache are re-analysed
+        (see SectionFeatureCache). Grammar and link checks also run per section and are
+        cached with it; sections not checked yet are checked while the "rescore_budget_ms"
+        deadline allows (result["deadline"] lists what was left for later edits). Keyword
+        matching stays off SBERT. `previous` (an earlier result) only keeps its sector;
+        any features in it are ignored.
+        """
+        cv_text, truncated = cap_text(cv_text, self.config.config.get("max_text_chars", MAX_TEXT_CHARS))
+        prev_cache = (previous or {}).get("section_cache") or {}
+        if sector is None and prev_cache.get("sector"):
+            # Keep the sector of the previous analysis instead of re-detecting on every edit
+            sector = prev_cache["sector"]
+        elif auto_detect and self.config.config.get("auto_sector_detection", True):
+            with timing.stage("sector_detection"):
+                detection = self.sector_detector.detect_sector(cv_text)
+            if sector is None or detection.confidence > 0.3:
+                sector = detection.detected_sector
+        if sector is None:
+            sector = "INFORMATION-TECHNOLOGY"  # Default
+        
+        config_version = f"{self.config.config['version']}-{self.config.config['rules_version']}"
+        scope = f"{sector}|{config_version}|{self.lexicons.version}"
+        deadline = Deadline(self.config.config.get("rescore_budget_ms", RESCORE_BUDGET_MS), self.stage_costs)
+        spans = segment_sections(cv_text)
+        keys: List[str] = []
+        hashes: List[str] = []
+        parts = []
+        rescored = 0
+        for span in spans:
+            section_hash = hashlib.sha1(span.text.encode("utf-8")).hexdigest()
+            features = self.section_cache.get(f"{section_hash}|{scope}")
+            if features is None:
+                features = {**self._section_features(span.text, sector, optional=False), "checked": []}
+                self.section_cache.put(f"{section_hash}|{scope}", features)
+                rescored += 1
+            keys.append(f"{section_hash}|{scope}")
+            hashes.append(section_hash)
+            parts.append(features)
+        timing.incr("sections_rescored", rescored)
+        timing.incr("sections_reused", len(parts) - rescored)
+        parts = self._check_sections(spans, parts, keys, deadline)
+        
+        features = self._merge_section_features(parts)
+        with timing.stage("rules"):
+            raw, acronym_notes = self._extract_features(cv_text, sector, features, use_model=False)
+            breakdown = self._breakdown_from_features(raw, sector, acronym_notes)
+            recommendations = self._generate_recommendations(breakdown, sector)
+        
+        result = self._result_from_breakdown(breakdown, recommendations, sector, config_version)
+        if truncated:
+            result["truncated"] = True
+        result["deadline"] = deadline.report()
+        result["sections_rescored"] = rescored
+        result["sections_reused"] = len(parts) - rescored
+        result["section_cache"] = {"sector": sector, "config_version": config_version,
+                                   "lexicon_version": self.lexicons.version, "sections": hashes}
+        return result
+    
+    def _check_sections(self, spans: List, parts: List[Dict], keys: List[str], deadline: Deadline) -> List[Dict]:
+        """Grammar and link checks of the sections that have not had them yet, in stage
+        priority order while the deadline allows; results are cached with the section.
+        A section's grammar count stays None until checked, so the grammar penalty only
+        applies once every section has been checked (see _merge_section_features)."""
+        parts = list(parts)
+        for stage in self.config.config.get("stage_priority", STAGE_PRIORITY):
+            # Stages that would be no-ops are neither run nor reported as skipped
+            if stage == "grammar" and not grammar_check_available():
+                continue
+            if stage == "link_check" and not self.config.config.get("online_link_checks", True):
+                continue
+            if stage not in ("grammar", "link_check"):
+                continue
+            for i, (span, part) in enumerate(zip(spans, parts)):
+                if stage in part["checked"]:
+                    continue
+                checked = dict(part)
+                if stage == "grammar":
+                    if not deadline.allows(stage):
+                        break
+                    with deadline.run(stage):
+                        checked["grammar_issues"] = spelling_grammar_issues(
+                            span.text, budget_s=deadline.remaining_ms() / 1000
+                        )
+                    if checked["grammar_issues"] is None:
+                        continue  # LanguageTool failed or ran out of time: retried on a later edit
+                else:
+                    text_lower = span.text.lower()
+                    if "linkedin.com" in text_lower or "github.com" in text_lower:
+                        if not deadline.allows(stage):
+                            break
+                        with deadline.run(stage):
+                            checked["broken_links"] = broken_profile_links(
+                                span.text, budget_s=deadline.remaining_ms() / 1000
+                            )
+                checked["checked"] = part["checked"] + [stage]
+                self.section_cache.put(keys[i], checked)
+                parts[i] = checked
+        return parts
+    
+    def _load_score_distribution(self) -> Optional[ScoreDistribution]:
+        """Corpus score arrays for percentile ranks (only if built with this config and lexicons)"""
+        dist = ScoreDistribution.load(Path(self.config.config.get("score_percentiles", str(PERCENTILES_PATH))))
+        config_version = f"{self.config.config['version']}-{self.config.config['rules_version']}"
+        if dist is None:
+            return None
+        if not dist.matches(config_version, self.lexicons.version):
+            print("Score percentiles built with another config/lexicons; run: python feature_store.py percentiles")
+            return None
+        stages = self.live_stages()
+        if not dist.matches(config_version, self.lexicons.version, stages):
+            print(f"Score percentiles built from rows with optional stages {','.join(dist.stages) or 'none'} "
+                  f"but live scoring runs {','.join(stages) or 'none'}; run: python feature_store.py build "
+                  f"--pdf --optional-stages {','.join(stages)} && python feature_store.py percentiles")
+            return None
+        return dist
+    
+    def live_stages(self) -> List[str]:
+        """Optional stages a full score_cv_text runs with this config and the installed
+        models, in STAGE_PRIORITY order (the `stages` of feature store rows scored alike)"""
+        stages = []
+        if self.semantic_enhancer.semantic_matcher.model is not None:
+            stages.append("semantic")
+        if grammar_check_available():
+            stages.append("grammar")
+        if self.config.config.get("online_link_checks", True):
+            stages.append("link_check")
+        return stages
+    
+    def _attach_percentile(self, result: Dict) -> Dict:
+        """result["percentile"]: standing among the sector's corpus CVs (binary search)"""
+        if self.score_distribution is not None:
+            result["percentile"] = self.score_distribution.percentile(result["sector"], result["score"])
+        return result
+    
+    def _result_from_breakdown(self, breakdown: ScoreBreakdown, recommendations: List[Dict],
+                               sector: str, config_version: str) -> Dict:
+        return self._attach_percentile({
             "file": "text_input",
             "sector": sector,
             "score": breakdown.total,
@@ -813,72 +1040,341 @@ class EnhancedATSScorer:
             "impact_estimates": breakdown.impact_estimates,
             "config_version": config_version,
             "from_cache": False
+        })
+    
+    def extract_feature_matrix(self, cv_texts: List[str], sectors: List[str],
+                               optional_stages: Tuple[str, ...] = (),
+                               provenance: Optional[List[str]] = None) -> np.ndarray:
+        """Raw features of a batch: one row per text, columns FEATURE_COLUMNS (see COLUMN_INDEX).
+
+        Word counts/length score, contact, link and bullet flags and action verb hits are
+        filled column by column for the whole batch; each text is tokenized once and the
+        structural rules then run per CV. The optional stages (SBERT, LanguageTool, link
+        HEAD requests) only run when named in optional_stages; by default keyword matching
+        uses the overlap fallback and the grammar/broken link penalties are 0.
+        When a `provenance` list is given, the optional stages that fed each row are
+        appended to it, comma-joined ("" for an offline row).
+        """
+        limit = self.config.config.get("max_text_chars", MAX_TEXT_CHARS)
+        cv_texts = [cap_text(t, limit)[0] for t in cv_texts]
+        n = len(cv_texts)
+        matrix = empty_matrix(n)
+        lowered = [t.lower() for t in cv_texts]
+        token_sets = [text_tokens(t) for t in lowered]
+
+        words = np.fromiter((len(t.split()) for t in cv_texts), dtype=np.int64, count=n)
+        matrix[:, COLUMN_INDEX["length_score"]] = length_component(words)
+        matrix[:, COLUMN_INDEX["has_email"]] = [bool(EMAIL_RE.search(t)) for t in cv_texts]
+        matrix[:, COLUMN_INDEX["has_phone"]] = [bool(PHONE_RE.search(t)) for t in cv_texts]
+        matrix[:, COLUMN_INDEX["has_profile_link"]] = [bool(PROFILE_LINK_RE.search(t)) for t in cv_texts]
+        matrix[:, COLUMN_INDEX["has_bullets"]] = [any(b in t for b in BULLET_MARKERS) for t in cv_texts]
+        # Single-word verbs: token set intersections; the few multi-word verbs via the matcher
+        verbs = self.lexicons.action_verbs_merged
+        single = {v for v in verbs if WORD_RE.fullmatch(v)}
+        multi = KeywordMatcher(plan_keywords([v for v in verbs if v not in single]))
+        matrix[:, COLUMN_INDEX["action_hits"]] = [
+            len(tokens & single) + multi.count(text, tokens) for text, tokens in zip(lowered, token_sets)
+        ]
+
+        bulk = ["length_score", "has_email", "has_phone", "has_profile_link", "has_bullets", "action_hits"]
+        for i, (text, sector) in enumerate(zip(cv_texts, sectors)):
+            known = {c: float(matrix[i, COLUMN_INDEX[c]]) for c in bulk}
+            features = self._section_features(text, sector, token_sets[i], optional=False)
+            ran = self._batch_optional_stages(text, features, optional_stages)
+            raw, _ = self._extract_features(text, sector, features, known, use_model="semantic" in ran)
+            matrix[i] = [raw[c] for c in FEATURE_COLUMNS]
+            if provenance is not None:
+                provenance.append(",".join(ran))
+        return matrix
+
+    def _batch_optional_stages(self, text: str, features: Dict, optional_stages: Tuple[str, ...]) -> List[str]:
+        """Run the requested optional stages of one batch row (no deadline), filling
+        features["grammar_issues"] / ["broken_links"]. Returns the stages that fed the row;
+        "semantic" means enhanced_keyword_matching may use SBERT."""
+        ran = []
+        for stage in STAGE_PRIORITY:
+            if stage not in optional_stages:
+                continue
+            if stage == "semantic":
+                if self.semantic_enhancer.semantic_matcher.model is not None:
+                    ran.append(stage)
+            elif stage == "grammar":
+                with timing.stage("grammar"):
+                    features["grammar_issues"] = spelling_grammar_issues(text)
+                if features["grammar_issues"] is not None:
+                    ran.append(stage)
+            elif stage == "link_check" and self.config.config.get("online_link_checks", True):
+                with timing.stage("link_check"):
+                    features["broken_links"] = broken_profile_links(text)
+                ran.append(stage)
+        return ran
+
+    def score_batch(self, cv_texts: List[str], sectors: Optional[List[str]] = None,
+                    workers: Optional[int] = None, optional_stages: Tuple[str, ...] = ()) -> Dict:
+        """Vectorized scores for many texts: {"sectors", "columns", "features", <component arrays>}.
+        sectors=None detects them in one classifier pass. No notes/recommendations.
+        workers > 1 spreads feature extraction over a process pool in chunks.
+        optional_stages as in extract_feature_matrix (none by default)."""
+        if sectors is None:
+            sectors = [d.detected_sector for d in self.sector_detector.detect_many(cv_texts)]
+        with timing.stage("features"):
+            if workers and workers > 1 and len(cv_texts) >= BATCH_CHUNK_SIZE * 2:
+                chunks = [(str(self.config.config_path), cv_texts[i:i + BATCH_CHUNK_SIZE],
+                           sectors[i:i + BATCH_CHUNK_SIZE], tuple(optional_stages))
+                          for i in range(0, len(cv_texts), BATCH_CHUNK_SIZE)]
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    matrix = np.vstack(list(pool.map(_feature_batch_worker, chunks)))
+            else:
+                matrix = self.extract_feature_matrix(cv_texts, sectors, optional_stages)
+        scores = score_features(matrix, sectors, self.config)
+        return {"sectors": list(sectors), "columns": list(FEATURE_COLUMNS), "features": matrix, **scores}
+    
+    def _section_features(self, text: str, sector: str, tokens: Optional[set] = None,
+                          optional: bool = True) -> Dict:
+        """Additive features of one block of text: action verb / sector keyword hits,
+        skills, grammar issue count and broken profile links. The features of a whole
+        CV are the merge of its sections' features (see _merge_section_features).
+        optional=False leaves out the grammar and link checks (run later under a deadline)."""
+        text_lower = text.lower()
+        if tokens is None:
+            tokens = text_tokens(text_lower)
+        actions = self.lexicons.merged_action_matcher().found(text_lower, tokens)
+        with timing.stage("semantic"):
+            keywords = self.semantic_enhancer.direct_keyword_matches(text, sector, tokens)
+            skills = self.semantic_enhancer.skill_normalizer.extract_skills_from_text(text, tokens)
+        grammar_issues, broken_links = self._optional_checks(text) if optional else (None, [])
+        return {
+            "actions": actions,
+            "keywords": keywords,
+            "skills": sorted(skills),
+            "grammar_issues": grammar_issues,
+            "broken_links": broken_links,
         }
+
+    def _optional_checks(self, text: str) -> Tuple[Optional[int], List[str]]:
+        """Grammar issue count and broken profile links (network/LanguageTool, no deadline)"""
+        with timing.stage("grammar"):
+            grammar_issues = spelling_grammar_issues(text)
+        broken_links: List[str] = []
+        # Optional online link checks (do not fail build if network blocked)
+        if self.config.config.get("online_link_checks", True):
+            with timing.stage("link_check"):
+                broken_links = broken_profile_links(text)
+        return grammar_issues, broken_links
+    
+    @staticmethod
+    def _merge_section_features(parts: List[Dict]) -> Dict:
+        merged = {"actions": set(), "keywords": set(), "skills": set(), "grammar_issues": 0, "broken_links": []}
+        for part in parts:
+            merged["actions"].update(part["actions"])
+            merged["keywords"].update(part["keywords"])
+            merged["skills"].update(part["skills"])
+            merged["broken_links"].extend(part["broken_links"])
+            if merged["grammar_issues"] is not None:
+                issues = part["grammar_issues"]
+                merged["grammar_issues"] = None if issues is None else merged["grammar_issues"] + issues
+        return {
+            "actions": sorted(merged["actions"]),
+            "keywords": sorted(merged["keywords"]),
+            "skills": sorted(merged["skills"]),
+            "grammar_issues": merged["grammar_issues"],
+            "broken_links": merged["broken_links"],
+        }
+
+    def _calculate_breakdown(self, cv_text: str, sector: str, features: Optional[Dict] = None,
+                             deadline: Optional[Deadline] = None) -> ScoreBreakdown:
+        """Calculate detailed score breakdown.
+        `features` (from _section_features / _merge_section_features) is computed
+        over the whole text when not supplied."""
+        raw, acronym_notes = self._extract_features(cv_text, sector, features, deadline=deadline)
+        return self._breakdown_from_features(raw, sector, acronym_notes)
+    
+    def _extract_features(self, cv_text: str, sector: str, features: Optional[Dict] = None,
+                          known: Optional[Dict[str, float]] = None,
+                          deadline: Optional[Deadline] = None,
+                          use_model: bool = True) -> Tuple[Dict[str, float], List[str]]:
+        """Raw signals of one CV (FEATURE_COLUMNS) plus its acronym notes.
+        `known` holds columns already computed in bulk (see extract_feature_matrix).
+        Under a `deadline` the optional stages run after all mandatory rules;
+        use_model=False keeps keyword matching off SBERT."""
+        if features is None:
+            features = self._section_features(cv_text, sector, optional=deadline is None)
+        raw: Dict[str, float] = dict(known or {})
+        # Full heading-to-heading spans, merged under canonical keys via SECTION_ALIASES
+        # (what CVAnalyzer.detect_sections returns; the spans also locate the experience dates)
+        spans = segment_sections(cv_text)
+        sections = canonical_sections(spans)
         
-        # Cache result
-        if self.config.config.get("cache_enabled", True):
-            self.cache.cache_score(cv_text, sector, config_version, result)
+        for section in SECTION_WEIGHTS:
+            raw[f"has_{section}_section"] = float(section in sections)
+        # Contact detection fix - check for email/phone even in sections
+        if "has_email" not in raw:
+            raw["has_email"] = float(bool(EMAIL_RE.search(cv_text)))
+            raw["has_phone"] = float(bool(PHONE_RE.search(cv_text)))
+        raw["has_contact_info"] = float(bool(raw["has_email"] or raw["has_phone"]))
         
-        return result
-    
-    def _calculate_breakdown(self, cv_text: str, sector: str) -> ScoreBreakdown:
-        """Calculate detailed score breakdown"""
-        analyzer = self._get_analyzer(self.config.config.get("data_root", "data"))
-        sections = analyzer.detect_sections(cv_text)
-        # Normalize section heading synonyms
-        if sections:
-            normalized: Dict[str, str] = {}
-            alias_map = {
-                "work experience": "experience",
-                "professional experience": "experience",
-                "employment history": "experience",
-                "projects": "experience",
-                "education & certifications": "education",
-                "academics": "education",
-                "certifications": "education",
-                "skills & tools": "skills",
-                "technical skills": "skills",
-                "contact information": "contact",
-                "profile": "summary",
-                "summary": "summary",
-            }
-            for key, val in list(sections.items()):
-                low = key.strip().lower()
-                target = alias_map.get(low)
-                if target:
-                    # merge content under canonical key
-                    normalized[target] = (normalized.get(target, "") + "\n" + val).strip()
-                else:
-                    normalized[key] = val
-            sections = normalized
+        # Formatting
+        if "length_score" not in raw:
+            raw["length_score"] = self._length_score(cv_text)
+        # One date pass for consistency, chronology, gaps and overlaps
+        timeline = extract_timeline(cv_text)
+        raw["date_consistency"] = self._date_consistency(timeline)
+        if "has_bullets" not in raw:
+            raw["has_bullets"] = 1.0 if any(b in cv_text for b in BULLET_MARKERS) else 0.0
+        
+        # Formatting/content penalties (points; notes in PENALTY_NOTES)
+        raw["pen_columns"] = 4 if self._columns_or_tables_signal(cv_text) > 0.2 else 0
+        raw["pen_header_footer"] = header_footer_contact_penalty(cv_text)
+        raw["pen_long_paragraphs"] = 4 if self._long_paragraphs_ratio(cv_text) > 0.3 else 0
+        raw["pen_bullet_quality"] = self._bullet_quality_penalty(cv_text)
+        raw["pen_hyphenation"] = hyphenation_penalty(cv_text)
+        raw["pen_reverse_chronology"] = self._reverse_chronology_penalty(timeline)
+        raw["pen_experience_entries"] = self._experience_entry_penalty(sections)
+        raw["pen_summary_length"] = self._summary_length_penalty(cv_text)
+        raw["pen_quantified_bullets"] = 5 if self._quantified_bullet_ratio(cv_text) < 0.3 else 0
+        raw["pen_action_bullets"] = 3 if self._action_verb_bullet_ratio(cv_text, self.action_verbs) < 0.5 else 0
+        raw["pen_buzzwords"] = self._buzzword_penalty(cv_text)
+        raw["pen_tense"] = tense_inconsistency_penalty(cv_text)
+        raw["pen_keyword_stuffing"] = keyword_stuffing_penalty(cv_text, sector)
+        raw["pen_skills_block"] = skills_block_penalty(cv_text)
+        raw["pen_first_person"] = self._first_person_penalty(cv_text)
+        raw["pen_all_caps"] = self._all_caps_penalty(cv_text)
+        raw["pen_education_degree"] = self._education_degree_penalty(sections)
+        raw["pen_link_quality"] = max(self._link_quality_penalty(cv_text), link_validity_penalty(cv_text))
+        raw["pen_non_ascii"] = non_ascii_penalty(cv_text)
+        raw["pen_language_mismatch"] = language_mismatch_penalty(cv_text)
+        raw["pen_bullets_per_entry"] = self._bullets_per_entry_penalty(sections)
+        # Repetition and passive voice
+        top_ratio, unique_ratio = self._word_stats(cv_text)
+        raw["pen_repetition"] = 3 if top_ratio > 0.06 else 0
+        raw["pen_passive_voice"] = 2 if self._passive_voice_ratio(cv_text) > 0.15 else 0
+        # Date gap (>= 18 months) and overlaps
+        raw["pen_date_gap"] = 3 if self._date_gap_months(timeline) >= 18 else 0
+        raw["pen_date_overlap"] = self._date_overlap_penalty(
+            timeline, [(span.start, span.end) for span in spans if span.canonical == "experience"]
+        )
+        
+        # Optional stages: semantic matching, grammar, link checks
+        if deadline is None:
+            with timing.stage("semantic"):
+                enhanced_result = self.semantic_enhancer.enhanced_keyword_matching(
+                    cv_text, sector, direct_matches=features["keywords"], cv_skills=features["skills"],
+                    use_model=use_model
+                )
+        else:
+            features = dict(features)
+            enhanced_result = self._run_optional_stages(cv_text, sector, features, deadline)
+        # Spelling/grammar penalty (optional)
+        issues = features["grammar_issues"]
+        raw["pen_grammar"] = grammar_density_penalty(issues, len(cv_text.split())) if issues is not None else 0
+        # Broken profile links (checked per section in _section_features)
+        raw["pen_broken_links"] = broken_link_penalty(features["broken_links"])
+        
+        raw.update(self._keyword_columns(enhanced_result))
+        if "action_hits" not in raw:
+            raw["action_hits"] = len(features["actions"])
         
+        if "has_profile_link" not in raw:
+            raw["has_profile_link"] = float(bool(PROFILE_LINK_RE.search(cv_text)))
+        
+        # Bonus points for exceptional CVs (max +10)
+        bonus = 0
+        # Quantified achievements bonus
+        if self._has_quantified_claim(cv_text):
+            bonus += 3
+        # Multiple contact methods
+        if raw["has_email"] and raw["has_phone"] and re.search(r'linkedin|github', cv_text, re.IGNORECASE):
+            bonus += 2
+        # Professional summary/objective
+        if re.search(r'\b(summary|objective|profile)\b', cv_text, re.IGNORECASE):
+            bonus += 2
+        # Certifications mentioned
+        if re.search(r'\b(certification|certified|certificate)\b', cv_text, re.IGNORECASE):
+            bonus += 3
+        raw["bonus"] = bonus
+        
+        # Acronym + full form note
+        acronym_notes: List[str] = []
+        acronym_full_form_note(cv_text, acronym_notes)
+        return raw, acronym_notes
+    
+    @staticmethod
+    def _keyword_columns(enhanced_result: Dict) -> Dict[str, float]:
+        """The sector-dependent feature columns (from enhanced_keyword_matching)"""
+        try:
+            direct_count = len(set(enhanced_result.get("direct_matches", [])))
+        except Exception:
+            direct_count = 0
+        return {
+            "kw_total_score": enhanced_result["total_score"],
+            "kw_enhancement_factor": enhanced_result["enhancement_factor"],
+            "kw_direct_count": direct_count,
+            "kw_semantic_matches": len(enhanced_result["semantic_matches"]),
+        }
+    
+    def _run_optional_stages(self, cv_text: str, sector: str, features: Dict, deadline: Deadline) -> Dict:
+        """Run the optional stages in priority order while the deadline allows, filling
+        features["grammar_issues"] / ["broken_links"]. Returns the keyword matching result
+        (keyword-overlap similarity when SBERT is skipped or unavailable)."""
+        enhanced_result = None
+        text_lower = cv_text.lower()
+        for stage in self.config.config.get("stage_priority", STAGE_PRIORITY):
+            # Stages that would be no-ops are neither run nor reported as skipped
+            if stage == "semantic":
+                if self.semantic_enhancer.semantic_matcher.model is None or not deadline.allows(stage):
+                    continue
+                with deadline.run(stage):
+                    enhanced_result = self.semantic_enhancer.enhanced_keyword_matching(
+                        cv_text, sector, direct_matches=features["keywords"], cv_skills=features["skills"]
+                    )
+            elif stage == "grammar":
+                if not grammar_check_available() or not deadline.allows(stage):
+                    continue
+                with deadline.run(stage):
+                    features["grammar_issues"] = spelling_grammar_issues(
+                        cv_text, budget_s=deadline.remaining_ms() / 1000
+                    )
+            elif stage == "link_check":
+                if not self.config.config.get("online_link_checks", True):
+                    continue
+                if not ("linkedin.com" in text_lower or "github.com" in text_lower) or not deadline.allows(stage):
+                    continue
+                with deadline.run(stage):
+                    features["broken_links"] = broken_profile_links(cv_text, budget_s=deadline.remaining_ms() / 1000)
+        if enhanced_result is None:
+            with timing.stage("semantic"):
+                enhanced_result = self.semantic_enhancer.enhanced_keyword_matching(
+                    cv_text, sector, direct_matches=features["keywords"], cv_skills=features["skills"],
+                    use_model=False
+                )
+        return enhanced_result
+    
+    def _breakdown_from_features(self, raw: Dict[str, float], sector: str,
+                                 acronym_notes: List[str]) -> ScoreBreakdown:
+        """Apply the config weights to raw features (vectorized twin: score_features)"""
         notes = []
         impact_estimates = {}
-        penalties = 0
         
         # Sections score
         score_sections = 0
-        section_weights = {"experience": 10, "education": 8, "skills": 7, "contact": 5}
-        
-        for section, weight in section_weights.items():
-            if section in sections:
+        for section, weight in SECTION_WEIGHTS.items():
+            if raw[f"has_{section}_section"]:
                 score_sections += weight
             else:
                 notes.append(f"Missing {section} section")
                 impact_estimates[f"add_{section}_section"] = weight
         
-        # Contact detection fix - check for email/phone even in sections
-        if self._has_contact(cv_text):
+        if raw["has_contact_info"]:
             score_sections += 5  # Contact info bonus
         else:
-            if "contact" not in sections:
+            if not raw["has_contact_section"]:
                 notes.append("Missing contact section")
                 impact_estimates["add_contact_section"] = 5
         
         # Formatting score
-        length_component = self._length_score(cv_text)
-        date_component = self._date_consistency(cv_text)
-        bullets_component = 1.0 if any(b in cv_text for b in ["•", "- ", "* "]) else 0.0
+        length_component = raw["length_score"]
+        date_component = raw["date_consistency"]
+        bullets_component = raw["has_bullets"]
         
         score_formatting = round(length_component * 8 + date_component * 6 + bullets_component * 6)
         
@@ -892,163 +1388,26 @@ class EnhancedATSScorer:
             notes.append("Limited use of bullet points")
             impact_estimates["add_bullet_points"] = 3
 
-        # Additional formatting/content penalties
-        # Columns/tables heuristic
-        col_signal = self._columns_or_tables_signal(cv_text)
-        if col_signal > 0.2:
-            notes.append("Two-column/table-like layout detected; ATS parsing risk")
-            penalties += 4
-
-        # Header/footer contact risk
-        hf_pen = header_footer_contact_penalty(cv_text)
-        if hf_pen:
-            notes.append("Avoid placing contact info solely in header/footer; move into body")
-            penalties += hf_pen
-
-        # Long paragraphs
-        long_para = self._long_paragraphs_ratio(cv_text)
-        if long_para > 0.3:
-            notes.append("Paragraphs too long; break into concise bullets")
-            penalties += 4
-
-        # Bullet quality
-        bq_pen = self._bullet_quality_penalty(cv_text)
-        if bq_pen:
-            notes.append("Overly long or multi-line bullet points")
-            penalties += bq_pen
-
-        # Hyphenation across lines
-        hy_pen = hyphenation_penalty(cv_text)
-        if hy_pen:
-            notes.append("Avoid hyphenation across line breaks; may break ATS parsing")
-            penalties += hy_pen
-
-        # Reverse chronology
-        rc_pen = self._reverse_chronology_penalty(cv_text)
-        if rc_pen:
-            notes.append("Dates not in reverse chronological order")
-            penalties += rc_pen
-
-        # Experience entries
-        ee_pen = self._experience_entry_penalty(sections)
-        if ee_pen:
-            notes.append("Too few distinct experience entries")
-            penalties += ee_pen
-
-        # Summary length
-        sl_pen = self._summary_length_penalty(cv_text)
-        if sl_pen:
-            notes.append("Summary/objective section too long")
-            penalties += sl_pen
-
-        # Quantified achievements ratio
-        qa_ratio = self._quantified_bullet_ratio(cv_text)
-        if qa_ratio < 0.3:
-            notes.append("Low rate of quantified results in bullets (<30%)")
-            penalties += 5
-
-        # Action verb at bullet start ratio
-        av_ratio = self._action_verb_bullet_ratio(cv_text, self.action_verbs)
-        if av_ratio < 0.5:
-            notes.append("Few bullets start with strong action verbs (<50%)")
-            penalties += 3
-
-        # Buzzword penalty
-        bz_pen = self._buzzword_penalty(cv_text)
-        if bz_pen:
-            notes.append("Vague buzzwords detected; replace with concrete outcomes")
-            penalties += bz_pen
-
-        # Tense inconsistency
-        ti_pen = tense_inconsistency_penalty(cv_text)
-        if ti_pen:
-            notes.append("Tense inconsistency between past and present across bullets")
-            penalties += ti_pen
-
-        # Keyword stuffing / skills block issues
-        ks_pen = keyword_stuffing_penalty(cv_text, sector)
-        if ks_pen:
-            notes.append("Avoid raw keyword stuffing; use keywords in natural sentences")
-            penalties += ks_pen
-        sb_pen = skills_block_penalty(cv_text)
-        if sb_pen:
-            notes.append("Split very long comma-separated skills list into categorized bullets")
-            penalties += sb_pen
-
-        # First-person pronoun penalty
-        fp_pen = self._first_person_penalty(cv_text)
-        if fp_pen:
-            notes.append("Avoid first-person pronouns in resume body")
-            penalties += fp_pen
-
-        # ALL CAPS overuse
-        ac_pen = self._all_caps_penalty(cv_text)
-        if ac_pen:
-            notes.append("Excessive ALL CAPS usage; use standard capitalization")
-            penalties += ac_pen
-
-        # Education degree tokens
-        ed_pen = self._education_degree_penalty(sections)
-        if ed_pen:
-            notes.append("Education section lacks clear degree notation (e.g., BSc, MSc, PhD)")
-            penalties += ed_pen
-
-        # Link quality
-        lq_pen = max(self._link_quality_penalty(cv_text), link_validity_penalty(cv_text))
-        if lq_pen:
-            notes.append("Provide full LinkedIn profile URL (e.g., linkedin.com/in/username)")
-            penalties += lq_pen
-
-        # Non-ASCII heavy usage
-        na_pen = non_ascii_penalty(cv_text)
-        if na_pen:
-            notes.append("Limit special characters/diacritics; ensure ATS-safe ASCII alternatives")
-            penalties += na_pen
-
-        # Spelling/grammar penalty (optional)
-        sg_pen = spelling_grammar_penalty(cv_text)
-        if sg_pen:
-            notes.append("Reduce spelling/grammar issues for professional tone")
-            penalties += sg_pen
-
-        # Language mismatch
-        lm_pen = language_mismatch_penalty(cv_text)
-        if lm_pen:
-            notes.append("Avoid mixing languages; keep resume in one language consistently")
-            penalties += lm_pen
-
-        # Bullets per entry balance
-        bpe_pen = self._bullets_per_entry_penalty(sections)
-        if bpe_pen:
-            notes.append("Balance bullets per experience entry (2–6 recommended)")
-            penalties += bpe_pen
-
-        # Optional online link checks (do not fail build if network blocked)
-        net_pen, broken = online_link_penalty_and_notes(cv_text)
-        if net_pen:
-            notes.append("Some profile links appear broken/unreachable")
-            penalties += net_pen
+        for column, note in PENALTY_NOTES.items():
+            if raw[column]:
+                notes.append(note)
+        penalties = sum(raw[column] for column in PENALTY_COLUMNS)
         
-        # Enhanced Keywords score with semantic matching
-        enhanced_result = self.semantic_enhancer.enhanced_keyword_matching(cv_text, sector)
+        # Keywords score with semantic matching
         kw_weight = self.config.get_weight("keywords", sector)
         
         # Calculate base score
-        base_score = min(kw_weight, int((enhanced_result["total_score"] / 15.0) * kw_weight))
+        base_score = min(kw_weight, int((raw["kw_total_score"] / 15.0) * kw_weight))
         
         # Apply modest enhancement factor (cap at 120% of base)
-        enhancement_factor = min(enhanced_result["enhancement_factor"], 1.2)
+        enhancement_factor = min(raw["kw_enhancement_factor"], 1.2)
         score_keywords = int(base_score * enhancement_factor)
         
         # Cap at sector weight to prevent inflation
         score_keywords = min(score_keywords, kw_weight)
         
         # Stricter cap: require at least 10 direct keyword matches for full component; else 70% cap
-        try:
-            direct_count = len(set(enhanced_result.get("direct_matches", [])))
-        except Exception:
-            direct_count = 0
-        if direct_count < 10:
+        if raw["kw_direct_count"] < 10:
             score_keywords = min(score_keywords, int(kw_weight * 0.7))
         
         if score_keywords < kw_weight * 0.6:
@@ -1056,18 +1415,17 @@ class EnhancedATSScorer:
             impact_estimates["add_sector_keywords"] = min(10, kw_weight - score_keywords)
         
         # Add semantic match details to notes
-        if enhanced_result["semantic_matches"]:
-            notes.append(f"Found {len(enhanced_result['semantic_matches'])} semantic skill matches")
+        if raw["kw_semantic_matches"]:
+            notes.append(f"Found {int(raw['kw_semantic_matches'])} semantic skill matches")
 
-        # Acronym + full form note
-        acronym_full_form_note(cv_text, notes)
+        notes.extend(acronym_notes)
         
         # Actions score
-        actions_component = self._action_verbs_score(cv_text)
+        action_hits = raw["action_hits"]
+        actions_component = self._action_verbs_component(action_hits)
         actions_weight = self.config.get_weight("actions", sector)
         score_actions = int(actions_component * actions_weight)
         # Stricter cap: require at least 6 action verbs; else 70% cap
-        action_hits = self._count_keywords(cv_text, self.action_verbs)
         if action_hits < 6:
             score_actions = min(score_actions, int(actions_weight * 0.7))
         
@@ -1076,70 +1434,33 @@ class EnhancedATSScorer:
             impact_estimates["add_action_verbs"] = min(8, actions_weight - score_actions)
         
         # Completeness score
-        completeness = 0
-        if EMAIL_RE.search(cv_text):
-            completeness += 3
-        if PHONE_RE.search(cv_text):
-            completeness += 3
-        if re.search(r"\b(linkedin\.com|github\.com|portfolio|behance|kaggle)\b", cv_text, re.IGNORECASE):
-            completeness += 4
+        completeness = 3 * int(raw["has_email"]) + 3 * int(raw["has_phone"]) + 4 * int(raw["has_profile_link"])
         
         if completeness < 6:
             notes.append("Missing contact/portfolio links")
             impact_estimates["add_contact_info"] = 6 - completeness
         
-        # Repetition and passive voice penalties
-        top_ratio, unique_ratio = self._word_stats(cv_text)
-        if top_ratio > 0.06:
-            notes.append("High word repetition; vary language")
-            penalties += 3
-        pv_ratio = self._passive_voice_ratio(cv_text)
-        if pv_ratio > 0.15:
-            notes.append("Excessive passive voice; prefer action-driven statements")
-            penalties += 2
-
-        # Date gap penalty (>12 months)
-        gap_m = self._date_gap_months(cv_text)
-        if gap_m >= 18:
-            notes.append("Large timeline gaps detected; add context for gaps")
-            penalties += 3
-
-        # Date overlaps
-        do_pen = self._date_overlap_penalty(cv_text)
-        if do_pen:
-            notes.append("Overlapping date ranges detected; clarify chronology")
-            penalties += do_pen
+        for column, note in LATE_PENALTY_NOTES.items():
+            if raw[column]:
+                notes.append(note)
 
         # Base total (max 90) minus penalties
         base_total = score_sections + score_formatting + score_keywords + score_actions + completeness - penalties
         total = min(90, base_total)
         
         # Bonus points for exceptional CVs (max +10)
-        bonus = 0
-        # Quantified achievements bonus
-        if re.search(r'\b\d+%|\$\d+|increased.*\d+|reduced.*\d+|improved.*\d+', cv_text, re.IGNORECASE):
-            bonus += 3
-        # Multiple contact methods
-        if EMAIL_RE.search(cv_text) and PHONE_RE.search(cv_text) and re.search(r'linkedin|github', cv_text, re.IGNORECASE):
-            bonus += 2
-        # Professional summary/objective
-        if re.search(r'\b(summary|objective|profile)\b', cv_text, re.IGNORECASE):
-            bonus += 2
-        # Certifications mentioned
-        if re.search(r'\b(certification|certified|certificate)\b', cv_text, re.IGNORECASE):
-            bonus += 3
-        
-        total = min(100, total + bonus)
+        total = min(100, total + raw["bonus"])
         
         return ScoreBreakdown(
-            total=total,
+            total=int(total),
             sections=score_sections,
             formatting=score_formatting,
             keywords=score_keywords,
             actions=score_actions,
             completeness=completeness,
             notes=notes,
-            impact_estimates=impact_estimates
+            impact_estimates=impact_estimates,
+            features=raw,
         )
     
     def _generate_recommendations(self, breakdown: ScoreBreakdown, sector: str) -> List[Dict]:
@@ -1212,31 +1533,39 @@ class EnhancedATSScorer:
         
         return unique_recs[:8]  # Top 8 recommendations
     
-    def score_pdf_file(self, pdf_path: Path, sector: str = None, auto_detect: bool = True) -> Dict:
-        """Score a PDF file with enhanced features"""
+    def score_pdf_file(self, pdf_path: Path, sector: str = None, auto_detect: bool = True,
+                       budget_ms: Optional[float] = None) -> Dict:
+        """Score a PDF file with enhanced features (budget_ms covers extraction/OCR too)"""
+        return self.score_pdf_document(pdf_path, sector, auto_detect, budget_ms)[0]
+
+    def score_pdf_document(self, pdf_path: Path, sector: str = None, auto_detect: bool = True,
+                           budget_ms: Optional[float] = None) -> Tuple[Dict, str, Optional[SectorDetection]]:
+        """score_pdf_file plus the extracted text and the sector detection it used (None when
+        auto detection is off), so JD fit and sector comparison need not extract the PDF again"""
+        deadline = Deadline(budget_ms, self.stage_costs) if budget_ms is not None else None
+        text, detection = "", None
         try:
             # Extract text with OCR fallback
-            text = self._extract_text_with_ocr_fallback(pdf_path)
-            # Populate context
-            self._ctx["filename"] = pdf_path.name
-            try:
-                self._ctx["page_count"] = str(self._page_count(pdf_path))
-            except Exception:
-                self._ctx["page_count"] = "0"
+            text = self._extract_text_with_ocr_fallback(pdf_path, deadline)
             
             if not text or len(text.strip()) < 50:
-                return {
+                result = {
                     "file": str(pdf_path),
                     "sector": sector or "unknown",
                     "error": "Empty or unreadable text (possibly scanned PDF without OCR)",
                     "score": 0
                 }
+                if deadline is not None:
+                    result["deadline"] = deadline.report()
+                return result, text, None
             
             # Score the text
-            result = self.score_cv_text(text, sector, auto_detect)
+            if auto_detect and self.config.config.get("auto_sector_detection", True):
+                detection = self.detect_sector(text)
+            result = self.score_cv_text(text, sector, auto_detect, deadline=deadline, detection=detection)
             result["file"] = str(pdf_path)
             
-            return result
+            return result, text, detection
             
         except Exception as e:
             return {
@@ -1244,66 +1573,58 @@ class EnhancedATSScorer:
                 "sector": sector or "unknown", 
                 "error": f"Processing error: {str(e)}",
                 "score": 0
-            }
+            }, text, detection
 
     def _tokenize_keywords(self, text: str) -> List[str]:
-        words = [w.lower() for w in re.findall(r"[A-Za-z][A-Za-z0-9+.#-]{1,}", text)]
-        return [w for w in words if w not in self._stopwords and len(w) >= 3]
+        return tokenize_keywords(text)
 
-    def score_jd_fit_from_text(self, cv_result: Dict, jd_text: str) -> Dict:
+    def score_jd_fit_from_text(self, cv_result: Dict, jd_text: str, cv_text: Optional[str] = None) -> Dict:
         """Compute JD-CV fit: returns dict with fit score and missing/matched keywords.
-        Deterministic: keyword overlap + optional semantic boost (capped)."""
+        Deterministic: keyword overlap + optional semantic boost (capped).
+        cv_text: the CV's extracted text when known (else re-read from cv_result["file"])."""
+        with timing.stage("jd_fit"):
+            return self._score_jd_fit(cv_result, jd_text, cv_text)
+
+    def _score_jd_fit(self, cv_result: Dict, jd_text: str, cv_text: Optional[str] = None) -> Dict:
+        if cv_text is None:
+            cv_text = self._jd_cv_text(cv_result)
+        sector = cv_result.get("sector") or "INFORMATION-TECHNOLOGY"
+        profile = compile_jd_profile(jd_text, sector, self._sector_kw(sector))
+        cv_tokens = set(normalize_tokens(self._tokenize_keywords(cv_text)))
+        return self._fit_against_profile(cv_tokens, profile, self._jd_semantic_boost(cv_text, sector))
+
+    def match_jd_catalogue(self, cv_result: Dict, catalogue: JDCatalogue, top_k: int = 10,
+                           cv_text: Optional[str] = None) -> List[Dict]:
+        """Score one CV against every JD in the catalogue, best openings first.
+        CV text, tokens and the semantic boost are computed once for all JDs."""
+        with timing.stage("jd_fit"):
+            if cv_text is None:
+                cv_text = self._jd_cv_text(cv_result)
+            sector = cv_result.get("sector") or "INFORMATION-TECHNOLOGY"
+            cv_tokens = set(normalize_tokens(self._tokenize_keywords(cv_text)))
+            sem_boost = self._jd_semantic_boost(cv_text, sector)
+            matches = []
+            for entry in catalogue:
+                fit = self._fit_against_profile(cv_tokens, entry.profile, sem_boost)
+                fit["jd_id"] = entry.jd_id
+                fit["title"] = entry.title
+                fit["sector"] = entry.profile.sector
+                matches.append(fit)
+            matches.sort(key=lambda m: (-m["total"], -m["base_overlap"], m["jd_id"]))
+            return matches[:top_k]
+
+    def _sector_kw(self, sector: str) -> List[str]:
+        return [k.lower() for k in self.sector_detector.sector_keywords.get(sector, [])]
+
+    def _jd_cv_text(self, cv_result: Dict) -> str:
         try:
             cv_path = Path(cv_result.get("file", ""))
-            cv_text = self._extract_text_with_ocr_fallback(cv_path) if cv_path.exists() else ""
+            return self._extract_text_with_ocr_fallback(cv_path) if cv_path.exists() else ""
         except Exception:
-            cv_text = ""
-
-        sector = cv_result.get("sector") or "INFORMATION-TECHNOLOGY"
-        sector_kw = [k.lower() for k in self.sector_detector.sector_keywords.get(sector, [])]
-        jd_tokens = set(normalize_tokens(self._tokenize_keywords(jd_text)))
-        cv_tokens = set(normalize_tokens(self._tokenize_keywords(cv_text)))
-
-        # Required set = sector keywords present in JD OR top JD tokens
-        req_keywords = set([kw for kw in sector_kw if kw in jd_tokens])
-        if len(req_keywords) < 10:
-            # augment with frequent JD tokens likely to be skills/tech
-            counts = Counter([w for w in self._tokenize_keywords(jd_text) if len(w) <= 20])
-            for w, c in counts.most_common(30):
-                if c >= 2 and w not in req_keywords and w not in self._stopwords:
-                    req_keywords.add(w)
-                if len(req_keywords) >= 20:
-                    break
-
-        matched = sorted([w for w in req_keywords if w in cv_tokens])
-        missing = sorted([w for w in req_keywords if w not in cv_tokens])
-
-        # Must-have set: role preset + sector keywords present in JD (up to 12)
-        role = infer_role_from_jd(jd_text)
-        role_must = ROLE_PRESETS.get(role, [])
-        must_have = []
-        for w in role_must:
-            if w in jd_tokens and w not in must_have:
-                must_have.append(w)
-        for w in sector_kw:
-            if w in jd_tokens and w not in must_have:
-                must_have.append(w)
-        must_have = must_have[:12]
-        # If still small, fill with frequent JD tokens
-        if len(must_have) < 8:
-            counts = Counter([w for w in normalize_tokens(self._tokenize_keywords(jd_text)) if len(w) <= 20])
-            for w, _c in counts.most_common(40):
-                if w not in must_have and w in req_keywords:
-                    must_have.append(w)
-                if len(must_have) >= 12:
-                    break
-
-        coverage = len(matched) / max(1, len(req_keywords))
-        score = int(round(coverage * 100))
+            return ""
 
+    def _jd_semantic_boost(self, cv_text: str, sector: str) -> int:
         # Semantic boost: if SBERT available, find semantic matches between JD tokens and CV sentences
-        sem_boost = 0
-        sem_count = 0
         try:
             if hasattr(self.semantic_enhancer, "model") and self.semantic_enhancer.model is not None and cv_text:
                 sentences = [s.strip() for s in re.split(r"[.!?\n]", cv_text) if len(s.split()) > 4][:200]
@@ -1312,18 +1633,26 @@ class EnhancedATSScorer:
                     semantic_result = self.semantic_enhancer.enhanced_keyword_matching(cv_text, sector)
                     sem_count = len(semantic_result.get("semantic_matches", []))
                     # conservative boost up to +10 based on semantic matches density
-                    sem_boost = min(10, sem_count // 3)
+                    return min(10, sem_count // 3)
         except Exception:
-            sem_boost = 0
+            pass
+        return 0
+
+    def _fit_against_profile(self, cv_tokens: set, profile: JDProfile, sem_boost: int) -> Dict:
+        req_keywords = profile.required
+        must_have = list(profile.must_have)
+
+        matched = sorted([w for w in req_keywords if w in cv_tokens])
+        missing = sorted([w for w in req_keywords if w not in cv_tokens])
+
+        coverage = len(matched) / max(1, len(req_keywords))
+        score = int(round(coverage * 100))
 
         total = max(0, min(100, score + sem_boost))
-        cap_applied = False
         # Apply must-have cap: need at least 70% of must-have matched, else cap at 60
-        if must_have:
-            must_cov = len([w for w in must_have if w in cv_tokens]) / max(1, len(must_have))
-            if must_cov < 0.7:
-                total = min(total, 60)
-                cap_applied = True
+        total, cap_applied = apply_must_have_cap(
+            total, len([w for w in must_have if w in cv_tokens]), len(must_have)
+        )
         return {
             "total": total,
             "base_overlap": score,
@@ -1334,6 +1663,136 @@ class EnhancedATSScorer:
             "must_have_cap": cap_applied
         }
 
+def score_file_request(scorer: EnhancedATSScorer, pdf_path: Path, sector: Optional[str] = None,
+                       auto_detect: bool = True, budget_ms: Optional[float] = None,
+                       jd_text: Optional[str] = None, jd_file: Optional[str] = None,
+                       jd_catalogue: Optional[str] = None, top_jds: int = 10,
+                       compare_sectors: Optional[str] = None, timings: bool = False) -> Dict:
+    """Score one PDF plus the optional JD fit, JD catalogue ranking and sector comparison
+    (--file and --serve-stdio)"""
+    with timing.collect() as collected:
+        # The extracted text and sector detection are reused below (no second PDF/OCR pass)
+        result, cv_text, detection = scorer.score_pdf_document(pdf_path, sector, auto_detect, budget_ms)
+
+        # Optional JD matching
+        if not jd_text and jd_file:
+            jd_path = Path(jd_file)
+            if jd_path.exists():
+                try:
+                    if jd_path.suffix.lower() == ".pdf":
+                        # reuse OCR pipeline to extract JD from PDF
+                        jd_text = scorer._extract_text_with_ocr_fallback(jd_path)
+                    else:
+                        jd_text = jd_path.read_text(encoding="utf-8", errors="ignore")
+                except Exception as e:
+                    print(f"JD read error: {e}")
+        if jd_text and len(jd_text.strip()) > 30:
+            jd_fit = scorer.score_jd_fit_from_text(result, jd_text, cv_text)
+            result["jd_fit"] = jd_fit
+        if compare_sectors and "error" not in result:
+            if compare_sectors == "all":
+                compare = None
+            elif compare_sectors == "auto":
+                if detection is None:
+                    detection = scorer.detect_sector(cv_text)
+                compare = [result["sector"], detection.detected_sector] + [s for s, _ in detection.alternatives]
+            else:
+                compare = [s.strip() for s in compare_sectors.split(",") if s.strip()]
+            result["sector_comparison"] = scorer.score_sectors(cv_text, compare)
+        if jd_catalogue:
+            catalogue_path = Path(jd_catalogue)
+            if catalogue_path.exists():
+                try:
+                    catalogue = JDCatalogue.load(catalogue_path, scorer.sector_detector.sector_keywords)
+                    result["jd_matches"] = scorer.match_jd_catalogue(result, catalogue, top_jds, cv_text)
+                except Exception as e:
+                    print(f"JD catalogue error: {e}")
+    if timings:
+        result["timings"] = collected.as_dict()
+    return result
+
+
+def rescore_request(scorer: EnhancedATSScorer, request: Dict, sector: Optional[str] = None,
+                    auto_detect: bool = True, timings: bool = False) -> Dict:
+    """Live-preview rescore of {text, sector, previous} (--rescore and op "rescore" of --serve-stdio)"""
+    with timing.collect() as collected:
+        result = scorer.rescore_cv_text(
+            request.get("text", ""), request.get("previous"), request.get("sector") or sector,
+            request.get("auto_detect", auto_detect)
+        )
+    if timings:
+        result["timings"] = collected.as_dict()
+    return result
+
+
+def serve_stdio(scorer: EnhancedATSScorer, threads: int = 1):
+    """JSON-lines worker: one request per stdin line, one response line per request on stdout.
+
+    Request:  {"id", "file", "sector", "auto_detect", "budget_ms", "jd_text", "jd_file",
+               "jd_catalogue", "top_jds", "compare_sectors", "timings", "progress"}
+              ({"id", "op": "ping"} -> "pong"; {"id", "op": "rescore", "text", "sector", "previous",
+              "timings"} -> rescore_request, reusing this process's section cache)
+    Response: {"id", "ok": true, "result"} or {"id", "ok": false, "error"}
+    With "progress": true, {"id", "progress": {"stage", ...}} lines (stage starts, OCR pages)
+    precede the response.
+    The first line is {"ready": true, "pid", "config_version", "lexicon_version"}. With threads > 1 responses come in completion
+    order, matched by id. Progress prints go to stderr. Exits after stdin closes and the
+    pending requests are answered.
+    """
+    out = sys.stdout
+    sys.stdout = sys.stderr  # scorer prints must not corrupt the protocol
+    write_lock = threading.Lock()
+
+    def respond(message: Dict):
+        line = json.dumps(message, ensure_ascii=False)
+        with write_lock:
+            out.write(line + "\n")
+            out.flush()
+
+    def handle(request: Dict):
+        request_id = request.get("id")
+        try:
+            if request.get("op") == "ping":
+                respond({"id": request_id, "ok": True, "result": "pong"})
+                return
+            if request.get("op") == "rescore":
+                respond({"id": request_id, "ok": True,
+                         "result": rescore_request(scorer, request, timings=request.get("timings", False))})
+                return
+            pdf_path = Path(request["file"])
+            if not pdf_path.exists():
+                raise FileNotFoundError(f"File not found: {pdf_path}")
+            listener = (lambda event: respond({"id": request_id, "progress": event})) \
+                if request.get("progress") else None
+            with timing.listen(listener) if listener else contextlib.nullcontext():
+                result = score_file_request(
+                    scorer, pdf_path, request.get("sector"), request.get("auto_detect", True),
+                    request.get("budget_ms"), request.get("jd_text"), request.get("jd_file"),
+                    request.get("jd_catalogue"), request.get("top_jds", 10), request.get("compare_sectors"),
+                    request.get("timings", False)
+                )
+            respond({"id": request_id, "ok": True, "result": result})
+        except Exception as e:
+            respond({"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    config_version = f"{scorer.config.config['version']}-{scorer.config.config['rules_version']}"
+    respond({"ready": True, "pid": os.getpid(), "config_version": config_version,
+             "lexicon_version": scorer.lexicons.version})
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+            except ValueError as e:
+                respond({"id": None, "ok": False, "error": f"Invalid request: {e}"})
+                continue
+            pool.submit(handle, request)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Enhanced ATS Scorer")
     parser.add_argument("--file", dest="single_file", type=str, help="Single PDF file to score")
@@ -1343,12 +1802,37 @@ def main():
     parser.add_argument("--limit", type=int, default=10, help="Limit per sector for batch mode")
     parser.add_argument("--jd-file", type=str, default=None, help="Job Description file (txt/pdf)")
     parser.add_argument("--jd-text", type=str, default=None, help="Job Description text input")
+    parser.add_argument("--jd-catalogue", type=str, default=None, help="JD catalogue JSON to rank openings for the CV")
+    parser.add_argument("--top-jds", type=int, default=10, help="Number of openings to return with --jd-catalogue")
+    parser.add_argument("--timings", action="store_true", help="Include per-stage timings in the JSON output")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Time budget per CV; optional stages (OCR, SBERT, grammar, link checks) are skipped when exceeded")
+    parser.add_argument("--compare-sectors", type=str, default=None,
+                        help="Also score the CV under other sectors: comma-separated list, 'auto' (detected + alternatives) or 'all'")
+    parser.add_argument("--serve-stdio", action="store_true",
+                        help="Warm worker: JSON-lines requests on stdin, one JSON response line each on stdout")
+    parser.add_argument("--threads", type=int, default=1, help="Concurrent requests in --serve-stdio mode")
+    parser.add_argument("--rescore", action="store_true",
+                        help="Read {text, sector, previous} JSON from stdin and rescore only changed sections")
     
     args = parser.parse_args()
     
+    if args.serve_stdio:
+        # Keep progress prints of the scorer's construction off the protocol stream too
+        with contextlib.redirect_stdout(sys.stderr):
+            scorer = EnhancedATSScorer()
+        serve_stdio(scorer, args.threads)
+        return
+    
     scorer = EnhancedATSScorer()
     
-    if args.single_file:
+    if args.rescore:
+        # Live-preview mode for the CV builder
+        request = json.loads(sys.stdin.read() or "{}")
+        result = rescore_request(scorer, request, args.sector, not args.no_auto_detect, args.timings)
+        print(json.dumps(result, ensure_ascii=False))
+    
+    elif args.single_file:
         # Single file mode
         pdf_path = Path(args.single_file)
         if not pdf_path.exists():
@@ -1356,26 +1840,10 @@ def main():
             return
         
         print(f"Scoring: {pdf_path.name}")
-        result = scorer.score_pdf_file(pdf_path, args.sector, not args.no_auto_detect)
-
-        # Optional JD matching
-        jd_text = None
-        if args.jd_text:
-            jd_text = args.jd_text
-        elif args.jd_file:
-            jd_path = Path(args.jd_file)
-            if jd_path.exists():
-                try:
-                    if jd_path.suffix.lower() == ".pdf":
-                        # reuse OCR pipeline to extract JD from PDF
-                        jd_text = scorer._extract_text_with_ocr_fallback(jd_path)
-                    else:
-                        jd_text = jd_path.read_text(encoding="utf-8", errors="ignore")
-                except Exception as e:
-                    print(f"JD read error: {e}")
-        if jd_text and len(jd_text.strip()) > 30:
-            jd_fit = scorer.score_jd_fit_from_text(result, jd_text)
-            result["jd_fit"] = jd_fit
+        result = score_file_request(
+            scorer, pdf_path, args.sector, not args.no_auto_detect, args.budget_ms, args.jd_text, args.jd_file,
+            args.jd_catalogue, args.top_jds, args.compare_sectors, args.timings
+        )
         
         print(json.dumps(result, indent=2, ensure_ascii=False))
         
@@ -1392,7 +1860,7 @@ def main():
             
             for pdf in pdfs:
                 print(f"Scoring: {sector} -> {pdf.name}")
-                result = scorer.score_pdf_file(pdf, sector, not args.no_auto_detect)
+                result = scorer.score_pdf_file(pdf, sector, not args.no_auto_detect, args.budget_ms)
                 results.append(result)
         
         # Save results
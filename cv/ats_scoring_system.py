@@ -19,64 +19,22 @@ import json
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+from ats.lexicon import KeywordMatcher, Lexicons, get_lexicons, plan_keywords, text_tokens
+from ats.rules_extras import EMAIL_RE, MAX_PDF_PAGES, MAX_TEXT_CHARS, PHONE_RE
 from cv_analyzer_prototype import CVAnalyzer
-from pathlib import Path
-import json
 
 
-# Sektör bazlı temel anahtar kelimeler (örnek, genişletilebilir)
+# Sektör anahtar kelimeleri ve aksiyon fiilleri: ortak lexicon paketi (ats/lexicon.py)
 def _load_sector_keywords() -> Dict[str, List[str]]:
-    lex_path = Path("lexicons/sector_keywords.json")
-    if lex_path.exists():
-        try:
-            return json.loads(lex_path.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    # Fallback minimal
-    return {
-    "INFORMATION-TECHNOLOGY": [
-        "python", "java", "javascript", "react", "node", "api", "cloud",
-        "docker", "kubernetes", "sql", "microservices", "aws", "azure",
-    ],
-    "FINANCE": [
-        "budget", "forecast", "sap", "excel", "financial analysis",
-        "audit", "ifrs", "tax", "valuation", "risk",
-    ],
-    "ENGINEERING": [
-        "cad", "autocad", "solidworks", "mechanical", "electrical",
-        "embedded", "matlab", "simulation", "qa", "testing",
-    ],
-    "HEALTHCARE": [
-        "patient", "clinical", "hospital", "emr", "ehr", "compliance",
-        "diagnosis", "treatment", "pharma", "laboratory",
-    ],
-    "ACCOUNTANT": [
-        "bookkeeping", "ledger", "reconciliation", "payable", "receivable",
-        "gst", "vat", "tax", "audit", "tally",
-    ],
-}
+    return get_lexicons().sector_keywords
 
 
 def _load_action_verbs() -> List[str]:
-    lex_path = Path("lexicons/action_verbs.json")
-    if lex_path.exists():
-        try:
-            return json.loads(lex_path.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    # Fallback minimal
-    return [
-        "led", "managed", "developed", "designed", "implemented", "optimized",
-        "built", "created", "delivered", "launched", "increased", "reduced",
-        "improved", "streamlined", "automated", "migrated", "analyzed",
-        "architected", "coordinated", "facilitated", "mentored",
-    ]
-
-
-EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
-PHONE_RE = re.compile(r"\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{3}\)?[\s-]?)?\d{3}[\s-]?\d{4}\b")
+    return get_lexicons().action_verbs
+
+
 DATE_RE = re.compile(r"\b(?:\d{1,2}[\-/]\d{1,2}[\-/]\d{2,4}|\w+\s+\d{4}|\d{4})\b", re.IGNORECASE)
 
 
@@ -91,13 +49,30 @@ class ScoreBreakdown:
     notes: List[str]
 
 
+@dataclass
+class ScoringContext:
+    """Her şey bir kez yüklenir: analyzer (bölüm desenleri) ve lexicon paketi.
+    Toplu işlerde (score_many, cli_score) tek bir context paylaşılır."""
+    analyzer: CVAnalyzer
+    lexicons: Lexicons
+
+    @classmethod
+    def create(cls, data_root: str = "data", analyzer: Optional[CVAnalyzer] = None) -> "ScoringContext":
+        return cls(analyzer if analyzer is not None else CVAnalyzer(data_root), get_lexicons())
+
+
+_default_context: Optional[ScoringContext] = None
+
+
+def default_context() -> ScoringContext:
+    global _default_context
+    if _default_context is None:
+        _default_context = ScoringContext.create()
+    return _default_context
+
+
 def _count_keywords(text: str, keywords: List[str]) -> int:
-    text_l = text.lower()
-    hits = 0
-    for kw in keywords:
-        if re.search(rf"\b{re.escape(kw.lower())}\b", text_l):
-            hits += 1
-    return hits
+    return KeywordMatcher(plan_keywords(keywords)).count(text.lower())
 
 
 def _has_contact(text: str) -> bool:
@@ -123,7 +98,10 @@ def _length_score(text: str) -> float:
 
 
 def _action_verbs_score(text: str, action_verbs: List[str]) -> float:
-    hits = _count_keywords(text, action_verbs)
+    return _action_hits_score(_count_keywords(text, action_verbs))
+
+
+def _action_hits_score(hits: int) -> float:
     if hits >= 10:
         return 1.0
     if hits >= 5:
@@ -133,12 +111,15 @@ def _action_verbs_score(text: str, action_verbs: List[str]) -> float:
     return 0.0
 
 
-def score_cv_text(cv_text: str, sector: str, analyzer: CVAnalyzer | None = None) -> ScoreBreakdown:
+def score_cv_text(cv_text: str, sector: str, analyzer: CVAnalyzer | None = None,
+                  context: Optional[ScoringContext] = None) -> ScoreBreakdown:
     """Deterministik ATS skoru ve kırılımları hesapla."""
-    if analyzer is None:
-        analyzer = CVAnalyzer("data")
+    if context is None:
+        context = default_context() if analyzer is None else ScoringContext(analyzer, get_lexicons())
+    lex = context.lexicons
+    cv_text = cv_text[:MAX_TEXT_CHARS]
 
-    sections = analyzer.detect_sections(cv_text)
+    sections = context.analyzer.detect_sections(cv_text)
 
     notes: List[str] = []
     score_sections = 0
@@ -176,17 +157,16 @@ def score_cv_text(cv_text: str, sector: str, analyzer: CVAnalyzer | None = None)
         notes.append("Madde işaretleri az; okunabilirlik düşebilir")
 
     # Sektör anahtar kelimeleri (30 puan)
-    sector_kw_map = _load_sector_keywords()
-    sector_kw = sector_kw_map.get(sector, [])
-    kw_hits = _count_keywords(cv_text, sector_kw)
+    text_l = cv_text.lower()
+    tokens = text_tokens(text_l)
+    kw_hits = lex.sector_matcher(sector).count(text_l, tokens)
     # 0..30 doğrusal ölçek (>=15 hit -> 30)
     score_keywords = min(30, int((kw_hits / 15.0) * 30))
     if score_keywords < 18:
         notes.append("Sektörüne özgü anahtar kelime yoğunluğu düşük")
 
     # Aksiyon fiilleri (20 puan)
-    action_verbs = _load_action_verbs()
-    actions_component = _action_verbs_score(cv_text, action_verbs)
+    actions_component = _action_hits_score(lex.action_matcher().count(text_l, tokens))
     score_actions = int(actions_component * 20)
     if score_actions < 10:
         notes.append("Güçlü aksiyon fiilleri kullanımını artırın (led, built, delivered, optimized)")
@@ -216,7 +196,8 @@ def score_cv_text(cv_text: str, sector: str, analyzer: CVAnalyzer | None = None)
     )
 
 
-def generate_recommendations(breakdown: ScoreBreakdown, sector: str) -> List[str]:
+def generate_recommendations(breakdown: ScoreBreakdown, sector: str,
+                             context: Optional[ScoringContext] = None) -> List[str]:
     """Kural tabanlı öneriler (deterministik)."""
     recs: List[str] = []
     recs.extend(breakdown.notes)
@@ -228,7 +209,7 @@ def generate_recommendations(breakdown: ScoreBreakdown, sector: str) -> List[str
         recs.append("Tarih formatlarını tek tipe çekin (MMM YYYY – MMM YYYY) ve madde işareti kullanın")
 
     if breakdown.keywords < 24:
-        sector_kw_map = _load_sector_keywords()
+        sector_kw_map = (context or default_context()).lexicons.sector_keywords
         top_kw = ", ".join(sector_kw_map.get(sector, [])[:8])
         recs.append(f"Sektör anahtar kelimelerini artırın (örn: {top_kw})")
 
@@ -248,17 +229,20 @@ def generate_recommendations(breakdown: ScoreBreakdown, sector: str) -> List[str
     return final[:10]
 
 
-def score_pdf_file(pdf_path: Path, sector: str, analyzer: CVAnalyzer) -> Dict:
-    text = analyzer.parse_pdf(pdf_path)
-    if not text or len(text.strip()) == 0:
-        return {
-            "file": str(pdf_path),
-            "sector": sector,
-            "error": "Empty or unreadable text (possibly scanned PDF)",
-        }
-    breakdown = score_cv_text(text, sector, analyzer)
+def score_many(texts: Sequence[str], sectors: Union[str, Sequence[str]],
+               context: Optional[ScoringContext] = None) -> List[ScoreBreakdown]:
+    """Bir liste CV metnini tek çağrıda skorla (tek sektör ya da metin başına bir sektör)."""
+    if isinstance(sectors, str):
+        sectors = [sectors] * len(texts)
+    if len(sectors) != len(texts):
+        raise ValueError("texts and sectors must have the same length")
+    context = context or default_context()
+    return [score_cv_text(text, sector, context=context) for text, sector in zip(texts, sectors)]
+
+
+def breakdown_to_result(breakdown: ScoreBreakdown, sector: str,
+                        context: Optional[ScoringContext] = None) -> Dict:
     return {
-        "file": str(pdf_path),
         "sector": sector,
         "score": breakdown.total,
         "breakdown": {
@@ -268,10 +252,25 @@ def score_pdf_file(pdf_path: Path, sector: str, analyzer: CVAnalyzer) -> Dict:
             "actions": breakdown.actions,
             "completeness": breakdown.completeness,
         },
-        "recommendations": generate_recommendations(breakdown, sector),
+        "recommendations": generate_recommendations(breakdown, sector, context),
     }
 
 
+def score_pdf_file(pdf_path: Path, sector: str, analyzer: CVAnalyzer,
+                   context: Optional[ScoringContext] = None) -> Dict:
+    if context is None:
+        context = ScoringContext(analyzer, get_lexicons())
+    text = context.analyzer.parse_pdf(pdf_path, MAX_PDF_PAGES)
+    if not text or len(text.strip()) == 0:
+        return {
+            "file": str(pdf_path),
+            "sector": sector,
+            "error": "Empty or unreadable text (possibly scanned PDF)",
+        }
+    breakdown = score_cv_text(text, sector, context=context)
+    return {"file": str(pdf_path), **breakdown_to_result(breakdown, sector, context)}
+
+
 def main():
     # data/ veya data/data/ altındaki TÜM sektör klasörlerini otomatik tara ve her birinden ilk 10 PDF'i skorla
     base = Path("data")
@@ -281,6 +280,7 @@ def main():
 
     results: List[Dict] = []
     analyzer = CVAnalyzer(str(data_root))
+    context = ScoringContext(analyzer, get_lexicons())
     for sector in sectors:
         sector_dir = data_root / sector
         pdfs = list(sector_dir.glob("*.pdf"))[:10]
@@ -289,7 +289,7 @@ def main():
         for f in pdfs:
             print(f"Scoring: {sector} -> {f.name}")
             try:
-                results.append(score_pdf_file(f, sector, analyzer))
+                results.append(score_pdf_file(f, sector, analyzer, context))
             except Exception as e:
                 results.append({"file": str(f), "sector": sector, "error": str(e)})
 
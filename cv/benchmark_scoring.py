@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Scoring throughput/latency benchmark over text corpora (no PDF extraction cost).
+
+Documents are streamed from resumedatasets.csv and/or the cached PDF corpus
+(see corpus.py) and scored with EnhancedATSScorer.score_cv_text. Reports
+latency percentiles and mean per-stage time (ats.timing).
+
+Usage:
+  python benchmark_scoring.py --csv --limit 200
+  python benchmark_scoring.py --pdf --limit 200 --auto-detect
+  python benchmark_scoring.py --csv --limit 1000 --batch --workers 4   # score_batch throughput
+  python benchmark_scoring.py --adversarial --max-ms 2000   # pathological inputs; exit 1 over the bound
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from ats import timing
+from ats.rules_extras import MAX_TEXT_CHARS
+from ats_scoring_enhanced import EnhancedATSScorer
+from corpus import DEFAULT_CACHE_PATH, DEFAULT_CSV_PATH, CorpusDocument, csv_documents, default_data_root, load_pdf_corpus
+
+
+# Repeated units that used to trigger super-linear regex backtracking in the rules
+ADVERSARIAL_UNITS: Dict[str, str] = {
+    "long_word": "a",
+    "digit_run": "1",
+    "digit_space": "1 ",
+    "digit_dash": "1-",
+    "comma_flood": ",",
+    "keyword_commas": "python, ",
+    "blank_run": " ",
+    "blank_lines": " " * 200 + "\n",
+    "dotted_token": "a.",
+    "at_signs": "a@",
+    "hyphen_chain": "abc-",
+    "hyphen_blank_lines": "abc-\n\n",
+    "impact_verbs": "increased ",
+    "passive_aux": "was ",
+    "month_names": "Jan ",
+    "date_ranges": "Jan 2019 - ",
+    "numeric_dates": "1.1.",
+    "summary_blanks": "summary" + " " * 500,
+    "pipes": "| ",
+    "skills_list": "skills: a, ",
+    "phone_prefix": "+1 (",
+    "bullets": "- " + "x" * 50 + "\n",
+}
+
+
+def adversarial_documents(size: int = MAX_TEXT_CHARS) -> Iterable[CorpusDocument]:
+    """One pathological text of `size` characters per unit (above the cap to exercise truncation)"""
+    for name, unit in ADVERSARIAL_UNITS.items():
+        text = (unit * (size // len(unit) + 1))[:size]
+        yield CorpusDocument(f"adversarial:{name}", "INFORMATION-TECHNOLOGY", text)
+
+
+def run_adversarial_benchmark(scorer: EnhancedATSScorer, size: int, max_ms: float) -> Dict:
+    """Worst-case latency per pathological input; `over_bound` lists cases slower than max_ms"""
+    cases = {}
+    for doc in adversarial_documents(size):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scorer.score_cv_text(doc.text, doc.sector, False)
+        cases[doc.path.split(":", 1)[1]] = round((time.perf_counter() - started) * 1000, 2)
+    return {
+        "size_chars": size,
+        "max_ms": max_ms,
+        "worst_ms": max(cases.values()),
+        "over_bound": sorted(name for name, ms in cases.items() if ms > max_ms),
+        "cases_ms": cases,
+    }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_benchmark(scorer: EnhancedATSScorer, docs: Iterable[CorpusDocument], limit: Optional[int] = None,
+                  auto_detect: bool = False) -> Dict:
+    latencies: List[float] = []
+    stage_totals: Dict[str, float] = defaultdict(float)
+    started = time.perf_counter()
+    for doc in itertools.islice(docs, limit):
+        if not doc.text:
+            continue
+        # score_cv_text prints detection details; keep the report clean
+        with timing.collect() as timings, contextlib.redirect_stdout(io.StringIO()):
+            scorer.score_cv_text(doc.text, None if auto_detect else doc.sector, auto_detect)
+        latencies.append(timings.total * 1000)
+        for stage, seconds in timings.stages.items():
+            stage_totals[stage] += seconds * 1000
+    elapsed = time.perf_counter() - started
+
+    n = len(latencies)
+    latencies.sort()
+    return {
+        "documents": n,
+        "elapsed_s": round(elapsed, 2),
+        "docs_per_s": round(n / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / n, 2) if n else 0.0,
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if n else 0.0,
+        },
+        "mean_stage_ms": {k: round(v / n, 2) for k, v in sorted(stage_totals.items())} if n else {},
+    }
+
+
+def run_batch_benchmark(scorer: EnhancedATSScorer, docs: Iterable[CorpusDocument], limit: Optional[int] = None,
+                        auto_detect: bool = False, workers: Optional[int] = None) -> Dict:
+    """Throughput of EnhancedATSScorer.score_batch (feature matrix + vectorized scores)"""
+    batch = [doc for doc in itertools.islice(docs, limit) if doc.text]
+    texts = [doc.text for doc in batch]
+    started = time.perf_counter()
+    with timing.collect() as timings, contextlib.redirect_stdout(io.StringIO()):
+        result = scorer.score_batch(texts, None if auto_detect else [doc.sector for doc in batch], workers)
+    elapsed = time.perf_counter() - started
+    return {
+        "documents": len(texts),
+        "elapsed_s": round(elapsed, 2),
+        "docs_per_s": round(len(texts) / elapsed, 2) if elapsed else 0.0,
+        "mean_total": round(float(result["total"].mean()), 2) if texts else 0.0,
+        "stage_ms": {k: round(v * 1000, 2) for k, v in sorted(timings.stages.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ATS scoring on text corpora")
+    parser.add_argument("--pdf", action="store_true", help="Use the PDF corpus (data/data, cached text)")
+    parser.add_argument("--csv", nargs="?", const=str(DEFAULT_CSV_PATH), default=None,
+                        help="Use a Category,Resume CSV corpus (default: resumedatasets.csv)")
+    parser.add_argument("--cache", type=str, default=str(DEFAULT_CACHE_PATH), help="PDF corpus text cache")
+    parser.add_argument("--limit", type=int, default=200, help="Max documents per source")
+    parser.add_argument("--auto-detect", action="store_true", help="Include sector detection in the timing")
+    parser.add_argument("--batch", action="store_true", help="Measure score_batch instead of per-CV scoring")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for --batch feature extraction")
+    parser.add_argument("--adversarial", action="store_true", help="Score pathological inputs against --max-ms")
+    parser.add_argument("--size", type=int, default=2 * MAX_TEXT_CHARS, help="Characters per adversarial input")
+    parser.add_argument("--max-ms", type=float, default=2000.0, help="Latency bound per adversarial input")
+    args = parser.parse_args()
+
+    if not (args.pdf or args.csv or args.adversarial):
+        parser.error("choose at least one source: --pdf, --csv and/or --adversarial")
+
+    scorer = EnhancedATSScorer()
+
+    def bench(docs):
+        if args.batch:
+            return run_batch_benchmark(scorer, docs, args.limit, args.auto_detect, args.workers)
+        return run_benchmark(scorer, docs, args.limit, args.auto_detect)
+
+    report = {}
+    if args.pdf:
+        report["pdf"] = bench(load_pdf_corpus(default_data_root(), Path(args.cache)))
+    if args.csv:
+        report["csv"] = bench(csv_documents(Path(args.csv)))
+    if args.adversarial:
+        report["adversarial"] = run_adversarial_benchmark(scorer, args.size, args.max_ms)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.adversarial and report["adversarial"]["over_bound"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
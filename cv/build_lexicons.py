@@ -6,26 +6,48 @@ Build sector-specific lexicons from PDF CVs under data/.
 Outputs:
   - lexicons/sector_keywords.json   (top keywords per sector)
   - lexicons/action_verbs.json      (common action verbs merged TR/EN)
+  - lexicons/lexicon_bundle.bin     (compiled bundle read by the scorers, see ats/lexicon.py)
 
 Heuristic approach:
-  - Parse PDFs to text (reuse CVAnalyzer.parse_pdf)
+  - Parse PDFs to text (reuse CVAnalyzer.parse_pdf; cached in cache/corpus_texts.json,
+    only new/changed PDFs are parsed, in parallel -- see corpus.py)
   - Tokenize, lowercase, strip punctuation/numbers
   - Remove stopwords (EN+TR minimal lists)
   - Keep alphabetic tokens of length >= 2
-  - Rank by frequency and TF-IDF-like weighting across sectors
+  - Rank by frequency and TF-IDF-like weighting across sectors, or (--method tfidf|chi2)
+    with scikit-learn over sparse doc-term matrices of uni/bi-grams
   - Extract action verbs by intersecting with a seed verb list and POS-like heuristics
 """
 
 from __future__ import annotations
 
+import argparse
+import itertools
 import json
 import os
 import re
 from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Union
 
-from cv_analyzer_prototype import CVAnalyzer
+from ats import lexicon
+from corpus import (
+    DEFAULT_CACHE_PATH,
+    DEFAULT_CSV_PATH,
+    CorpusDocument,
+    csv_documents,
+    default_data_root,
+    load_pdf_corpus,
+)
+
+# Vectorized builder (optional)
+try:
+    import numpy as np
+    from scipy import sparse
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
 
 
 EN_STOP = {
@@ -62,24 +84,43 @@ def tokenize(text: str) -> List[str]:
     return TOKEN_RE.findall(text)
 
 
-def build_sector_keywords(data_dir: str, per_sector_limit: int = 100) -> Dict[str, List[str]]:
-    analyzer = CVAnalyzer(data_dir)
-    data_path = Path(data_dir)
-    sector_to_counts: Dict[str, Counter] = {}
+def lexicon_terms(text: str, ngram_max: int = 2) -> List[str]:
+    """Unigrams plus n-grams (up to ngram_max) of adjacent non-stopword tokens.
+    Stopwords break n-grams instead of being skipped ("bachelor of science" gives no bigram)."""
+    tokens = [t for t in tokenize(text) if len(t) >= 2]
+    keep = [t not in EN_STOP and t not in TR_STOP for t in tokens]
+    terms = [t for t, k in zip(tokens, keep) if k]
+    for n in range(2, ngram_max + 1):
+        for i in range(len(tokens) - n + 1):
+            if all(keep[i:i + n]):
+                terms.append(" ".join(tokens[i:i + n]))
+    return terms
+
 
+def build_sector_keywords(data_dir: str, per_sector_limit: int = 100, workers: Optional[int] = None,
+                          cache_path: Path = DEFAULT_CACHE_PATH, method: str = "frequency",
+                          extra_docs: Optional[Iterable[CorpusDocument]] = None,
+                          **vector_options) -> Dict[str, List[str]]:
+    """extra_docs: additional (streamed) documents, e.g. corpus.csv_documents()"""
+    data_path = Path(data_dir)
     sectors = [p.name for p in data_path.iterdir() if p.is_dir()]
-    for sector in sectors:
-        sector_dir = data_path / sector
-        counts: Counter = Counter()
-        pdfs = list(sector_dir.glob("*.pdf"))
-        for pdf in pdfs:
-            txt = analyzer.parse_pdf(pdf)
-            if not txt:
-                continue
-            tokens = [t for t in tokenize(txt) if len(t) >= 2]
-            tokens = [t for t in tokens if t not in EN_STOP and t not in TR_STOP]
-            counts.update(tokens)
-        sector_to_counts[sector] = counts
+    docs: Iterable[CorpusDocument] = load_pdf_corpus(data_path, cache_path, workers)
+    if extra_docs is not None:
+        docs = itertools.chain(docs, extra_docs)
+    if method == "frequency":
+        return sector_keywords_from_docs(docs, per_sector_limit, sectors)
+    return sector_keywords_vectorized(docs, per_sector_limit, method, sectors=sectors, **vector_options)
+
+
+def sector_keywords_from_docs(docs: Iterable[CorpusDocument], per_sector_limit: int = 100,
+                              sectors: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    sector_to_counts: Dict[str, Counter] = {s: Counter() for s in sectors or []}
+    for doc in docs:
+        if not doc.text:
+            continue
+        tokens = [t for t in tokenize(doc.text) if len(t) >= 2]
+        tokens = [t for t in tokens if t not in EN_STOP and t not in TR_STOP]
+        sector_to_counts.setdefault(doc.sector, Counter()).update(tokens)
 
     # IDF-like weighting: downweight terms common across many sectors
     df: Counter = Counter()
@@ -101,6 +142,65 @@ def build_sector_keywords(data_dir: str, per_sector_limit: int = 100) -> Dict[st
     return sector_keywords
 
 
+def sector_keywords_vectorized(docs: Iterable[CorpusDocument], per_sector_limit: int = 100,
+                               method: str = "tfidf", ngram_max: int = 2,
+                               min_df: Union[int, float] = 2, max_df: Union[int, float] = 0.5,
+                               sectors: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Rank uni/bi-gram terms per sector in one pass over the corpus.
+
+    method="tfidf": mean sublinear TF-IDF of the term over the sector's documents.
+    method="chi2":  per-sector chi-squared statistic of term counts vs. the rest of the
+                    corpus, keeping only terms over-represented in the sector.
+    Terms outside [min_df, max_df] document frequency are pruned first. Documents are
+    streamed into the vectorizer, so the corpus is never held as a list of texts.
+    """
+    if not SKLEARN_AVAILABLE:
+        raise RuntimeError("Vectorized lexicon building needs scikit-learn. Install: pip install scikit-learn")
+    if method not in ("tfidf", "chi2"):
+        raise ValueError(f"Unknown method: {method}")
+
+    labels: List[str] = []
+
+    def texts():
+        for doc in docs:
+            if doc.text:
+                labels.append(doc.sector)
+                yield doc.text
+
+    vectorizer = CountVectorizer(analyzer=lambda text: lexicon_terms(text, ngram_max),
+                                 min_df=min_df, max_df=max_df, dtype=np.float64)
+    counts = vectorizer.fit_transform(texts())
+    terms = vectorizer.get_feature_names_out()
+
+    sector_names = list(dict.fromkeys(list(sectors or []) + labels))
+    sector_idx = {s: i for i, s in enumerate(sector_names)}
+    n_docs = len(labels)
+    # sectors x documents membership matrix
+    membership = sparse.csr_matrix(
+        (np.ones(n_docs), ([sector_idx[s] for s in labels], np.arange(n_docs))),
+        shape=(len(sector_names), n_docs),
+    )
+    docs_per_sector = np.asarray(membership.sum(axis=1)).ravel()
+
+    if method == "tfidf":
+        weights = TfidfTransformer(sublinear_tf=True).fit_transform(counts)
+        scores = np.asarray((membership @ weights).todense()) / np.maximum(docs_per_sector, 1)[:, None]
+    else:
+        observed = np.asarray((membership @ counts).todense())
+        term_totals = np.asarray(counts.sum(axis=0)).ravel()
+        expected = np.outer(docs_per_sector / max(1, n_docs), term_totals)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            chi = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+        scores = np.where(observed > expected, chi, 0.0)
+
+    sector_keywords: Dict[str, List[str]] = {}
+    for sector, i in sector_idx.items():
+        row = scores[i]
+        top = np.argsort(-row, kind="stable")[:per_sector_limit]
+        sector_keywords[sector] = [str(terms[j]) for j in top if row[j] > 0]
+    return sector_keywords
+
+
 def build_action_verbs(sector_keywords: Dict[str, List[str]]) -> List[str]:
     # Start with seed verbs and add frequent verb-like tokens (heuristic: ends with common verb suffixes)
     verbs = set(SEED_ACTION_VERBS_EN) | set(SEED_ACTION_VERBS_TR)
@@ -114,14 +214,35 @@ def build_action_verbs(sector_keywords: Dict[str, List[str]]) -> List[str]:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Build sector keyword and action verb lexicons")
+    parser.add_argument("--workers", type=int, default=None, help="PDF parser processes (default: CPU count)")
+    parser.add_argument("--cache", type=str, default=str(DEFAULT_CACHE_PATH), help="Corpus text cache path")
+    parser.add_argument("--method", choices=["frequency", "tfidf", "chi2"], default="frequency",
+                        help="Keyword ranking (tfidf/chi2 need scikit-learn and add bigram terms)")
+    parser.add_argument("--ngram-max", type=int, default=2, help="Longest n-gram for tfidf/chi2")
+    parser.add_argument("--min-df", type=float, default=2, help="Min document frequency (count, or fraction if < 1)")
+    parser.add_argument("--max-df", type=float, default=0.5, help="Max document frequency (fraction, or count if > 1)")
+    parser.add_argument("--limit", type=int, default=100, help="Keywords per sector")
+    parser.add_argument("--csv", nargs="?", const=str(DEFAULT_CSV_PATH), default=None,
+                        help="Also learn from a Category,Resume CSV corpus (default: resumedatasets.csv)")
+    args = parser.parse_args()
+
     # data/ veya data/data/ altındaki TÜM sektör klasörlerini otomatik tara
-    base = Path("data")
-    data_dir = str(base / "data" if (base / "data").exists() else base)
+    data_dir = str(default_data_root())
     out_dir = Path("lexicons")
     out_dir.mkdir(parents=True, exist_ok=True)
 
     print("Building sector keywords...")
-    sector_kw = build_sector_keywords(data_dir)
+    vector_options = {}
+    if args.method != "frequency":
+        vector_options = {
+            "ngram_max": args.ngram_max,
+            "min_df": args.min_df if args.min_df < 1 else int(args.min_df),
+            "max_df": args.max_df if args.max_df <= 1 else int(args.max_df),
+        }
+    extra_docs = csv_documents(Path(args.csv)) if args.csv else None
+    sector_kw = build_sector_keywords(data_dir, args.limit, args.workers, Path(args.cache),
+                                      args.method, extra_docs, **vector_options)
     (out_dir / "sector_keywords.json").write_text(
         json.dumps(sector_kw, indent=2, ensure_ascii=False), encoding="utf-8"
     )
@@ -134,6 +255,9 @@ def main():
     )
     print(f"Saved: {out_dir / 'action_verbs.json'}")
 
+    print("Compiling lexicon bundle...")
+    lexicon.main()
+
 
 if __name__ == "__main__":
     main()
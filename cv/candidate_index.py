@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Candidate pool index: rank every indexed CV against one job description.
+
+The index stores, per CV, the same normalized keyword tokens that
+score_jd_fit_from_text compares against (normalize_tokens output) plus the
+skill groups found in the text (as "skill:<Group>" terms, usable as filters).
+Postings map a term to the CVs containing it, so a JD query only touches the
+postings of its required and must-have keywords instead of re-extracting
+every PDF.
+
+Usage:
+  python candidate_index.py --build                      # index data/data PDFs
+  python candidate_index.py --jd-file ilan.pdf --top 50   # rank pool for a JD
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterable, List, Optional, Set
+
+from ats.rules_extras import normalize_tokens
+from ats.jd_profile import apply_must_have_cap, compile_jd_profile, tokenize_keywords
+from ats_scoring_system import _load_sector_keywords
+from cv_analyzer_prototype import CVAnalyzer
+from semantic_enhancer import SkillNormalizer
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = Path("index/candidate_index.json")
+
+
+class CandidateIndex:
+    """Inverted index (term -> doc ids) with per-document metadata and lengths"""
+
+    def __init__(self):
+        self.docs: List[Optional[Dict]] = []  # None marks a replaced document
+        self.postings: Dict[str, List[int]] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._skill_normalizer: Optional[SkillNormalizer] = None
+
+    def document_terms(self, text: str) -> Set[str]:
+        """Terms for one CV: JD-fit tokens plus skill:<Group> terms"""
+        if self._skill_normalizer is None:
+            self._skill_normalizer = SkillNormalizer()
+        terms = set(normalize_tokens(tokenize_keywords(text)))
+        terms.update(f"skill:{s}" for s in self._skill_normalizer.extract_skills_from_text(text))
+        return terms
+
+    def add(self, file: str, sector: str, text: str, score: Optional[int] = None) -> int:
+        """Index (or re-index) one CV; returns its doc id"""
+        old_id = self._doc_ids.get(file)
+        if old_id is not None:
+            self.docs[old_id] = None
+        terms = self.document_terms(text)
+        doc_id = len(self.docs)
+        length = sum(1 for t in terms if not t.startswith("skill:"))
+        self.docs.append({"file": file, "sector": sector, "score": score, "length": length})
+        self._doc_ids[file] = doc_id
+        for term in terms:
+            self.postings.setdefault(term, []).append(doc_id)
+        return doc_id
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def rank(self, jd_text: str, sector: str = "INFORMATION-TECHNOLOGY", top_k: int = 50,
+             sector_keywords: Optional[Dict[str, List[str]]] = None,
+             sectors: Optional[Iterable[str]] = None,
+             skills: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Top-k CVs by JD keyword coverage, with the JD-fit must-have cap applied.
+
+        `sector` selects the sector lexicon used to derive JD requirements;
+        `sectors` / `skills` optionally restrict the pool to CVs of those
+        sectors / having all of those skill groups (e.g. "Python").
+        """
+        kw_map = sector_keywords if sector_keywords is not None else _load_sector_keywords()
+        sector_kw = [k.lower() for k in kw_map.get(sector, [])]
+        profile = compile_jd_profile(jd_text, sector, sector_kw)
+        req_keywords, must_have = profile.required, profile.must_have
+
+        n = len(self.docs)
+        matched = [0] * n
+        must_matched = [0] * n
+        for term in req_keywords:
+            for doc_id in self.postings.get(term, ()):
+                matched[doc_id] += 1
+        for term in must_have:
+            for doc_id in self.postings.get(term, ()):
+                must_matched[doc_id] += 1
+
+        allowed = set(sectors) if sectors else None
+        required_docs: Optional[Set[int]] = None
+        for skill in skills or ():
+            ids = set(self.postings.get(f"skill:{skill}", ()))
+            required_docs = ids if required_docs is None else required_docs & ids
+        req_total = max(1, len(req_keywords))
+        candidates = []
+        for doc_id, doc in enumerate(self.docs):
+            if doc is None or (allowed is not None and doc["sector"] not in allowed):
+                continue
+            if required_docs is not None and doc_id not in required_docs:
+                continue
+            base = int(round(matched[doc_id] / req_total * 100))
+            total, cap = apply_must_have_cap(min(100, base), must_matched[doc_id], len(must_have))
+            # Ties: fewer distinct terms = more focused CV
+            candidates.append((total, base, -doc["length"], -doc_id, cap))
+
+        top = heapq.nlargest(top_k, candidates)
+        req_sets = {t: set(self.postings.get(t, ())) for t in req_keywords}
+        results = []
+        for total, base, _neg_len, neg_id, cap in top:
+            doc_id = -neg_id
+            doc = self.docs[doc_id]
+            results.append({
+                "file": doc["file"],
+                "sector": doc["sector"],
+                "ats_score": doc["score"],
+                "total": total,
+                "base_overlap": base,
+                "must_have_cap": cap,
+                "matched_keywords": sorted(t for t, ids in req_sets.items() if doc_id in ids)[:30],
+            })
+        return results
+
+    def save(self, path: Path = DEFAULT_INDEX_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Compact: drop replaced docs and renumber postings
+        remap: Dict[int, int] = {}
+        docs: List[Dict] = []
+        for doc_id, doc in enumerate(self.docs):
+            if doc is not None:
+                remap[doc_id] = len(docs)
+                docs.append(doc)
+        postings = {}
+        for term, ids in self.postings.items():
+            live = [remap[i] for i in ids if i in remap]
+            if live:
+                postings[term] = live
+        data = {"version": INDEX_VERSION, "docs": docs, "postings": postings}
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_INDEX_PATH) -> "CandidateIndex":
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {data.get('version')}")
+        index = cls()
+        index.docs = data["docs"]
+        index.postings = data["postings"]
+        index._doc_ids = {d["file"]: i for i, d in enumerate(index.docs)}
+        return index
+
+
+def _score_key(file: str) -> str:
+    """Score lookup key: the path relative to the data root (SECTOR/name.pdf), / separated.
+    Batch outputs may hold Windows paths (data\\data\\HR\\1.pdf) or another root."""
+    return "/".join(PurePosixPath(file.replace("\\", "/")).parts[-2:])
+
+
+def _load_scores(path: Path) -> Dict[str, int]:
+    """SECTOR/name.pdf -> ATS score from a batch run output (ats_scores_enhanced.json), if present"""
+    if not path.exists():
+        return {}
+    try:
+        results = json.loads(path.read_text(encoding="utf-8")).get("results", [])
+    except Exception:
+        return {}
+    return {_score_key(r["file"]): r.get("score") for r in results if "file" in r and "error" not in r}
+
+
+def build_index(data_root: Path, scores_path: Path = Path("ats_scores_enhanced.json")) -> CandidateIndex:
+    analyzer = CVAnalyzer(str(data_root))
+    scores = _load_scores(scores_path)
+    index = CandidateIndex()
+    for sector_dir in sorted(p for p in data_root.iterdir() if p.is_dir()):
+        pdfs = sorted(sector_dir.glob("*.pdf"))
+        print(f"Indexing {sector_dir.name}: {len(pdfs)} CVs")
+        for pdf in pdfs:
+            text = analyzer.parse_pdf(pdf)
+            if text:
+                index.add(str(pdf), sector_dir.name, text, scores.get(pdf.relative_to(data_root).as_posix()))
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank a CV pool against a job description")
+    parser.add_argument("--build", action="store_true", help="(Re)build the index from the data directory")
+    parser.add_argument("--data", type=str, default=None, help="Data root (default: data/data or data)")
+    parser.add_argument("--index", type=str, default=str(DEFAULT_INDEX_PATH), help="Index file path")
+    parser.add_argument("--jd-file", type=str, default=None, help="Job Description file (txt/pdf)")
+    parser.add_argument("--jd-text", type=str, default=None, help="Job Description text input")
+    parser.add_argument("--sector", type=str, default="INFORMATION-TECHNOLOGY", help="Sector lexicon for the JD")
+    parser.add_argument("--only-sector", action="append", default=None, help="Restrict pool to sector (repeatable)")
+    parser.add_argument("--skill", action="append", default=None, help="Require skill group, e.g. Python (repeatable)")
+    parser.add_argument("--top", type=int, default=50, help="Number of CVs to return")
+    args = parser.parse_args()
+
+    index_path = Path(args.index)
+    if args.build:
+        base = Path(args.data) if args.data else Path("data")
+        data_root = base / "data" if (base / "data").exists() else base
+        index = build_index(data_root)
+        index.save(index_path)
+        print(f"Indexed {len(index)} CVs -> {index_path}")
+        if not (args.jd_text or args.jd_file):
+            return
+
+    jd_text = args.jd_text
+    if not jd_text and args.jd_file:
+        jd_path = Path(args.jd_file)
+        if jd_path.suffix.lower() == ".pdf":
+            jd_text = CVAnalyzer("data").parse_pdf(jd_path)
+        else:
+            jd_text = jd_path.read_text(encoding="utf-8", errors="ignore")
+    if not jd_text:
+        print("Use --build to index CVs and --jd-file/--jd-text to rank them")
+        return
+
+    index = CandidateIndex.load(index_path)
+    ranked = index.rank(jd_text, args.sector, args.top, sectors=args.only_sector, skills=args.skill)
+    print(json.dumps({"indexed": len(index), "results": ranked}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-CLI wrapper to score a single CV PDF using the deterministic ATS scorer.
+CLI wrapper to score CV PDFs using the deterministic ATS scorer.
 
 Usage:
   python cv/cli_score.py --file /path/to/file.pdf --sector INFORMATION-TECHNOLOGY
+  python cv/cli_score.py --file a.pdf b.pdf c.pdf --sector FINANCE
 
-Outputs a single-line JSON to stdout with keys:
+Lexicons and the analyzer are loaded once (ScoringContext) and shared by all files.
+Outputs one single-line JSON per file to stdout with keys:
   {
     "file": str,
     "sector": str,
@@ -23,36 +25,38 @@ import json
 import sys
 from pathlib import Path
 
-from ats_scoring_system import score_pdf_file
+from ats_scoring_system import ScoringContext, score_pdf_file
 from cv_analyzer_prototype import CVAnalyzer
 
 
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Score a single CV PDF and output JSON")
-    parser.add_argument("--file", required=True, help="Path to the CV PDF file")
+    parser = argparse.ArgumentParser(description="Score CV PDFs and output JSON lines")
+    parser.add_argument("--file", required=True, nargs="+", help="Path(s) to CV PDF files")
     parser.add_argument("--sector", required=True, help="Sector name, e.g., INFORMATION-TECHNOLOGY")
     args = parser.parse_args()
 
-    pdf_path = Path(args.file)
-    if not pdf_path.exists():
-        print(json.dumps({"error": f"File not found: {pdf_path}"}, ensure_ascii=False))
-        return 1
-
     # The data root used by CVAnalyzer: prefer cv/data or cv/data/data
     data_root = Path(__file__).resolve().parent / "data"
     if not data_root.exists():
         # fallback to repo root cv/data if run from elsewhere
         data_root = Path("cv") / "data"
 
-    analyzer = CVAnalyzer(str(data_root))
-    try:
-        result = score_pdf_file(pdf_path, args.sector, analyzer)
-    except Exception as e:
-        print(json.dumps({"error": str(e)}, ensure_ascii=False))
-        return 1
-
-    print(json.dumps(result, ensure_ascii=False))
-    return 0
+    context = ScoringContext.create(analyzer=CVAnalyzer(str(data_root)))
+    status = 0
+    for file_arg in args.file:
+        pdf_path = Path(file_arg)
+        if not pdf_path.exists():
+            print(json.dumps({"file": str(pdf_path), "error": f"File not found: {pdf_path}"}, ensure_ascii=False))
+            status = 1
+            continue
+        try:
+            result = score_pdf_file(pdf_path, args.sector, context.analyzer, context)
+        except Exception as e:
+            print(json.dumps({"file": str(pdf_path), "error": str(e)}, ensure_ascii=False))
+            status = 1
+            continue
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    return status
 
 
 if __name__ == "__main__":
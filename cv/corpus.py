@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Text corpora for lexicon building, evaluation and benchmarks.
+
+- PDF CV dataset (data/data/<SECTOR>/*.pdf): extracted text is cached in one
+  JSON store keyed by file path, with the file's mtime/size and content hash,
+  so a rebuild only parses PDFs that are new or changed. Parsing of those
+  files is spread over a process pool.
+- resumedatasets.csv (Category,Resume): streamed in chunks, categories mapped
+  to our sectors, mojibake (UTF-8 read as Latin-1, e.g. "NaÃ¯ve") repaired.
+
+Usage:
+  python corpus.py                 # refresh cache/corpus_texts.json
+  python corpus.py --workers 8
+  python corpus.py --csv           # summarize resumedatasets.csv per sector
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CORPUS_CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = Path("cache/corpus_texts.json")
+# Below this many files a pool costs more to start than it saves
+MIN_PARALLEL_FILES = 8
+
+DEFAULT_CSV_PATH = Path("resumedatasets.csv")
+# resumedatasets.csv category -> sector directory name (None: no matching sector)
+CSV_CATEGORY_SECTORS: Dict[str, Optional[str]] = {
+    "Data Science": "INFORMATION-TECHNOLOGY",
+    "Java Developer": "INFORMATION-TECHNOLOGY",
+    "Python Developer": "INFORMATION-TECHNOLOGY",
+    "DotNet Developer": "INFORMATION-TECHNOLOGY",
+    "SAP Developer": "INFORMATION-TECHNOLOGY",
+    "ETL Developer": "INFORMATION-TECHNOLOGY",
+    "Web Designing": "INFORMATION-TECHNOLOGY",
+    "DevOps Engineer": "INFORMATION-TECHNOLOGY",
+    "Network Security Engineer": "INFORMATION-TECHNOLOGY",
+    "Database": "INFORMATION-TECHNOLOGY",
+    "Hadoop": "INFORMATION-TECHNOLOGY",
+    "Blockchain": "INFORMATION-TECHNOLOGY",
+    "Testing": "INFORMATION-TECHNOLOGY",
+    "Automation Testing": "INFORMATION-TECHNOLOGY",
+    "Mechanical Engineer": "ENGINEERING",
+    "Electrical Engineering": "ENGINEERING",
+    "Civil Engineer": "ENGINEERING",
+    "HR": "HR",
+    "Sales": "SALES",
+    "Arts": "ARTS",
+    "Advocate": "ADVOCATE",
+    "Health and fitness": "FITNESS",
+    "Business Analyst": None,
+    "Operations Manager": None,
+    "PMO": None,
+}
+
+# UTF-8 multi-byte sequences that were decoded as Latin-1 (each byte became one char)
+_MOJIBAKE_RE = re.compile(r"[\xc2-\xdf][\x80-\xbf]|[\xe0-\xef][\x80-\xbf]{2}|[\xf0-\xf4][\x80-\xbf]{3}")
+
+
+@dataclass
+class CorpusDocument:
+    path: str
+    sector: str
+    text: str
+    category: Optional[str] = None
+
+
+def repair_mojibake(text: str) -> str:
+    """Undo UTF-8-read-as-Latin-1 damage: "NaÃ¯ve" -> "Naïve", "â\x80¢" -> "•"."""
+    if not _MOJIBAKE_RE.search(text):
+        return text
+
+    def fix(m: re.Match) -> str:
+        try:
+            return m.group(0).encode("latin-1").decode("utf-8")
+        except UnicodeError:
+            return m.group(0)
+    return _MOJIBAKE_RE.sub(fix, text)
+
+
+def _file_sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_worker_analyzer = None
+
+
+def _parse_worker(path: str) -> Tuple[str, str]:
+    """Process-pool task: one CVAnalyzer per worker process, reused across files."""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        from cv_analyzer_prototype import CVAnalyzer
+        _worker_analyzer = CVAnalyzer("data")
+    return path, _worker_analyzer.parse_pdf(Path(path)) or ""
+
+
+class PdfTextCache:
+    """path -> {mtime, size, sha1, text}; persisted as JSON"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == CORPUS_CACHE_VERSION:
+                    self.entries = data.get("files", {})
+            except Exception as e:
+                print(f"Corpus cache unreadable, rebuilding: {e}")
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": CORPUS_CACHE_VERSION, "files": self.entries}, ensure_ascii=False),
+                       encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _is_fresh(self, key: str, pdf: Path, stat: os.stat_result) -> bool:
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return True
+        # Touched but maybe not changed (copied, re-synced): compare content
+        if entry["sha1"] == _file_sha1(pdf):
+            entry["mtime"], entry["size"] = stat.st_mtime, stat.st_size
+            return True
+        return False
+
+    def refresh(self, data_root: Path, workers: Optional[int] = None) -> List[CorpusDocument]:
+        """Bring the cache in line with data_root and return its documents in
+        directory order (sectors, then files as listed by glob)."""
+        order: List[Tuple[str, str]] = []
+        todo: List[str] = []
+        for sector_dir in (p for p in data_root.iterdir() if p.is_dir()):
+            for pdf in sector_dir.glob("*.pdf"):
+                key = str(pdf)
+                order.append((key, sector_dir.name))
+                if not self._is_fresh(key, pdf, pdf.stat()):
+                    todo.append(key)
+
+        seen = {key for key, _ in order}
+        removed = [key for key in self.entries if key not in seen]
+        for key in removed:
+            del self.entries[key]
+
+        for key, text in self._parse(todo, workers):
+            stat = os.stat(key)
+            self.entries[key] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "sha1": _file_sha1(Path(key)),
+                "text": text,
+            }
+        print(f"Corpus: {len(order)} PDFs, parsed {len(todo)}, reused {len(order) - len(todo)}, removed {len(removed)}")
+        return [CorpusDocument(key, sector, self.entries[key]["text"]) for key, sector in order]
+
+    @staticmethod
+    def _parse(paths: List[str], workers: Optional[int]) -> Iterator[Tuple[str, str]]:
+        if workers == 1 or len(paths) < MIN_PARALLEL_FILES:
+            for p in paths:
+                yield _parse_worker(p)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(_parse_worker, paths, chunksize=4)
+
+
+def load_pdf_corpus(data_root: Path, cache_path: Path = DEFAULT_CACHE_PATH,
+                    workers: Optional[int] = None) -> List[CorpusDocument]:
+    """Refresh the text cache for data_root (parsing only new/changed PDFs) and return all documents."""
+    cache = PdfTextCache(cache_path)
+    docs = cache.refresh(data_root, workers)
+    cache.save()
+    return docs
+
+
+def iter_csv_chunks(path: Path = DEFAULT_CSV_PATH, chunk_size: int = 256,
+                    include_unmapped: bool = False) -> Iterator[List[CorpusDocument]]:
+    """Stream resumedatasets.csv as chunks of documents; only one chunk is held in memory.
+
+    Categories without a sector mapping are skipped unless include_unmapped, in
+    which case the category itself is used as the sector.
+    """
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        cols = {name.strip().lower(): i for i, name in enumerate(header)}
+        cat_col, text_col = cols.get("category", 0), cols.get("resume", 1)
+        chunk: List[CorpusDocument] = []
+        for row_no, row in enumerate(reader, start=1):
+            if len(row) <= max(cat_col, text_col):
+                continue
+            category = row[cat_col].strip()
+            sector = CSV_CATEGORY_SECTORS.get(category)
+            if sector is None:
+                if not include_unmapped:
+                    continue
+                sector = category
+            chunk.append(CorpusDocument(f"{path}#{row_no}", sector, repair_mojibake(row[text_col]), category))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def csv_documents(path: Path = DEFAULT_CSV_PATH, chunk_size: int = 256,
+                  include_unmapped: bool = False) -> Iterator[CorpusDocument]:
+    """Document-at-a-time view over iter_csv_chunks"""
+    for chunk in iter_csv_chunks(path, chunk_size, include_unmapped):
+        yield from chunk
+
+
+def default_data_root() -> Path:
+    base = Path("data")
+    return base / "data" if (base / "data").exists() else base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the cached PDF text corpus")
+    parser.add_argument("--data", type=str, default=None, help="Data root (default: data/data or data)")
+    parser.add_argument("--cache", type=str, default=str(DEFAULT_CACHE_PATH), help="Text cache path")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--csv", nargs="?", const=str(DEFAULT_CSV_PATH), default=None,
+                        help="Summarize a Category,Resume CSV corpus instead (default: resumedatasets.csv)")
+    args = parser.parse_args()
+
+    if args.csv:
+        per_sector: Counter = Counter()
+        for doc in csv_documents(Path(args.csv), include_unmapped=True):
+            per_sector[doc.sector] += 1
+        print(json.dumps(dict(per_sector.most_common()), indent=2, ensure_ascii=False))
+        return
+
+    data_root = Path(args.data) if args.data else default_data_root()
+    docs = load_pdf_corpus(data_root, Path(args.cache), args.workers)
+    print(f"{len(docs)} documents -> {args.cache}")
+
+
+if __name__ == "__main__":
+    main()
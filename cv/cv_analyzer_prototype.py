@@ -3,17 +3,32 @@
 """
 CV Analyzer Prototype - ATS Scoring System
 Bu script mevcut CV dataset'ini analiz ederek skill'leri ve pattern'leri çıkarır
+
+Korpus analizi map-reduce olarak çalışır: her PDF bir process pool'da kompakt bir
+CVRecord'a (skill'ler, bölüm anahtarları, kalite skoru; metin yok) dönüştürülür,
+kayıtlar geldikçe JSON-lines olarak yazılır ve birleştirilebilir SectorStats
+reducer'larına eklenir. Bellekte yalnızca sektör sayaçları ve işlenmekte olan bir
+batch tutulur.
+
+Usage:
+  python cv_analyzer_prototype.py                        # 24 sektörün tamamı
+  python cv_analyzer_prototype.py --sectors FINANCE HR --limit 50
+  python cv_analyzer_prototype.py --workers 4 --records cache/cv_records.jsonl
 """
 
 import os
+import argparse
 import json
 import re
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
 import PyPDF2
 import pdfplumber
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
+
+from ats.sections import SECTION_HEADINGS, canonical_sections, segment_sections
 
 @dataclass
 class CVAnalysisResult:
@@ -26,6 +41,75 @@ class CVAnalysisResult:
     quality_score: float
     errors: List[str]
 
+@dataclass
+class CVRecord:
+    """Korpus analizi için tek CV'nin kompakt özeti (metin tutulmaz)"""
+    file_path: str
+    sector: str
+    skills_found: List[str]
+    sections: List[str]
+    quality_score: float
+    text_chars: int
+    errors: List[str]
+
+QUALITY_BINS = 10  # 0-9, 10-19, ..., 90-100
+MAX_SAMPLE_ERRORS = 5
+
+@dataclass
+class SectorStats:
+    """Birleştirilebilir sektör reducer'ı: add() bir kayıt ekler, merge() iki kısmi sonucu toplar"""
+    cvs: int = 0
+    failed: int = 0
+    quality_sum: float = 0.0
+    text_chars_sum: int = 0
+    quality_histogram: List[int] = field(default_factory=lambda: [0] * QUALITY_BINS)
+    skill_counts: Counter = field(default_factory=Counter)
+    section_counts: Counter = field(default_factory=Counter)
+    sample_errors: List[str] = field(default_factory=list)
+
+    def add(self, record: CVRecord) -> "SectorStats":
+        self.cvs += 1
+        if record.errors:
+            self.failed += 1
+            room = MAX_SAMPLE_ERRORS - len(self.sample_errors)
+            self.sample_errors.extend(f"{Path(record.file_path).name}: {e}" for e in record.errors[:room])
+        self.quality_sum += record.quality_score
+        self.text_chars_sum += record.text_chars
+        self.quality_histogram[min(int(record.quality_score // 10), QUALITY_BINS - 1)] += 1
+        self.skill_counts.update(record.skills_found)
+        self.section_counts.update(record.sections)
+        return self
+
+    def merge(self, other: "SectorStats") -> "SectorStats":
+        self.cvs += other.cvs
+        self.failed += other.failed
+        self.quality_sum += other.quality_sum
+        self.text_chars_sum += other.text_chars_sum
+        self.quality_histogram = [a + b for a, b in zip(self.quality_histogram, other.quality_histogram)]
+        self.skill_counts.update(other.skill_counts)
+        self.section_counts.update(other.section_counts)
+        self.sample_errors.extend(other.sample_errors[:MAX_SAMPLE_ERRORS - len(self.sample_errors)])
+        return self
+
+    def report(self, top_skills: int = 20) -> Dict:
+        n = self.cvs or 1
+        return {
+            'total_cvs_analyzed': self.cvs,
+            'failed': self.failed,
+            'average_quality_score': round(self.quality_sum / n, 2),
+            'average_text_chars': round(self.text_chars_sum / n),
+            'quality_histogram': {
+                (f"{i * 10}-{i * 10 + 9}" if i < QUALITY_BINS - 1 else f"{i * 10}-100"): c
+                for i, c in enumerate(self.quality_histogram)
+            },
+            'top_skills': self.skill_counts.most_common(top_skills),
+            'unique_skills': len(self.skill_counts),
+            'section_frequency': {
+                name: round(count / n, 3) for name, count in self.section_counts.most_common()
+            },
+            'sample_errors': list(self.sample_errors),
+        }
+
 class CVAnalyzer:
     """Ana CV analiz sınıfı"""
     
@@ -72,36 +156,16 @@ class CVAnalyzer:
         }
     
     def _get_section_patterns(self) -> Dict[str, List[str]]:
-        """CV'lerde yaygın bölüm başlıkları"""
-        return {
-            'experience': [
-                r'work experience', r'professional experience', r'employment history',
-                r'career history', r'work history', r'experience', r'employment',
-                r'professional background', r'career summary', r'work summary'
-            ],
-            'education': [
-                r'education', r'educational background', r'academic background',
-                r'qualifications', r'academic qualifications', r'degrees',
-                r'certifications', r'training', r'learning'
-            ],
-            'skills': [
-                r'skills', r'technical skills', r'core competencies', r'abilities',
-                r'expertise', r'proficiencies', r'competencies', r'technologies',
-                r'technical expertise', r'key skills'
-            ],
-            'contact': [
-                r'contact', r'contact information', r'personal information',
-                r'personal details', r'contact details', r'reach me'
-            ]
-        }
+        """CV'lerde yaygın bölüm başlıkları (kanonik bölüm -> başlık satırları)"""
+        return {name: list(headings) for name, headings in SECTION_HEADINGS.items()}
     
-    def parse_pdf(self, file_path: Path) -> str:
-        """PDF dosyasından text çıkarır"""
+    def parse_pdf(self, file_path: Path, max_pages: Optional[int] = None) -> str:
+        """PDF dosyasından text çıkarır (max_pages: yalnızca ilk N sayfa)"""
         try:
             # pdfplumber ile dene (daha iyi format preservation)
             with pdfplumber.open(file_path) as pdf:
                 text = ""
-                for page in pdf.pages:
+                for page in pdf.pages[:max_pages]:
                     page_text = page.extract_text()
                     if page_text:
                         text += page_text + "\n"
@@ -112,7 +176,7 @@ class CVAnalyzer:
                 with open(file_path, 'rb') as file:
                     pdf_reader = PyPDF2.PdfReader(file)
                     text = ""
-                    for page in pdf_reader.pages:
+                    for page in pdf_reader.pages[:max_pages]:
                         text += page.extract_text() + "\n"
                     return text.strip()
             except Exception as e2:
@@ -133,32 +197,8 @@ class CVAnalyzer:
         return found_skills
     
     def detect_sections(self, text: str) -> Dict[str, str]:
-        """CV'deki bölümleri tespit eder"""
-        sections = {}
-        text_lower = text.lower()
-        lines = text.split('\n')
-        
-        for section_name, patterns in self.section_patterns.items():
-            for pattern in patterns:
-                matches = list(re.finditer(pattern, text_lower))
-                if matches:
-                    # İlk eşleşmeyi al
-                    start_pos = matches[0].start()
-                    # Bölüm başlangıcını satır bazında bul
-                    char_count = 0
-                    section_start_line = 0
-                    for i, line in enumerate(lines):
-                        if char_count >= start_pos:
-                            section_start_line = i
-                            break
-                        char_count += len(line) + 1
-                    
-                    # Sonraki birkaç satırı al (basit implementation)
-                    section_text = '\n'.join(lines[section_start_line:section_start_line+10])
-                    sections[section_name] = section_text[:500]  # İlk 500 karakter
-                    break
-        
-        return sections
+        """CV'deki bölümleri tespit eder (kanonik anahtar -> bölümün tam metni)"""
+        return canonical_sections(segment_sections(text))
     
     def calculate_quality_score(self, text: str, skills: List[str], sections: Dict[str, str]) -> float:
         """Basit kalite skoru hesaplar"""
@@ -229,6 +269,19 @@ class CVAnalyzer:
                 errors=[f"Analysis error: {str(e)}"]
             )
     
+    def analyze_record(self, file_path: Path, sector: str) -> CVRecord:
+        """Tek bir CV'yi kompakt kayda dönüştürür (korpus analizinin map adımı)"""
+        try:
+            text = self.parse_pdf(file_path)
+            if not text:
+                return CVRecord(str(file_path), sector, [], [], 0.0, 0, ["PDF parsing failed"])
+            skills = self.extract_skills(text)
+            sections = self.detect_sections(text)
+            quality_score = self.calculate_quality_score(text, skills, sections)
+            return CVRecord(str(file_path), sector, sorted(skills), list(sections), quality_score, len(text), [])
+        except Exception as e:
+            return CVRecord(str(file_path), sector, [], [], 0.0, 0, [f"Analysis error: {str(e)}"])
+
     def analyze_sector_sample(self, sector: str, sample_size: int = 10) -> List[CVAnalysisResult]:
         """Bir sektörden sample CV'leri analiz eder"""
         sector_dir = self.data_dir / sector
@@ -317,58 +370,126 @@ class CVAnalyzer:
         
         print(f"\n📊 Analiz sonuçları kaydedildi: {filename}")
 
+_worker_analyzer: Optional[CVAnalyzer] = None
+
+
+def _record_worker(task: Tuple[str, str]) -> CVRecord:
+    """Process-pool görevi: process başına bir CVAnalyzer, dosyalar arasında yeniden kullanılır"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = CVAnalyzer("data")
+    path, sector = task
+    return _worker_analyzer.analyze_record(Path(path), sector)
+
+
+def corpus_tasks(data_root: Path, sectors: Optional[List[str]] = None,
+                 limit: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+    """(pdf yolu, sektör) çiftleri; sectors verilmezse data_root altındaki tüm sektör dizinleri"""
+    names = sectors or sorted(p.name for p in data_root.iterdir() if p.is_dir())
+    for sector in names:
+        sector_dir = data_root / sector
+        if not sector_dir.is_dir():
+            print(f"Sektör bulunamadı: {sector}")
+            continue
+        for i, pdf in enumerate(sorted(sector_dir.glob("*.pdf"))):
+            if limit is not None and i >= limit:
+                break
+            yield str(pdf), sector
+
+
+def map_records(tasks: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                batch_size: int = 256) -> Iterator[CVRecord]:
+    """Görevleri batch'ler halinde process pool'a dağıtır; kayıtlar görev sırasıyla akar.
+    Aynı anda en fazla bir batch'in kayıtları bellekte bulunur."""
+    tasks = iter(tasks)
+    batches = iter(lambda: [t for _, t in zip(range(batch_size), tasks)], [])
+    if workers == 1:
+        for batch in batches:
+            yield from map(_record_worker, batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in batches:
+            yield from pool.map(_record_worker, batch, chunksize=4)
+
+
+def reduce_records(records: Iterable[CVRecord], records_path: Optional[Path] = None,
+                   progress_every: int = 100) -> Dict[str, SectorStats]:
+    """Kayıtları sektör reducer'larına ekler; records_path verilirse her kayıt JSON-lines olarak yazılır"""
+    stats: Dict[str, SectorStats] = defaultdict(SectorStats)
+    out = None
+    if records_path is not None:
+        records_path.parent.mkdir(parents=True, exist_ok=True)
+        out = open(records_path, 'w', encoding='utf-8')
+    try:
+        for n, record in enumerate(records, 1):
+            stats[record.sector].add(record)
+            if out is not None:
+                out.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+            if progress_every and n % progress_every == 0:
+                print(f"  {n} CV analiz edildi")
+    finally:
+        if out is not None:
+            out.close()
+    return dict(stats)
+
+
+def corpus_report(stats: Dict[str, SectorStats]) -> Dict:
+    """Sektör raporları + tüm sektörlerin birleşimi (merge) olarak korpus özeti"""
+    total = SectorStats()
+    for sector_stats in stats.values():
+        total.merge(sector_stats)
+    return {
+        'analysis_summary': {
+            'sectors_analyzed': len(stats),
+            **total.report(),
+        },
+        'sector_reports': {sector: stats[sector].report() for sector in sorted(stats)},
+    }
+
+
 def main():
-    """Ana fonksiyon - sample analiz"""
-    
-    # Veri dizini
-    data_dir = "data"
-    
-    if not os.path.exists(data_dir):
-        print(f"❌ Veri dizini bulunamadı: {data_dir}")
+    """Ana fonksiyon - korpus analizi (map-reduce)"""
+    from corpus import default_data_root
+
+    parser = argparse.ArgumentParser(description="CV korpusu için sektör bazında skill/bölüm/kalite raporu")
+    parser.add_argument("--data", type=str, default=None, help="Veri dizini (varsayılan: data/data veya data)")
+    parser.add_argument("--sectors", nargs="+", default=None, help="Sektörler (varsayılan: hepsi)")
+    parser.add_argument("--limit", type=int, default=None, help="Sektör başına en fazla CV")
+    parser.add_argument("--workers", type=int, default=None, help="Paralel process sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--out", type=str, default="cv_analysis_results.json", help="Rapor dosyası")
+    parser.add_argument("--records", type=str, default=None, help="CV başına kayıtlar (JSON-lines)")
+    args = parser.parse_args()
+
+    data_root = Path(args.data) if args.data else default_data_root()
+    if not data_root.exists():
+        print(f"❌ Veri dizini bulunamadı: {data_root}")
         return
-    
-    # Analyzer'ı başlat
-    analyzer = CVAnalyzer(data_dir)
-    
-    # Test için birkaç sektör seç
-    test_sectors = [
-        'INFORMATION-TECHNOLOGY',
-        'FINANCE', 
-        'ENGINEERING',
-        'HEALTHCARE',
-        'ACCOUNTANT'
-    ]
-    
+
     print("🚀 CV Analiz Sistemi Başlatılıyor...")
-    print(f"📁 Veri dizini: {data_dir}")
-    
-    # Her sektörden sample analiz et
-    for sector in test_sectors:
-        analyzer.analyze_sector_sample(sector, sample_size=5)
-    
-    # Sonuçları kaydet
-    analyzer.save_results()
-    
+    print(f"📁 Veri dizini: {data_root}")
+
+    tasks = corpus_tasks(data_root, args.sectors, args.limit)
+    stats = reduce_records(map_records(tasks, args.workers), Path(args.records) if args.records else None)
+    report = corpus_report(stats)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n📊 Analiz sonuçları kaydedildi: {args.out}")
+
     # Özet rapor
     print("\n" + "="*50)
     print("📈 ANALİZ ÖZETİ")
     print("="*50)
-    
-    # Sektör bazında özet
-    sector_groups = defaultdict(list)
-    for result in analyzer.results:
-        sector_groups[result.sector].append(result)
-    
-    for sector, results in sector_groups.items():
-        report = analyzer.generate_sector_report(results)
+
+    for sector, sector_report in report['sector_reports'].items():
         print(f"\n🏢 {sector}:")
-        print(f"  📊 Analiz edilen CV: {report['total_cvs_analyzed']}")
-        print(f"  ⭐ Ortalama kalite skoru: {report['average_quality_score']}/100")
-        print(f"  🔧 En yaygın skill'ler: {', '.join([skill for skill, count in report['top_skills'][:5]])}")
-    
-    print(f"\n🎯 Toplam analiz edilen CV: {len(analyzer.results)}")
-    print(f"🎯 Bulunan toplam unique skill: {len(set(skill for r in analyzer.results for skill in r.skills_found))}")
+        print(f"  📊 Analiz edilen CV: {sector_report['total_cvs_analyzed']}")
+        print(f"  ⭐ Ortalama kalite skoru: {sector_report['average_quality_score']}/100")
+        print(f"  🔧 En yaygın skill'ler: {', '.join([skill for skill, count in sector_report['top_skills'][:5]])}")
+
+    summary = report['analysis_summary']
+    print(f"\n🎯 Toplam analiz edilen CV: {summary['total_cvs_analyzed']}")
+    print(f"🎯 Bulunan toplam unique skill: {summary['unique_skills']}")
 
 if __name__ == "__main__":
     main()
-
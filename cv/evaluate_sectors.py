@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Evaluate sector detection against labelled corpora.
+
+Sources are streamed (see corpus.py): the cached PDF corpus (labels = sector
+directory) and/or resumedatasets.csv (labels = mapped category).
+
+Usage:
+  python evaluate_sectors.py --csv
+  python evaluate_sectors.py --pdf --limit 500
+  python evaluate_sectors.py --csv --detector keywords   # ignore the trained classifier
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+from ats_scoring_enhanced import ATSConfig, SectorDetection, SectorDetector
+from corpus import DEFAULT_CACHE_PATH, DEFAULT_CSV_PATH, CorpusDocument, csv_documents, default_data_root, load_pdf_corpus
+
+
+def evaluate(docs: Iterable[CorpusDocument], detect: Callable[[str], SectorDetection],
+             limit: Optional[int] = None) -> Dict:
+    """Accuracy, top-3 accuracy, per-sector recall and most frequent confusions"""
+    total = correct = top3 = 0
+    per_sector: Dict[str, Counter] = defaultdict(Counter)
+    confusions: Counter = Counter()
+    for doc in itertools.islice(docs, limit):
+        if not doc.text:
+            continue
+        detection = detect(doc.text)
+        ranked = [detection.detected_sector] + [s for s, _ in detection.alternatives]
+        total += 1
+        per_sector[doc.sector]["total"] += 1
+        if detection.detected_sector == doc.sector:
+            correct += 1
+            per_sector[doc.sector]["correct"] += 1
+        else:
+            confusions[f"{doc.sector} -> {detection.detected_sector}"] += 1
+        if doc.sector in ranked[:3]:
+            top3 += 1
+    return {
+        "documents": total,
+        "accuracy": round(correct / total, 4) if total else 0.0,
+        "top3_accuracy": round(top3 / total, 4) if total else 0.0,
+        "recall_by_sector": {
+            s: round(c["correct"] / c["total"], 4) for s, c in sorted(per_sector.items())
+        },
+        "top_confusions": dict(confusions.most_common(15)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate sector detection on labelled corpora")
+    parser.add_argument("--pdf", action="store_true", help="Use the PDF corpus (data/data, cached text)")
+    parser.add_argument("--csv", nargs="?", const=str(DEFAULT_CSV_PATH), default=None,
+                        help="Use a Category,Resume CSV corpus (default: resumedatasets.csv)")
+    parser.add_argument("--cache", type=str, default=str(DEFAULT_CACHE_PATH), help="PDF corpus text cache")
+    parser.add_argument("--limit", type=int, default=None, help="Max documents per source")
+    parser.add_argument("--detector", choices=["auto", "keywords"], default="auto",
+                        help="auto: trained classifier if present, else keyword ratio")
+    args = parser.parse_args()
+
+    if not (args.pdf or args.csv):
+        parser.error("choose at least one source: --pdf and/or --csv")
+
+    detector = SectorDetector(ATSConfig("config.json"))
+    if args.detector == "keywords":
+        detector.classifier = None
+    report = {}
+    if args.pdf:
+        docs = load_pdf_corpus(default_data_root(), Path(args.cache))
+        report["pdf"] = evaluate(docs, detector.detect_sector, args.limit)
+    if args.csv:
+        report["csv"] = evaluate(csv_documents(Path(args.csv)), detector.detect_sector, args.limit)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-CV feature store and vectorized re-scorer for weight tuning.
+
+EnhancedATSScorer._calculate_breakdown derives every number from the text
+(ScoreBreakdown.features) and only applies the config weights at the end.
+This module stores those raw features per CV, keyed by content hash + sector,
+in a columnar .npz file (one array per feature), and re-applies any
+config.json to the whole matrix with NumPy -- no re-parsing or re-matching.
+
+Feature columns and the vectorized scorer live in ats/feature_matrix.py;
+extraction uses EnhancedATSScorer.extract_feature_matrix in batches.
+Features depend on the rules and lexicons, not on the weights: the store
+records rules_version and the lexicon bundle version and is discarded when
+either changes. Rows are extracted offline by default (no SBERT, LanguageTool
+or link HEAD requests; see extract_feature_matrix); --optional-stages opts in,
+and each row records the optional stages that actually fed it. The per-sector sorted score arrays behind the percentile ranks
+of score_cv_text (ats/percentiles.py) are rebuilt from the store, so a refresh
+after new corpus CVs only extracts those CVs. Only rows whose stages match what
+live scoring runs (EnhancedATSScorer.live_stages) go into the arrays.
+
+Usage:
+  python feature_store.py build --pdf --csv          # extract features (only new CVs)
+  python feature_store.py build --pdf --optional-stages semantic,grammar
+  python feature_store.py rescore --config tuned.json
+  python feature_store.py rescore --config tuned.json --baseline config.json
+  python feature_store.py percentiles                # per-sector score arrays for percentile ranks
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ats.deadline import STAGE_PRIORITY
+from ats.feature_matrix import FEATURE_COLUMNS, feature_row, score_features
+from ats.percentiles import PERCENTILES_PATH, ScoreDistribution
+from ats_scoring_enhanced import ATSConfig, EnhancedATSScorer
+from corpus import DEFAULT_CACHE_PATH, DEFAULT_CSV_PATH, CorpusDocument, csv_documents, default_data_root, load_pdf_corpus
+
+FEATURE_STORE_FORMAT = 2
+DEFAULT_STORE_PATH = Path("cache/feature_store.npz")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class FeatureStore:
+    """(content hash, sector) -> feature row; persisted column by column in one .npz,
+    with the optional stages behind each row in `stages`"""
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH, rules_version: str = "", lexicon_version: str = ""):
+        self.path = path
+        self.meta = {"format": FEATURE_STORE_FORMAT, "rules_version": rules_version,
+                     "lexicon_version": lexicon_version, "columns": FEATURE_COLUMNS}
+        self.hashes: List[str] = []
+        self.sectors: List[str] = []
+        self.stages: List[str] = []
+        self.rows: List[np.ndarray] = []
+        self._index: Dict[Tuple[str, str], int] = {}
+        if path.exists():
+            self._load()
+
+    def _load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta != self.meta:
+                    print("Feature store built with other rules/lexicons/columns; rebuilding")
+                    return
+                matrix = np.column_stack([data[c] for c in FEATURE_COLUMNS]) if len(data["hashes"]) else None
+                self.hashes = [str(h) for h in data["hashes"]]
+                self.sectors = [str(s) for s in data["sectors"]]
+                self.stages = [str(s) for s in data["stages"]]
+        except Exception as e:
+            print(f"Feature store unreadable, rebuilding: {e}")
+            return
+        self.rows = list(matrix) if matrix is not None else []
+        self._index = {(h, s): i for i, (h, s) in enumerate(zip(self.hashes, self.sectors))}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._index
+
+    def add(self, text_hash: str, sector: str, features: Dict[str, float], stages: str = ""):
+        row = feature_row(features)
+        i = self._index.get((text_hash, sector))
+        if i is not None:
+            self.rows[i] = row
+            self.stages[i] = stages
+            return
+        self._index[(text_hash, sector)] = len(self.rows)
+        self.hashes.append(text_hash)
+        self.sectors.append(sector)
+        self.stages.append(stages)
+        self.rows.append(row)
+
+    def stage_counts(self) -> Dict[str, int]:
+        """Rows per optional-stage combination ("offline" for none)"""
+        return dict(Counter(s or "offline" for s in self.stages))
+
+    def matrix(self) -> np.ndarray:
+        if not self.rows:
+            return np.zeros((0, len(FEATURE_COLUMNS)))
+        return np.vstack(self.rows)
+
+    def save(self):
+        matrix = self.matrix()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.stem + ".tmp.npz")
+        np.savez(tmp, meta=json.dumps(self.meta), hashes=np.array(self.hashes, dtype=str),
+                 sectors=np.array(self.sectors, dtype=str), stages=np.array(self.stages, dtype=str),
+                 **{c: matrix[:, i] for i, c in enumerate(FEATURE_COLUMNS)})
+        os.replace(tmp, self.path)
+
+
+def open_store(scorer: EnhancedATSScorer, path: Path = DEFAULT_STORE_PATH) -> FeatureStore:
+    return FeatureStore(path, scorer.config.config.get("rules_version", ""), scorer.lexicons.version)
+
+
+def build_store(scorer: EnhancedATSScorer, store: FeatureStore, docs: Iterable[CorpusDocument],
+                limit: Optional[int] = None, batch_size: int = 256,
+                optional_stages: Sequence[str] = ()) -> Dict[str, int]:
+    """Extract features for documents not yet in the store (scored under their labelled sector)"""
+    added = reused = 0
+    pending: Dict[Tuple[str, str], str] = {}
+
+    def flush():
+        keys = list(pending)
+        stages: List[str] = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            matrix = scorer.extract_feature_matrix([pending[k] for k in keys], [k[1] for k in keys],
+                                                   tuple(optional_stages), stages)
+        for (text_hash, sector), row, row_stages in zip(keys, matrix, stages):
+            store.add(text_hash, sector, dict(zip(FEATURE_COLUMNS, row)), row_stages)
+        pending.clear()
+
+    for doc in itertools.islice(docs, limit):
+        if not doc.text:
+            continue
+        key = (content_hash(doc.text), doc.sector)
+        if key in store or key in pending:
+            reused += 1
+            continue
+        pending[key] = doc.text
+        added += 1
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+    return {"added": added, "reused": reused, "total": len(store)}
+
+
+def _summary(scores: Dict[str, np.ndarray], sectors: np.ndarray) -> Dict:
+    total = scores["total"]
+    return {
+        "mean_total": round(float(total.mean()), 2) if len(total) else 0.0,
+        "by_sector": {str(s): round(float(total[sectors == s].mean()), 2) for s in np.unique(sectors)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature store build / vectorized re-scoring")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="Extract and store features for a corpus")
+    b.add_argument("--pdf", action="store_true", help="Use the PDF corpus (data/data, cached text)")
+    b.add_argument("--csv", nargs="?", const=str(DEFAULT_CSV_PATH), default=None,
+                   help="Use a Category,Resume CSV corpus (default: resumedatasets.csv)")
+    b.add_argument("--cache", type=str, default=str(DEFAULT_CACHE_PATH), help="PDF corpus text cache")
+    b.add_argument("--limit", type=int, default=None, help="Max documents per source")
+    b.add_argument("--optional-stages", type=str, default="",
+                   help="Comma-separated optional stages to run per CV (semantic,grammar,link_check; default none)")
+    r = sub.add_parser("rescore", help="Apply a config to all stored features")
+    r.add_argument("--config", type=str, default="config.json", help="Config to apply")
+    r.add_argument("--baseline", type=str, default=None, help="Also score with this config and report changes")
+    pc = sub.add_parser("percentiles", help="Write per-sector sorted scores of all stored features")
+    pc.add_argument("--config", type=str, default="config.json", help="Config the scores are computed with")
+    pc.add_argument("--out", type=str, default=str(PERCENTILES_PATH), help="Output path")
+    for p in (b, r, pc):
+        p.add_argument("--store", type=str, default=str(DEFAULT_STORE_PATH), help="Feature store path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not (args.pdf or args.csv):
+            parser.error("choose at least one source: --pdf and/or --csv")
+        stages = [s for s in args.optional_stages.split(",") if s]
+        unknown = set(stages) - set(STAGE_PRIORITY)
+        if unknown:
+            parser.error(f"unknown optional stages: {', '.join(sorted(unknown))}")
+        scorer = EnhancedATSScorer()
+        store = open_store(scorer, Path(args.store))
+        report = {}
+        if args.pdf:
+            docs = load_pdf_corpus(default_data_root(), Path(args.cache))
+            report["pdf"] = build_store(scorer, store, docs, args.limit, optional_stages=stages)
+        if args.csv:
+            report["csv"] = build_store(scorer, store, csv_documents(Path(args.csv)), args.limit,
+                                        optional_stages=stages)
+        store.save()
+        report["stages"] = store.stage_counts()
+        print(json.dumps(report, indent=2))
+        return
+
+    # Versions are checked against the stored meta on load
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = EnhancedATSScorer(args.config)
+    store = open_store(scorer, Path(args.store))
+    if not len(store):
+        raise SystemExit(f"No stored features in {args.store}; run: python feature_store.py build --pdf")
+    matrix, sectors = store.matrix(), np.array(store.sectors)
+    if args.command == "percentiles":
+        # Only rows fed by the same optional stages as live scoring are comparable with it
+        config = scorer.config.config
+        live = scorer.live_stages()
+        rows = np.array(store.stages) == ",".join(live)
+        if not rows.any():
+            raise SystemExit(f"No stored rows with the live optional stages ({','.join(live) or 'none'}); run: "
+                             f"python feature_store.py build --pdf --optional-stages {','.join(live)}")
+        totals = score_features(matrix[rows], sectors[rows], scorer.config)["total"]
+        dist = ScoreDistribution.from_scores(sectors[rows], totals, f"{config['version']}-{config['rules_version']}",
+                                             scorer.lexicons.version, live)
+        dist.save(Path(args.out))
+        print(json.dumps({"documents": int(rows.sum()), "skipped": int(len(store) - rows.sum()),
+                          "stages": ",".join(live) or "offline", "out": args.out,
+                          "sectors": dist.summary()}, indent=2))
+        return
+    started = time.perf_counter()
+    scores = score_features(matrix, sectors, scorer.config)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    report = {"documents": len(store), "stages": store.stage_counts(), "rescore_ms": round(elapsed_ms, 2), "config": args.config,
+              **_summary(scores, sectors)}
+    if args.baseline:
+        base = score_features(matrix, sectors, ATSConfig(args.baseline))
+        delta = scores["total"] - base["total"]
+        report["baseline"] = {"config": args.baseline, **_summary(base, sectors),
+                              "changed": int((delta != 0).sum()), "mean_delta": round(float(delta.mean()), 2)}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
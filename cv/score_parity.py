@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Score-parity harness: reference EnhancedATSScorer vs. a candidate scoring path.
+
+Every document is scored by the reference (score_breakdown, one CV at a time)
+and by the candidate under the same sector. Totals, breakdown components,
+notes and recommendations are diffed per CV, and wall time of both sides is
+reported as a speedup. Exit status is 1 when anything diverges, so a faster
+engine can ship with proof that users see the same scores.
+
+Built-in candidates:
+  feature-matrix   extract_feature_matrix + _breakdown_from_features (full notes/recs)
+  score-batch      score_batch vectorized scores (totals/components only)
+  rescore          rescore_cv_text from an empty section cache (no notes)
+Any other engine: --candidate package.module:function, where
+  function(scorer, texts, sectors) -> List[record]
+and a record is {"score", "breakdown", "notes", "recommendations"} (notes or
+recommendations may be None when the engine does not produce them; they are
+then not compared).
+
+Online link checks are switched off on both sides (network results are not
+reproducible). The batch candidates run the same optional stages as the
+reference (SBERT and LanguageTool when installed); their default is offline. Texts are cut to the scorer's input cap first.
+
+Usage:
+  python score_parity.py --pdf --limit 300 --candidate feature-matrix
+  python score_parity.py --csv --candidate score-batch --show 5
+  python score_parity.py --pdf --candidate my_engine:score_all --auto-detect
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import io
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ats.rules_extras import MAX_TEXT_CHARS, acronym_full_form_note, cap_text
+from ats_scoring_enhanced import EnhancedATSScorer, ScoreBreakdown
+from ats.deadline import STAGE_PRIORITY
+from ats.feature_matrix import FEATURE_COLUMNS
+from corpus import DEFAULT_CACHE_PATH, DEFAULT_CSV_PATH, csv_documents, default_data_root, load_pdf_corpus
+
+COMPONENTS = ["sections", "formatting", "keywords", "actions", "completeness"]
+WARMUP_DOCS = 5
+REFERENCE_STAGES = tuple(STAGE_PRIORITY)  # score_breakdown runs every optional stage
+
+# scorer, texts, sectors -> one record per text
+Candidate = Callable[[EnhancedATSScorer, List[str], List[str]], List[Dict]]
+
+
+def breakdown_record(breakdown: ScoreBreakdown, recommendations: Optional[List[Dict]]) -> Dict:
+    return {
+        "score": breakdown.total,
+        "breakdown": {c: getattr(breakdown, c) for c in COMPONENTS},
+        "notes": list(breakdown.notes),
+        "recommendations": recommendations,
+    }
+
+
+def result_record(result: Dict) -> Dict:
+    """Record from a score_cv_text-style result (no notes)"""
+    return {
+        "score": result["score"],
+        "breakdown": {c: result["breakdown"][c] for c in COMPONENTS},
+        "notes": None,
+        "recommendations": result.get("recommendations"),
+    }
+
+
+def reference(scorer: EnhancedATSScorer, texts: List[str], sectors: List[str]) -> List[Dict]:
+    return [breakdown_record(*scorer.score_breakdown(text, sector)) for text, sector in zip(texts, sectors)]
+
+
+def feature_matrix_candidate(scorer: EnhancedATSScorer, texts: List[str], sectors: List[str]) -> List[Dict]:
+    matrix = scorer.extract_feature_matrix(texts, sectors, REFERENCE_STAGES)
+    records = []
+    for text, sector, row in zip(texts, sectors, matrix):
+        acronym_notes: List[str] = []
+        acronym_full_form_note(text, acronym_notes)
+        breakdown = scorer._breakdown_from_features(dict(zip(FEATURE_COLUMNS, row)), sector, acronym_notes)
+        records.append(breakdown_record(breakdown, scorer._generate_recommendations(breakdown, sector)))
+    return records
+
+
+def score_batch_candidate(scorer: EnhancedATSScorer, texts: List[str], sectors: List[str]) -> List[Dict]:
+    scores = scorer.score_batch(texts, sectors, optional_stages=REFERENCE_STAGES)
+    return [
+        {"score": int(scores["total"][i]), "breakdown": {c: int(scores[c][i]) for c in COMPONENTS},
+         "notes": None, "recommendations": None}
+        for i in range(len(texts))
+    ]
+
+
+def rescore_candidate(scorer: EnhancedATSScorer, texts: List[str], sectors: List[str]) -> List[Dict]:
+    return [result_record(scorer.rescore_cv_text(text, None, sector, False)) for text, sector in zip(texts, sectors)]
+
+
+CANDIDATES: Dict[str, Candidate] = {
+    "feature-matrix": feature_matrix_candidate,
+    "score-batch": score_batch_candidate,
+    "rescore": rescore_candidate,
+}
+
+
+def load_candidate(spec: str) -> Candidate:
+    if spec in CANDIDATES:
+        return CANDIDATES[spec]
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise SystemExit(f"Unknown candidate {spec!r}: use one of {sorted(CANDIDATES)} or module:function")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _rec_key(rec: Dict) -> str:
+    return json.dumps(rec, sort_keys=True, ensure_ascii=False)
+
+
+def diff_records(ref: Dict, cand: Dict) -> Dict:
+    """Field -> {"reference", "candidate"} (notes/recommendations: what is missing / extra)"""
+    diff: Dict[str, Dict] = {}
+    if ref["score"] != cand["score"]:
+        diff["score"] = {"reference": ref["score"], "candidate": cand["score"]}
+    for c in COMPONENTS:
+        if ref["breakdown"][c] != cand["breakdown"][c]:
+            diff[f"breakdown.{c}"] = {"reference": ref["breakdown"][c], "candidate": cand["breakdown"][c]}
+    if cand["notes"] is not None and ref["notes"] != cand["notes"]:
+        diff["notes"] = {
+            "missing": [n for n in ref["notes"] if n not in cand["notes"]],
+            "extra": [n for n in cand["notes"] if n not in ref["notes"]],
+            "order_only": sorted(ref["notes"]) == sorted(cand["notes"]),
+        }
+    if cand["recommendations"] is not None and ref["recommendations"] != cand["recommendations"]:
+        ref_keys = [_rec_key(r) for r in ref["recommendations"]]
+        cand_keys = [_rec_key(r) for r in cand["recommendations"]]
+        diff["recommendations"] = {
+            "missing": [r for r, k in zip(ref["recommendations"], ref_keys) if k not in cand_keys],
+            "extra": [r for r, k in zip(cand["recommendations"], cand_keys) if k not in ref_keys],
+            "order_only": sorted(ref_keys) == sorted(cand_keys),
+        }
+    return diff
+
+
+def run_parity(scorer: EnhancedATSScorer, candidate: Candidate, names: Sequence[str], texts: List[str],
+               sectors: List[str], show: int = 10) -> Dict:
+    warm = min(WARMUP_DOCS, len(texts))
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Lazily built matchers/models should not count against either side
+        reference(scorer, texts[:warm], sectors[:warm])
+        candidate(scorer, texts[:warm], sectors[:warm])
+
+        started = time.perf_counter()
+        ref_records = reference(scorer, texts, sectors)
+        ref_s = time.perf_counter() - started
+        started = time.perf_counter()
+        cand_records = candidate(scorer, texts, sectors)
+        cand_s = time.perf_counter() - started
+    if len(cand_records) != len(texts):
+        raise SystemExit(f"Candidate returned {len(cand_records)} records for {len(texts)} documents")
+
+    field_counts: Dict[str, int] = {}
+    divergences = []
+    for name, sector, ref, cand in zip(names, sectors, ref_records, cand_records):
+        diff = diff_records(ref, cand)
+        if not diff:
+            continue
+        for field in diff:
+            field_counts[field] = field_counts.get(field, 0) + 1
+        divergences.append({"document": name, "sector": sector, "diff": diff})
+
+    compared = ["score", "breakdown"]
+    if cand_records and cand_records[0]["notes"] is not None:
+        compared.append("notes")
+    if cand_records and cand_records[0]["recommendations"] is not None:
+        compared.append("recommendations")
+    n = len(texts)
+    return {
+        "documents": n,
+        "compared": compared,
+        "divergent_documents": len(divergences),
+        "divergent_fields": dict(sorted(field_counts.items())),
+        "max_score_delta": max((abs(d["diff"]["score"]["reference"] - d["diff"]["score"]["candidate"])
+                                for d in divergences if "score" in d["diff"]), default=0),
+        "reference_s": round(ref_s, 3),
+        "candidate_s": round(cand_s, 3),
+        "reference_docs_per_s": round(n / ref_s, 2) if ref_s else 0.0,
+        "candidate_docs_per_s": round(n / cand_s, 2) if cand_s else 0.0,
+        "speedup": round(ref_s / cand_s, 2) if cand_s else 0.0,
+        "divergences": divergences[:show],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a candidate scoring path with EnhancedATSScorer")
+    parser.add_argument("--candidate", required=True,
+                        help=f"One of {', '.join(CANDIDATES)} or package.module:function")
+    parser.add_argument("--pdf", action="store_true", help="Use the PDF corpus (data/data, cached text)")
+    parser.add_argument("--csv", nargs="?", const=str(DEFAULT_CSV_PATH), default=None,
+                        help="Use a Category,Resume CSV corpus (default: resumedatasets.csv)")
+    parser.add_argument("--cache", type=str, default=str(DEFAULT_CACHE_PATH), help="PDF corpus text cache")
+    parser.add_argument("--limit", type=int, default=None, help="Max documents per source")
+    parser.add_argument("--config", type=str, default="config.json", help="Scoring config for both sides")
+    parser.add_argument("--auto-detect", action="store_true",
+                        help="Score under the detected sector (detected once, shared by both sides)")
+    parser.add_argument("--show", type=int, default=10, help="Divergent documents to include in the report")
+    args = parser.parse_args()
+
+    if not (args.pdf or args.csv):
+        parser.error("choose at least one source: --pdf and/or --csv")
+    candidate = load_candidate(args.candidate)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = EnhancedATSScorer(args.config)
+    scorer.config.config["online_link_checks"] = False
+    limit = scorer.config.config.get("max_text_chars", MAX_TEXT_CHARS)
+
+    docs = []
+    if args.pdf:
+        docs += itertools.islice(load_pdf_corpus(default_data_root(), Path(args.cache)), args.limit)
+    if args.csv:
+        docs += itertools.islice(csv_documents(Path(args.csv)), args.limit)
+    docs = [d for d in docs if d.text and d.text.strip()]
+    texts = [cap_text(d.text, limit)[0] for d in docs]
+    if args.auto_detect:
+        sectors = [d.detected_sector for d in scorer.sector_detector.detect_many(texts)]
+    else:
+        sectors = [d.sector for d in docs]
+
+    report = run_parity(scorer, candidate, [d.path for d in docs], texts, sectors, args.show)
+    report = {"candidate": args.candidate, **report}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    sys.exit(1 if report["divergent_documents"] else 0)
+
+
+if __name__ == "__main__":
+    main()
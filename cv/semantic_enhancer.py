@@ -9,13 +9,13 @@ Semantic Enhancement for ATS Scoring
 
 from __future__ import annotations
 
-import json
-import re
-from pathlib import Path
-from typing import Dict, List, Tuple, Set
+import threading
+from typing import Dict, List, Optional, Tuple, Set
 from collections import defaultdict
 import numpy as np
 
+from ats.lexicon import get_lexicons
+
 # SBERT imports
 try:
     from sentence_transformers import SentenceTransformer
@@ -29,89 +29,22 @@ class SkillNormalizer:
     """Normalize and group similar skills"""
     
     def __init__(self):
-        self.skill_groups = self._load_skill_groups()
-        self.synonyms = self._load_synonyms()
-    
-    def _load_skill_groups(self) -> Dict[str, List[str]]:
-        """Load skill groups from data or create default ones"""
-        # Common skill groups
-        return {
-            "Python": ["python", "python3", "python programming", "py"],
-            "JavaScript": ["javascript", "js", "node.js", "nodejs", "ecmascript"],
-            "React": ["react", "reactjs", "react.js", "reactjs", "react native"],
-            "AWS": ["aws", "amazon web services", "amazon aws", "cloud aws"],
-            "Docker": ["docker", "docker container", "dockerization"],
-            "SQL": ["sql", "mysql", "postgresql", "postgres", "database"],
-            "Git": ["git", "github", "gitlab", "version control"],
-            "Machine Learning": ["machine learning", "ml", "ai", "artificial intelligence"],
-            "Data Science": ["data science", "data analysis", "data analytics"],
-            "Project Management": ["project management", "pm", "agile", "scrum"],
-            "Excel": ["excel", "microsoft excel", "spreadsheet"],
-            "PowerPoint": ["powerpoint", "presentation", "slides"],
-            "Word": ["word", "microsoft word", "document"],
-            "Photoshop": ["photoshop", "adobe photoshop", "ps"],
-            "Illustrator": ["illustrator", "adobe illustrator", "ai"],
-            "Figma": ["figma", "ui design", "ux design"],
-            "AutoCAD": ["autocad", "cad", "computer aided design"],
-            "SolidWorks": ["solidworks", "3d modeling", "cad design"],
-            "MATLAB": ["matlab", "mathematical modeling"],
-            "Java": ["java", "java programming", "spring", "spring boot"],
-            "C++": ["c++", "cpp", "c plus plus"],
-            "C#": ["c#", "csharp", "dotnet", ".net"],
-            "PHP": ["php", "php programming", "laravel"],
-            "Angular": ["angular", "angularjs", "angular.js"],
-            "Vue": ["vue", "vue.js", "vuejs"],
-            "TypeScript": ["typescript", "ts", "type script"],
-            "MongoDB": ["mongodb", "mongo", "nosql"],
-            "Redis": ["redis", "cache", "caching"],
-            "Kubernetes": ["kubernetes", "k8s", "container orchestration"],
-            "Jenkins": ["jenkins", "ci/cd", "continuous integration"],
-            "Linux": ["linux", "ubuntu", "centos", "unix"],
-            "Windows": ["windows", "windows server", "microsoft windows"],
-            "Azure": ["azure", "microsoft azure", "cloud azure"],
-            "Google Cloud": ["google cloud", "gcp", "google cloud platform"],
-            "Terraform": ["terraform", "infrastructure as code", "iac"],
-            "Ansible": ["ansible", "configuration management"],
-            "Elasticsearch": ["elasticsearch", "elastic", "search engine"],
-            "Kibana": ["kibana", "data visualization", "dashboard"],
-            "Tableau": ["tableau", "business intelligence", "bi"],
-            "Power BI": ["power bi", "microsoft power bi", "business intelligence"],
-            "SAP": ["sap", "sap erp", "enterprise resource planning"],
-            "Salesforce": ["salesforce", "crm", "customer relationship management"],
-            "Jira": ["jira", "project tracking", "issue tracking"],
-            "Confluence": ["confluence", "documentation", "wiki"],
-            "Slack": ["slack", "team communication", "collaboration"],
-            "Zoom": ["zoom", "video conferencing", "remote meeting"],
-            "Teams": ["teams", "microsoft teams", "collaboration"],
-            "Office 365": ["office 365", "microsoft office", "productivity suite"]
-        }
-    
-    def _load_synonyms(self) -> Dict[str, str]:
-        """Load skill synonyms"""
-        synonyms = {}
-        for main_skill, variants in self.skill_groups.items():
-            for variant in variants:
-                synonyms[variant.lower()] = main_skill
-        return synonyms
+        self.lexicons = get_lexicons()
+        self.skill_groups = self.lexicons.skill_groups
+        self.synonyms = self.lexicons.synonyms
+        self._variant_groups = self.lexicons.skill_variant_groups()
     
     def normalize_skill(self, skill: str) -> str:
         """Normalize a skill to its main form"""
         skill_lower = skill.lower().strip()
         return self.synonyms.get(skill_lower, skill)
     
-    def extract_skills_from_text(self, text: str) -> List[str]:
-        """Extract and normalize skills from text"""
-        text_lower = text.lower()
-        found_skills = []
-        
-        # Check for each skill group
-        for main_skill, variants in self.skill_groups.items():
-            for variant in variants:
-                if re.search(rf'\b{re.escape(variant.lower())}\b', text_lower):
-                    found_skills.append(main_skill)
-                    break  # Avoid duplicates
-        
-        return list(set(found_skills))  # Remove duplicates
+    def extract_skills_from_text(self, text: str, tokens: Optional[Set[str]] = None) -> List[str]:
+        """Extract and normalize skills from text (tokens: ats.lexicon.text_tokens of the lowercased text)"""
+        found_skills = set()
+        for variant in self.lexicons.skill_matcher().found(text.lower(), tokens):
+            found_skills.update(self._variant_groups[variant])
+        return list(found_skills)
 
 class SemanticMatcher:
     """SBERT-based semantic matching"""
@@ -120,6 +53,7 @@ class SemanticMatcher:
         self.model_name = model_name
         self.model = None
         self.cache = {}
+        self._encode_lock = threading.Lock()  # one encode at a time when the scorer is shared
         
         if SBERT_AVAILABLE:
             try:
@@ -139,7 +73,8 @@ class SemanticMatcher:
         
         if self.model is not None:
             try:
-                embedding = self.model.encode([text])[0]
+                with self._encode_lock:
+                    embedding = self.model.encode([text])[0]
                 self.cache[text] = embedding
                 return embedding
             except Exception as e:
@@ -148,13 +83,13 @@ class SemanticMatcher:
         # Fallback: return zero vector
         return np.zeros(384)  # all-MiniLM-L6-v2 dimension
     
-    def similarity(self, text1: str, text2: str) -> float:
-        """Calculate semantic similarity between two texts"""
+    def similarity(self, text1: str, text2: str, use_model: bool = True) -> float:
+        """Calculate semantic similarity between two texts (use_model=False: keyword fallback only)"""
         if not text1 or not text2:
             return 0.0
         
         # Fallback to keyword matching if SBERT not available
-        if self.model is None:
+        if self.model is None or not use_model:
             return self._keyword_similarity(text1, text2)
         
         try:
@@ -198,55 +133,32 @@ class EnhancedKeywordMatcher:
     def __init__(self):
         self.skill_normalizer = SkillNormalizer()
         self.semantic_matcher = SemanticMatcher()
-        self.sector_keywords = self._load_sector_keywords()
-    
-    def _load_sector_keywords(self) -> Dict[str, List[str]]:
-        """Load sector keywords"""
-        lex_path = Path("lexicons/sector_keywords.json")
-        if lex_path.exists():
-            try:
-                return json.loads(lex_path.read_text(encoding="utf-8"))
-            except Exception:
-                pass
-        
-        # Fallback
-        return {
-            "INFORMATION-TECHNOLOGY": [
-                "python", "java", "javascript", "react", "node", "api", "cloud",
-                "docker", "kubernetes", "sql", "microservices", "aws", "azure"
-            ],
-            "FINANCE": [
-                "budget", "forecast", "sap", "excel", "financial analysis",
-                "audit", "ifrs", "tax", "valuation", "risk"
-            ],
-            "ENGINEERING": [
-                "cad", "autocad", "solidworks", "mechanical", "electrical",
-                "embedded", "matlab", "simulation", "qa", "testing"
-            ],
-            "HEALTHCARE": [
-                "patient", "clinical", "hospital", "emr", "ehr", "compliance",
-                "diagnosis", "treatment", "pharma", "laboratory"
-            ],
-            "ACCOUNTANT": [
-                "bookkeeping", "ledger", "reconciliation", "payable", "receivable",
-                "gst", "vat", "tax", "audit", "tally"
-            ]
-        }
-    
-    def enhanced_keyword_matching(self, cv_text: str, sector: str) -> Dict:
-        """Enhanced keyword matching with semantic similarity"""
+        self.lexicons = get_lexicons()
+        self.sector_keywords = self.lexicons.sector_keywords
+    
+    def direct_keyword_matches(self, cv_text: str, sector: str, tokens: Optional[Set[str]] = None) -> List[str]:
+        """Sector keywords found verbatim (word-bounded) in the text"""
+        return self.lexicons.sector_matcher(sector).found(cv_text.lower(), tokens)
+    
+    def enhanced_keyword_matching(self, cv_text: str, sector: str,
+                                  direct_matches: Optional[List[str]] = None,
+                                  cv_skills: Optional[List[str]] = None, use_model: bool = True) -> Dict:
+        """Enhanced keyword matching with semantic similarity.
+        direct_matches / cv_skills may be passed in when already known
+        (e.g. merged from per-section results). use_model=False skips SBERT
+        and uses the keyword-overlap fallback."""
         sector_keywords = self.sector_keywords.get(sector, [])
         
         # Extract skills from CV
-        cv_skills = self.skill_normalizer.extract_skills_from_text(cv_text)
+        if cv_skills is None:
+            cv_skills = self.skill_normalizer.extract_skills_from_text(cv_text)
         
         # Direct keyword matches
-        direct_matches = []
-        cv_text_lower = cv_text.lower()
-        
-        for keyword in sector_keywords:
-            if re.search(rf'\b{re.escape(keyword.lower())}\b', cv_text_lower):
-                direct_matches.append(keyword)
+        if direct_matches is None:
+            direct_matches = self.direct_keyword_matches(cv_text, sector)
+        else:
+            found = set(direct_matches)
+            direct_matches = [kw for kw in sector_keywords if kw in found]
         
         # Semantic matches
         semantic_matches = []
@@ -254,7 +166,7 @@ class EnhancedKeywordMatcher:
             if keyword not in direct_matches:
                 # Check semantic similarity with CV skills
                 for cv_skill in cv_skills:
-                    similarity = self.semantic_matcher.similarity(keyword, cv_skill)
+                    similarity = self.semantic_matcher.similarity(keyword, cv_skill, use_model)
                     if similarity >= 0.7:  # Threshold for semantic match
                         semantic_matches.append((keyword, cv_skill, similarity))
                         break
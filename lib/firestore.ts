@@ -54,6 +54,9 @@ export interface UserStats {
   currentRank: number;
   totalScore: number;
   cvScore: number;
+  // En yüksek CV skorunun sektör korpusundaki yeri (% kaçından iyi); null: yok
+  cvPercentile?: number | null;
+  cvPercentileSector?: string | null;
   interviewScore: number;
   badge: string;
   level: string;
@@ -1,16 +1,14 @@
 import base64
 import io
 import os
-import sys
-import subprocess
 import tempfile
-from pathlib import Path
+import time
 from typing import Dict, Optional
 import json
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from PIL import Image
 
@@ -20,11 +18,15 @@ from tensorflow.keras import layers, regularizers
 
 # Import our video analyzer
 from video_analyzer import analyzer
+from metrics import REGISTRY, HTTP_REQUEST_SECONDS, WS_MESSAGE_SECONDS, CV_STAGE_SECONDS, CV_EVENTS
+from cv_jobs import SCRIPT_PATH, JobManager, JobQueueFull, ScoreJob, upload_key
 
 MODEL_PATH = os.environ.get("EMOTION_MODEL_PATH", os.path.join(os.path.dirname(__file__), "models", "fernet_bestweight.h5"))
 
 CLASS_ORDER = ["angry", "disgust", "fear", "happy", "neutral", "sad", "surprise"]
 
+SSE_KEEPALIVE_S = 15.0
+
 app = FastAPI(title="Carivio API Service", version="1.0.0", description="CV Analysis & Video Analysis API")
 
 # CORS for frontend (localhost:3000)
@@ -37,10 +39,36 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template (not raw path) to keep cardinality bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+
 class EmotionRequest(BaseModel):
     image: str  # base64 data URL or raw base64 PNG/JPEG
 
 
+class CVRescoreRequest(BaseModel):
+    text: str
+    sector: Optional[str] = None
+    previous: Optional[Dict] = None  # onceki /api/cv/rescore sonucu (yalnizca sektoru kullanilir)
+    timings: bool = False
+
+
 def build_fernet(input_size, classes=7):
     # Kullanıcının sağladığı mimariyle aynı olacak şekilde kur
     model = tf.keras.models.Sequential()
@@ -129,9 +157,12 @@ async def websocket_video_analysis(websocket: WebSocket):
         while True:
             # Frontend'den video frame al (base64 format)
             data = await websocket.receive_text()
+            started = time.perf_counter()
+            message_type = "invalid"
             
             try:
                 message = json.loads(data)
+                message_type = str(message.get("type") or "unknown")
                 
                 if message.get("type") == "video_frame":
                     base64_frame = message.get("frame")
@@ -139,8 +170,10 @@ async def websocket_video_analysis(websocket: WebSocket):
                     if base64_frame:
                         print(">>> Video frame alindi, analiz ediliyor...")
                         
-                        # Video frame'i analiz et
-                        analysis_result = await analyzer.process_frame(base64_frame)
+                        # Video frame'i analiz et (istenirse asama sureleri ile)
+                        analysis_result = await analyzer.process_frame(
+                            base64_frame, with_timings=bool(message.get("timings"))
+                        )
                         
                         # Sonuçları frontend'e gönder
                         await websocket.send_text(json.dumps({
@@ -168,6 +201,9 @@ async def websocket_video_analysis(websocket: WebSocket):
                     "type": "error",
                     "message": str(e)
                 }))
+
+            finally:
+                WS_MESSAGE_SECONDS.observe(time.perf_counter() - started, type=message_type)
                 
     except WebSocketDisconnect:
         print(">>> WebSocket baglantisi kesildi")
@@ -176,94 +212,201 @@ async def websocket_video_analysis(websocket: WebSocket):
     finally:
         print(">>> WebSocket temizligi yapiliyor")
 
+def _save_upload(content: bytes) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+        tmp_file.write(content)
+        return tmp_file.name
+
+
+async def _submit_cv_job(file: UploadFile, sector: str, jd_text: Optional[str],
+                         jd_file: Optional[UploadFile]) -> ScoreJob:
+    """
+    Upload'ı hash'ler; aynı PDF + sektör + JD için çalışan iş varsa ona katılır,
+    bitmiş sonuç varsa onu döner. Yoksa temp dosyalara yazıp skor işini kuyruğa
+    ekler (temp dosyalar iş bitince silinir). İş paylaşıldığı için timings
+    isteğe göre response_result()'a verilir, işte tutulmaz.
+    """
+    if not SCRIPT_PATH.exists():
+        raise HTTPException(status_code=500, detail=f"CV script bulunamadı: {SCRIPT_PATH}")
+    content = await file.read()
+    use_jd_text = bool(jd_text and jd_text.strip())
+    jd_content = await jd_file.read() if jd_file and not use_jd_text else None
+    key = upload_key(content, sector, jd_text if use_jd_text else None, jd_content)
+
+    # No await from here to submit(): concurrent identical uploads see each other's job
+    job = cv_jobs.lookup(key)
+    if job is not None:
+        CV_EVENTS.inc(event="upload_cached" if job.is_finished else "upload_coalesced")
+        return job
+
+    cleanup = [_save_upload(content)]
+    request = {"file": cleanup[0], "sector": sector}
+    if cv_jobs.score_budget_ms:
+        request["budget_ms"] = cv_jobs.score_budget_ms
+    if use_jd_text:
+        request["jd_text"] = jd_text
+    elif jd_content:
+        cleanup.append(_save_upload(jd_content))
+        request["jd_file"] = cleanup[-1]
+    try:
+        return cv_jobs.submit(request, cleanup, key=key)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def _record_cv_job(job: ScoreJob, stage_timings: Optional[Dict]):
+    if job.started:
+        CV_STAGE_SECONDS.observe(job.started - job.created, stage="queue")
+        CV_STAGE_SECONDS.observe(job.finished - job.started, stage="process")
+    CV_EVENTS.inc(event=f"job_{job.status}")
+    if stage_timings:
+        _record_cv_timings(stage_timings)
+
+
+def _job_links(job: ScoreJob, timings: bool = False) -> Dict:
+    base = f"/api/cv/jobs/{job.id}"
+    query = "?timings=true" if timings else ""
+    return {"status_url": base, "events_url": f"{base}/events{query}", "result_url": f"{base}/result{query}"}
+
+
+def _get_job(job_id: str) -> ScoreJob:
+    job = cv_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı (süresi dolmuş olabilir)")
+    return job
+
+
 # CV Analysis Endpoint
 @app.post("/api/cv/score")
 async def cv_score(
     file: UploadFile = File(...),
     sector: str = Form(default="INFORMATION-TECHNOLOGY"),
     jd_text: Optional[str] = Form(default=None),
-    jd_file: Optional[UploadFile] = File(default=None)
+    jd_file: Optional[UploadFile] = File(default=None),
+    timings: bool = Form(default=False)
 ):
     """
     CV Analizi endpoint'i
-    PDF dosyasını alır ve ATS skorunu döndürür
+    PDF dosyasını alır ve ATS skorunu döndürür.
+    timings=true ise sonuçta aşama bazlı süreler (timings) de döner.
+    Skorlama iş havuzunda çalışır; event loop beklerken bloklanmaz.
+    Aynı PDF/sektör/JD tekrar gelirse sonuç önbellekten döner, eşzamanlı
+    aynı istekler tek bir skorlamayı paylaşır.
     """
-    try:
-        # Project root'u bul (server/fastapi'den bir üst dizin)
-        project_root = Path(__file__).resolve().parent.parent.parent
-        cv_dir = project_root / "cv"
-        script_path = cv_dir / "ats_scoring_enhanced.py"
-        
-        if not script_path.exists():
-            raise HTTPException(status_code=500, detail=f"CV script bulunamadı: {script_path}")
-        
-        # Temp dosya oluştur
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_pdf_path = tmp_file.name
-        
-        # JD file varsa temp'e kaydet
-        tmp_jd_path = None
-        if jd_file:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_jd:
-                jd_content = await jd_file.read()
-                tmp_jd.write(jd_content)
-                tmp_jd_path = tmp_jd.name
-        
-        try:
-            # Python script'ini çalıştır
-            python_cmd = sys.executable  # Mevcut Python interpreter'ı kullan
-            args = [str(script_path), "--file", tmp_pdf_path, "--sector", sector]
-            
-            if jd_text and jd_text.strip():
-                args.extend(["--jd-text", jd_text])
-            elif tmp_jd_path:
-                args.extend(["--jd-file", tmp_jd_path])
-            
-            result = subprocess.run(
-                args,
-                cwd=str(cv_dir),
-                capture_output=True,
-                text=True,
-                env={**os.environ, "PYTHONUTF8": "1"}
-            )
-            
-            if result.returncode != 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"CV analizi hatası: {result.stderr}"
-                )
-            
-            # JSON output'u parse et
-            stdout = result.stdout.strip()
-            json_start = stdout.find('{')
-            json_end = stdout.rfind('}') + 1
-            
-            if json_start == -1:
-                raise HTTPException(status_code=500, detail="Geçersiz CV analiz sonucu")
-            
-            json_str = stdout[json_start:json_end]
-            result_data = json.loads(json_str)
-            
-            return JSONResponse(content={"ok": True, "result": result_data})
-            
-        finally:
-            # Temp dosyaları temizle
-            try:
-                os.unlink(tmp_pdf_path)
-            except:
-                pass
-            if tmp_jd_path:
-                try:
-                    os.unlink(tmp_jd_path)
-                except:
-                    pass
-                    
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"CV analizi hatası: {str(e)}")
+    job = await _submit_cv_job(file, sector, jd_text, jd_file)
+    await cv_jobs.wait(job)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"CV analizi hatası: {job.error}")
+    return JSONResponse(content={"ok": True, "result": job.response_result(timings)})
+
+
+@app.post("/api/cv/jobs", status_code=202)
+async def cv_job_submit(
+    file: UploadFile = File(...),
+    sector: str = Form(default="INFORMATION-TECHNOLOGY"),
+    jd_text: Optional[str] = Form(default=None),
+    jd_file: Optional[UploadFile] = File(default=None),
+    timings: bool = Form(default=False)
+):
+    """
+    /api/cv/score ile aynı form; hemen bir iş kimliği döner.
+    İlerleme: GET /api/cv/jobs/{id} (polling) veya /api/cv/jobs/{id}/events (SSE),
+    sonuç: GET /api/cv/jobs/{id}/result. timings=true ise dönen events_url ve
+    result_url'de ?timings=true bulunur.
+    """
+    job = await _submit_cv_job(file, sector, jd_text, jd_file)
+    return {"ok": True, **job.summary(), **_job_links(job, timings)}
+
+
+@app.get("/api/cv/jobs/{job_id}")
+def cv_job_status(job_id: str):
+    job = _get_job(job_id)
+    return {"ok": True, **job.summary(), **_job_links(job)}
+
+
+@app.get("/api/cv/jobs/{job_id}/result")
+def cv_job_result(job_id: str, timings: bool = False):
+    """Bitmiş işin sonucu; iş sürüyorsa 202 ve durum. timings=true: aşama süreleri de döner"""
+    job = _get_job(job_id)
+    if not job.is_finished:
+        return JSONResponse(status_code=202, content={"ok": True, **job.summary()})
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"CV analizi hatası: {job.error}")
+    return JSONResponse(content={"ok": True, "result": job.response_result(timings)})
+
+
+@app.get("/api/cv/jobs/{job_id}/events")
+async def cv_job_events(job_id: str, timings: bool = False):
+    """
+    Server-Sent Events: her ilerleme olayı için `progress`, sonunda `done`
+    (sonuç dahil; timings=true ise aşama süreleriyle) veya `failed`.
+    Yeni bağlanan istemci önce geçmiş olayları alır.
+    """
+    job = _get_job(job_id)
+
+    def sse(event: str, data: Dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def stream():
+        sent = 0
+        status = None
+        while True:
+            # Read state before waiting: changes after this point wake the wait below
+            finished = job.is_finished
+            if job.status != status:
+                status = job.status
+                yield sse("status", job.summary())
+            for event in job.progress_since(sent):
+                sent = event["seq"]
+                yield sse("progress", event)
+            if finished:
+                if job.status == "done":
+                    yield sse("done", {"ok": True, "result": job.response_result(timings)})
+                else:
+                    yield sse("failed", {"ok": False, "error": job.error})
+                return
+            if not await job.wait_for_change(SSE_KEEPALIVE_S):
+                yield ": keepalive\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/api/cv/rescore")
+async def cv_rescore(req: CVRescoreRequest):
+    """
+    CV oluşturucu için canlı skor.
+    Metni alır; yalnızca worker'ın bölüm önbelleğinde olmayan bölümler yeniden analiz edilir.
+    Bir önceki sonuçtan (previous) yalnızca sektör kullanılır.
+    """
+    if not SCRIPT_PATH.exists():
+        raise HTTPException(status_code=500, detail=f"CV script bulunamadı: {SCRIPT_PATH}")
+
+    job = await cv_jobs.run({"op": "rescore", "text": req.text, "sector": req.sector, "previous": req.previous})
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"CV analizi hatası: {job.error}")
+    return JSONResponse(content={"ok": True, "result": job.response_result(req.timings)})
+
+
+def _record_cv_timings(stage_timings: Dict):
+    for stage, ms in (stage_timings.get("stages_ms") or {}).items():
+        CV_STAGE_SECONDS.observe(ms / 1000.0, stage=stage)
+    for event, count in (stage_timings.get("counters") or {}).items():
+        CV_EVENTS.inc(count, event=event)
+
+
+# Bounded pool of warm scoring workers (see cv_jobs.py for the ATS_JOB_* settings)
+cv_jobs = JobManager(on_finished=_record_cv_job)
+
+
+@app.on_event("shutdown")
+async def stop_cv_workers():
+    await cv_jobs.close()
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 
 # Health check for video analyzer
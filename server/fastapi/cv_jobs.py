@@ -0,0 +1,394 @@
+"""
+CV scoring jobs on a bounded pool of warm scoring workers.
+
+Each worker is one `cv/ats_scoring_enhanced.py --serve-stdio` process driven
+from the event loop (asyncio subprocess), so scoring never blocks the server.
+A job waits for an idle worker, records the worker's progress events (stage
+starts such as extract / sector_detection / rules / jd_fit, and OCR pages as
+{"stage": "ocr", "page": 3, "pages": 5}), and keeps its result until it expires.
+
+  ATS_JOB_WORKERS      worker processes, i.e. jobs running at once (default 2)
+  ATS_JOB_TIMEOUT_S    per-job timeout; the worker is restarted (default 120)
+  ATS_JOB_TTL_S        finished jobs are kept this long (default 3600)
+  ATS_JOB_MAX_PENDING  queued + running jobs before new ones are refused (default 100)
+  ATS_RESULT_CACHE_SIZE  finished results kept for identical uploads (default 500)
+  ATS_RESCORE_WORKERS  worker processes reserved for live rescoring (default 1), so
+                       CV builder edits never queue behind OCR-heavy upload jobs
+
+Uploads are content-addressed: upload_key() hashes the PDF bytes, sector and JD.
+While a job for a key runs, identical submissions get that same job (singleflight);
+once it is done, they get its result for as long as it is cached. Cached results
+are also keyed by the config/lexicon versions of the worker that computed them,
+so a worker started on new rules does not reuse them.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+CV_DIR = Path(__file__).resolve().parent.parent.parent / "cv"
+SCRIPT_PATH = CV_DIR / "ats_scoring_enhanced.py"
+
+LINE_LIMIT = 32 * 1024 * 1024  # one result line (asyncio's default is 64 KiB)
+STARTUP_TIMEOUT_S = 300.0      # lexicons, sector model, SBERT
+MAX_PROGRESS_EVENTS = 200
+STDERR_TAIL_CHARS = 4000
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        value = float(os.environ.get(name, "").strip() or default)
+        return value if value > 0 else default
+    except ValueError:
+        return default
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+def upload_key(content: bytes, sector: str, jd_text: Optional[str] = None,
+               jd_content: Optional[bytes] = None) -> str:
+    """Content address of a scoring request: PDF hash + sector + JD hash"""
+    if jd_text and jd_text.strip():
+        jd = "text:" + hashlib.sha256(jd_text.strip().encode("utf-8")).hexdigest()
+    elif jd_content:
+        jd = "file:" + hashlib.sha256(jd_content).hexdigest()
+    else:
+        jd = "-"
+    return f"{hashlib.sha256(content).hexdigest()}|{sector}|{jd}"
+
+
+class ScoringWorker:
+    """One --serve-stdio process; responses and progress lines are matched to requests by id"""
+
+    def __init__(self, timeout_s: float):
+        self.timeout_s = timeout_s
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._start_lock = asyncio.Lock()
+        self._pending: Dict[int, Tuple[asyncio.Future, Optional[Callable[[Dict], None]]]] = {}
+        self._ids = itertools.count(1)
+        self._stderr_tail = ""
+        self.version: Optional[str] = None  # "<config_version>|<lexicon_version>" once started
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process:
+        async with self._start_lock:
+            if self._proc is not None and self._proc.returncode is None:
+                return self._proc
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, str(SCRIPT_PATH), "--serve-stdio",
+                cwd=str(CV_DIR),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=LINE_LIMIT,
+                env={**os.environ, "PYTHONUTF8": "1"},
+            )
+            asyncio.create_task(self._read_stderr(proc))
+            try:
+                await asyncio.wait_for(self._wait_ready(proc), STARTUP_TIMEOUT_S)
+            except BaseException:
+                if proc.returncode is None:
+                    proc.kill()
+                raise
+            self._proc = proc
+            asyncio.create_task(self._read_stdout(proc))
+            return proc
+
+    async def _wait_ready(self, proc: asyncio.subprocess.Process):
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                await proc.wait()
+                raise RuntimeError(f"Scoring worker exited on startup: {self._stderr_tail or proc.returncode}")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue  # import-time warnings precede the ready line
+            if isinstance(message, dict) and message.get("ready"):
+                self.version = f"{message.get('config_version')}|{message.get('lexicon_version')}"
+                return
+
+    async def _read_stderr(self, proc: asyncio.subprocess.Process):
+        while True:
+            chunk = await proc.stderr.read(4096)
+            if not chunk:
+                return
+            self._stderr_tail = (self._stderr_tail + chunk.decode("utf-8", errors="replace"))[-STDERR_TAIL_CHARS:]
+
+    async def _read_stdout(self, proc: asyncio.subprocess.Process):
+        try:
+            while True:
+                line = await proc.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                entry = self._pending.get(message.get("id")) if isinstance(message, dict) else None
+                if entry is None:
+                    continue
+                future, on_progress = entry
+                if "progress" in message:
+                    if on_progress is not None:
+                        on_progress(message["progress"])
+                elif not future.done():
+                    if message.get("ok"):
+                        future.set_result(message.get("result"))
+                    else:
+                        future.set_exception(RuntimeError(message.get("error") or "Scoring failed"))
+        except Exception as e:
+            print(f">>> Scoring worker read error: {e}")
+        # Worker gone: fail whatever it still owed
+        await proc.wait()
+        if self._proc is proc:
+            self._proc = None
+        error = RuntimeError(f"Scoring worker exited: {self._stderr_tail[-500:] or proc.returncode}")
+        for future, _ in list(self._pending.values()):
+            if not future.done():
+                future.set_exception(error)
+
+    async def score(self, request: Dict, on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        proc = await self._ensure_started()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (future, on_progress)
+        try:
+            line = json.dumps({**request, "id": request_id, "progress": on_progress is not None}, ensure_ascii=False)
+            proc.stdin.write(line.encode("utf-8") + b"\n")
+            await proc.stdin.drain()
+            return await asyncio.wait_for(future, self.timeout_s)
+        except asyncio.TimeoutError:
+            # The stuck request holds the worker: drop it so the next request starts a new one
+            # (returncode is only set once the killed process is reaped)
+            if self._proc is proc:
+                self._proc = None
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+            raise TimeoutError(f"Scoring timed out after {self.timeout_s:g} s")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self):
+        proc = self._proc
+        if proc is not None and proc.returncode is None:
+            proc.stdin.close()
+            try:
+                await asyncio.wait_for(proc.wait(), 5)
+            except asyncio.TimeoutError:
+                proc.kill()
+
+
+class ScoreJob:
+    """One scoring request: status, progress events and (once finished) result or error"""
+
+    def __init__(self, request: Dict, cleanup: List[str], key: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.request = request
+        self.cleanup = cleanup
+        self.status = "queued"  # queued -> running -> done | failed
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.progress: List[Dict] = []  # the first event and the latest ones, each with a "seq"
+        self.progress_seq = 0            # sequence number of the last event added
+        self.result: Optional[Dict] = None
+        self.timings: Optional[Dict] = None
+        self.version: Optional[str] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def _elapsed_ms(self) -> float:
+        return round((time.time() - self.created) * 1000, 1)
+
+    def add_progress(self, event: Dict):
+        last = self.progress[-1] if self.progress else None
+        if last is not None and {k: v for k, v in last.items() if k not in ("seq", "t_ms")} == event:
+            return  # same stage entered again
+        if len(self.progress) >= MAX_PROGRESS_EVENTS:
+            del self.progress[1]
+        self.progress_seq += 1
+        self.progress.append({**event, "seq": self.progress_seq, "t_ms": self._elapsed_ms()})
+        self.notify()
+
+    def progress_since(self, seq: int) -> List[Dict]:
+        """Kept events after sequence number `seq` (list positions shift once old events are dropped)"""
+        return [event for event in self.progress if event["seq"] > seq]
+
+    def notify(self):
+        """Wake everyone in wait_for_change()"""
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """False when nothing changed within timeout"""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def response_result(self, include_timings: bool = False) -> Optional[Dict]:
+        """Result as returned to a client; stage timings only for the client that asks for them
+        (a job may be shared by several requests)"""
+        if self.result is None or not (include_timings and self.timings):
+            return self.result
+        return {**self.result, "timings": self.timings}
+
+    def summary(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.progress[-1] if self.progress else None,
+            "queued_ms": round(((self.started or time.time()) - self.created) * 1000, 1),
+            "run_ms": round(((self.finished or time.time()) - self.started) * 1000, 1) if self.started else None,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Bounded pool of ScoringWorkers plus the jobs submitted to it"""
+
+    def __init__(self, on_finished: Optional[Callable[["ScoreJob", Optional[Dict]], None]] = None):
+        """on_finished(job, stage_timings) runs when a job ends (metrics); stage_timings may be None"""
+        self.workers_count = int(_env_number("ATS_JOB_WORKERS", 2))
+        self.rescore_workers_count = int(_env_number("ATS_RESCORE_WORKERS", 1))
+        self.timeout_s = _env_number("ATS_JOB_TIMEOUT_S", 120)
+        self.ttl_s = _env_number("ATS_JOB_TTL_S", 3600)
+        self.max_pending = int(_env_number("ATS_JOB_MAX_PENDING", 100))
+        self.result_cache_size = int(_env_number("ATS_RESULT_CACHE_SIZE", 500))
+        self.score_budget_ms = _env_number("ATS_SCORE_BUDGET_MS", 0) or None  # per-CV scoring budget
+        self.on_finished = on_finished
+        self.jobs: Dict[str, ScoreJob] = {}
+        self._inflight: Dict[str, ScoreJob] = {}                    # upload key -> queued/running job
+        self._results: "OrderedDict[str, ScoreJob]" = OrderedDict()  # upload key|version -> done job (LRU)
+        self._workers: List[ScoringWorker] = []
+        self._idle: Dict[str, asyncio.Queue] = {}  # lane ("jobs" | "rescore") -> idle workers
+
+    def _ensure_pool(self, lane: str = "jobs") -> asyncio.Queue:
+        # Created on first use, inside the server's event loop. LIFO: the most recently
+        # used worker runs the next job, so a CV builder's edits keep hitting the worker
+        # whose section cache holds that CV.
+        if lane not in self._idle:
+            idle = asyncio.LifoQueue()
+            for _ in range(self.rescore_workers_count if lane == "rescore" else self.workers_count):
+                worker = ScoringWorker(self.timeout_s)
+                self._workers.append(worker)
+                idle.put_nowait(worker)
+            self._idle[lane] = idle
+        return self._idle[lane]
+
+    def lookup(self, key: str) -> Optional[ScoreJob]:
+        """The running job for an upload key, else its cached done job (for the current worker versions)"""
+        job = self._inflight.get(key)
+        if job is not None:
+            return job
+        self._expire()
+        for version in {w.version for w in self._workers if w.version}:
+            job = self._results.get(f"{key}|{version}")
+            if job is not None:
+                self._results.move_to_end(f"{key}|{version}")
+                return job
+        return None
+
+    def submit(self, request: Dict, cleanup: Optional[List[str]] = None, key: Optional[str] = None) -> ScoreJob:
+        """Queue a worker request ({"file", "sector", "jd_text", ...}); cleanup files are removed when it ends.
+        With an upload key the job is shared with identical submissions (see lookup())."""
+        self._expire()
+        pending = sum(1 for job in self.jobs.values() if not job.is_finished)
+        if pending >= self.max_pending:
+            _remove_files(cleanup or [])
+            raise JobQueueFull(f"{pending} CV analizi bekliyor, lütfen daha sonra tekrar deneyin")
+        job = ScoreJob(request, cleanup or [], key)
+        self.jobs[job.id] = job
+        if key is not None:
+            self._inflight[key] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[ScoreJob]:
+        self._expire()
+        return self.jobs.get(job_id)
+
+    async def run(self, request: Dict) -> ScoreJob:
+        """Run a short worker request (e.g. {"op": "rescore", ...}) on the rescore workers
+        (ATS_RESCORE_WORKERS) and wait for it. Unlike submit() the job is not listed,
+        deduplicated or kept after it returns."""
+        job = ScoreJob(request, [])
+        job.task = asyncio.create_task(self._run(job, "rescore"))
+        return await self.wait(job)
+
+    async def wait(self, job: ScoreJob) -> ScoreJob:
+        """Wait for the job to finish; a cancelled waiter (client gone) leaves the job running"""
+        await asyncio.shield(job.task)
+        return job
+
+    async def _run(self, job: ScoreJob, lane: str = "jobs"):
+        idle = self._ensure_pool(lane)
+        worker = await idle.get()
+        job.status = "running"
+        job.started = time.time()
+        job.notify()
+        stage_timings = None
+        try:
+            # Stage timings are always collected (metrics); clients only see them on request
+            result = await worker.score({**job.request, "timings": True}, job.add_progress)
+            stage_timings = result.pop("timings", None) if isinstance(result, dict) else None
+            job.result, job.timings, job.version = result, stage_timings, worker.version
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+            idle.put_nowait(worker)
+            if job.key is not None:
+                self._inflight.pop(job.key, None)
+                # Results that skipped optional stages under ATS_SCORE_BUDGET_MS are not reused
+                # (as in the scorer's own cache)
+                degraded = bool(((job.result or {}).get("deadline") or {}).get("skipped_stages"))
+                if job.status == "done" and job.version and not degraded:
+                    self._results[f"{job.key}|{job.version}"] = job
+                    while len(self._results) > self.result_cache_size:
+                        self._results.popitem(last=False)
+            _remove_files(job.cleanup)
+            job.notify()
+            if self.on_finished is not None:
+                try:
+                    self.on_finished(job, stage_timings)
+                except Exception as e:
+                    print(f">>> CV job hook error: {e}")
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_s
+        for job_id in [j.id for j in self.jobs.values() if j.is_finished and j.finished < cutoff]:
+            del self.jobs[job_id]
+        for result_key in [k for k, j in self._results.items() if j.finished < cutoff]:
+            del self._results[result_key]
+
+    async def close(self):
+        for worker in self._workers:
+            await worker.close()
+
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -15,6 +15,8 @@ import os
 from PIL import Image
 import io
 
+from metrics import VIDEO_STAGE_SECONDS, VIDEO_FRAMES
+
 @dataclass
 class GazeMetrics:
     eye_contact_ratio: float  # 0-1
@@ -119,6 +121,11 @@ class VideoAnalyzer:
         
         return model
     
+    def _detect_faces(self, gray: np.ndarray):
+        """Haar cascade face detection (timed as the 'detect' stage)"""
+        with VIDEO_STAGE_SECONDS.time(stage="detect"):
+            return self.face_cascade.detectMultiScale(gray, 1.3, 5)
+    
     def decode_frame(self, base64_frame: str) -> np.ndarray:
         """Base64 encoded frame'i OpenCV format'a çevir"""
         try:
@@ -151,7 +158,7 @@ class VideoAnalyzer:
             h, w = frame.shape[:2]
             
             # Face detection
-            faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+            faces = self._detect_faces(gray)
             
             if len(faces) == 0:
                 return None
@@ -226,7 +233,7 @@ class VideoAnalyzer:
             h, w = frame.shape[:2]
             
             # Face detection için postür değerlendirmesi
-            faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+            faces = self._detect_faces(gray)
             
             if len(faces) == 0:
                 return None
@@ -292,7 +299,7 @@ class VideoAnalyzer:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
             
             # Face detection
-            faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+            faces = self._detect_faces(gray)
             
             if len(faces) == 0:
                 return None
@@ -337,27 +344,40 @@ class VideoAnalyzer:
             print(f">>> Emotion analysis error: {e}")
             return None
     
-    async def process_frame(self, base64_frame: str) -> Dict:
+    async def process_frame(self, base64_frame: str, with_timings: bool = False) -> Dict:
         """Tek frame'i analiz et ve sonuçları döndür"""
         current_time = time.time()
         
         # Throttle analysis to prevent overload
         if current_time - self.last_analysis_time < self.analysis_interval:
+            VIDEO_FRAMES.inc(status="throttled")
             return {"status": "throttled"}
         
         self.last_analysis_time = current_time
+        stage_ms: Dict[str, float] = {}
+        
+        def timed(stage: str, fn, *args):
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.perf_counter() - start
+                VIDEO_STAGE_SECONDS.observe(elapsed, stage=stage)
+                stage_ms[stage] = round(elapsed * 1000, 2)
         
         # Decode frame
-        frame = self.decode_frame(base64_frame)
+        frame = timed("decode", self.decode_frame, base64_frame)
         if frame is None:
+            VIDEO_FRAMES.inc(status="error")
             return {"status": "error", "message": "Frame decode failed"}
         
         print(f">>> Frame analiz ediliyor: {frame.shape}")
         
         # Run all analyses
-        gaze_metrics = self.analyze_gaze(frame)
-        posture_metrics = self.analyze_posture(frame)
-        emotion_metrics = self.analyze_emotion(frame)
+        gaze_metrics = timed("gaze", self.analyze_gaze, frame)
+        posture_metrics = timed("posture", self.analyze_posture, frame)
+        emotion_metrics = timed("emotion", self.analyze_emotion, frame)
+        VIDEO_FRAMES.inc(status="success")
         
         # Build response
         result = {
@@ -396,6 +416,9 @@ class VideoAnalyzer:
             }
             print(f">>> Duygu: {emotion_metrics.dominant_emotion} ({emotion_metrics.confidence:.2f})")
         
+        if with_timings:
+            result["timings"] = stage_ms
+        
         return result
     
     def cleanup(self):